@@ -0,0 +1,80 @@
+# backup_scheduler.py
+import threading
+import time
+
+
+class BackupScheduler:
+    """自动备份调度器：在后台线程中合并短时间内的多次备份请求
+
+    每次 request() 都会把导出时间推迟到 delay 秒之后，写入停止后只执行一次导出。
+    export_func 在后台线程（或调用 flush() 的线程）中执行，不能依赖调用方的数据库连接。
+    """
+    def __init__(self, export_func, delay=2.0):
+        self.export_func = export_func
+        self.delay = delay
+        self.requested_count = 0  # 收到的备份请求次数
+        self.export_count = 0     # 实际执行的导出次数
+
+        self._cond = threading.Condition()
+        self._pending = False
+        self._running = False
+        self._stopped = False
+        self._deadline = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="BackupScheduler", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """请求一次备份，在安静期结束后执行"""
+        with self._cond:
+            self._pending = True
+            self._deadline = time.monotonic() + self.delay
+            self.requested_count += 1
+            self._cond.notify_all()
+
+    def flush(self):
+        """立即在当前线程执行尚未完成的备份，并等待正在进行的备份结束"""
+        with self._cond:
+            while self._running:
+                self._cond.wait()
+            if not self._pending:
+                return
+            self._pending = False
+            self._running = True
+        self._export()
+
+    def stop(self):
+        """停止后台线程，退出前写出最后一次备份"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._pending:
+                        remaining = self._deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                self._pending = False
+                self._running = True
+            self._export()
+
+    def _export(self):
+        try:
+            self.export_func()
+        except Exception as e:
+            print(f"自动备份失败: {e}")
+        finally:
+            with self._cond:
+                self.export_count += 1
+                self._running = False
+                self._cond.notify_all()
@@ -0,0 +1,92 @@
+# benchmark_profiles.py
+"""比较各数据库连接配置下的保存和加载耗时
+
+在临时目录中为每个连接配置建立相同的测试数据库，依次测量：
+    - 单条保存：修改一名人员在最新时期的记录（apply_period_changes，每次一个事务）
+    - 整期保存：重写最新时期的全部记录（save_period_data）
+    - 时期加载：读取一个时期的全部记录（get_data_by_period）
+
+运行方式: python benchmark_profiles.py [人数] [时期数] [重复次数]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from connection_profile import CONNECTION_PROFILES
+from database import DatabaseManager
+
+
+def make_period_names(count):
+    """生成 count 个连续的时期字符串（存储格式）"""
+    periods = []
+    for i in range(count):
+        year, month = 2020 + i // 24, (i // 2) % 12 + 1
+        half = "First Half" if i % 2 == 0 else "Second Half"
+        periods.append(f"{year}-{month:02d}-{half}")
+    return periods
+
+
+def make_records(people, period_index):
+    return [{'name': f"人员{n:04d}", 'position': '',
+             'left_perf': float(100 + n + period_index), 'right_perf': float(80 + n * 2 - period_index),
+             'left_orders': n % 20, 'right_orders': (n + period_index) % 20}
+            for n in range(people)]
+
+
+def timed(func, repeat):
+    """执行 repeat 次，返回每次耗时（毫秒）的中位数"""
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def benchmark_profile(profile, db_path, people, period_count, repeat):
+    db = DatabaseManager(db_path, backup_file=db_path + '.csv', backup_delay=None,
+                         migration_progress=lambda *args: None, connection_profile=profile)
+    db.schedule_backup = lambda: None  # 只测量数据库本身，不计入备份导出
+    periods = make_period_names(period_count)
+    for index, period in enumerate(periods):
+        db.save_period_data(period, make_records(people, index))
+    latest = periods[-1]
+
+    def save_one(i):
+        record = make_records(people, i)[i % people]
+        db.apply_period_changes(latest, upserts=[dict(record, sort_order=i % people)])
+
+    def save_period(i):
+        db.save_period_data(latest, make_records(people, i))
+
+    def load_period(i):
+        db.get_data_by_period(periods[i % period_count])
+
+    result = {
+        'save_one': timed(save_one, repeat),
+        'save_period': timed(save_period, repeat),
+        'load_period': timed(load_period, repeat),
+    }
+    db.close()
+    return result
+
+
+def main(argv):
+    people = int(argv[1]) if len(argv) > 1 else 200
+    period_count = int(argv[2]) if len(argv) > 2 else 24
+    repeat = int(argv[3]) if len(argv) > 3 else 50
+    print(f"测试数据: {people} 人 × {period_count} 个时期，每项重复 {repeat} 次，结果为耗时中位数\n")
+    print(f"{'配置':<12}{'单条保存(ms)':>14}{'整期保存(ms)':>14}{'时期加载(ms)':>14}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for profile in CONNECTION_PROFILES:
+            db_path = os.path.join(tmp_dir, f"benchmark_{profile}.db")
+            result = benchmark_profile(profile, db_path, people, period_count, repeat)
+            print(f"{profile:<12}{result['save_one']:>14.2f}{result['save_period']:>14.2f}"
+                  f"{result['load_period']:>14.2f}")
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,224 @@
+# connection_profile.py
+"""SQLite 连接配置
+
+打开数据库连接时应用的 PRAGMA 设置（日志模式、同步级别、内存映射、页缓存、临时存储）
+以及 sqlite3 模块的语句缓存大小。可以使用内置的配置名，也可以在 JSON 配置文件中
+选择配置名并覆盖其中的单项设置，例如：
+
+    {"profile": "tuned", "cache_size": -32000}
+"""
+import json
+import os
+import sqlite3
+
+
+# compatible 与 sqlite3 默认连接相同；tuned 使用 WAL 日志并放宽同步级别，
+# 应用崩溃不会丢失已提交的数据，只有操作系统崩溃或断电时可能丢失最后几次提交
+CONNECTION_PROFILES = {
+    'compatible': {
+        'journal_mode': 'delete',
+        'synchronous': 'full',
+        'mmap_size': 0,
+        'cache_size': -2000,       # 负数表示KB，即约2MB
+        'temp_store': 'default',
+        'cached_statements': 128,
+    },
+    'tuned': {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'mmap_size': 64 * 1024 * 1024,
+        'cache_size': -16000,
+        'temp_store': 'memory',
+        'cached_statements': 256,
+    },
+}
+DEFAULT_PROFILE = 'tuned'
+
+# 连接后依次执行的 PRAGMA，顺序与 describe_settings 的显示顺序一致
+PRAGMA_SETTINGS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store')
+
+SETTING_LABELS = {
+    'journal_mode': '日志模式',
+    'synchronous': '同步级别',
+    'mmap_size': '内存映射',
+    'cache_size': '页缓存',
+    'temp_store': '临时存储',
+    'cached_statements': '语句缓存',
+}
+
+SYNCHRONOUS_NAMES = {0: 'off', 1: 'normal', 2: 'full', 3: 'extra'}
+TEMP_STORE_NAMES = {0: 'default', 1: 'file', 2: 'memory'}
+
+# 各设置允许的取值：文字设置为可选值的集合（不区分大小写），数值设置为允许的最小值（None 表示不限）。
+# PRAGMA 的值直接拼接在语句中，配置文件中的每一项都必须先通过检查
+SETTING_CHOICES = {
+    'journal_mode': {'delete', 'truncate', 'persist', 'memory', 'wal', 'off'},
+    'synchronous': set(SYNCHRONOUS_NAMES.values()),
+    'temp_store': set(TEMP_STORE_NAMES.values()),
+}
+SETTING_MINIMUMS = {
+    'mmap_size': 0,
+    'cache_size': None,  # 正数为页数，负数为KB
+    'cached_statements': 0,
+}
+
+
+def _check_setting(key, value):
+    """检查单项设置的类型和取值，返回规范化后的值，无效时抛出 ValueError"""
+    if key in SETTING_CHOICES:
+        if not isinstance(value, str) or value.lower() not in SETTING_CHOICES[key]:
+            raise ValueError(f"数据库连接设置 {key} 的值无效: {value!r}"
+                             f"（可选: {', '.join(sorted(SETTING_CHOICES[key]))}）")
+        return value.lower()
+    minimum = SETTING_MINIMUMS[key]
+    # bool 是 int 的子类，true/false 不是有效的数值
+    if not isinstance(value, int) or isinstance(value, bool) or (minimum is not None and value < minimum):
+        expected = f"不小于 {minimum} 的整数" if minimum is not None else "整数"
+        raise ValueError(f"数据库连接设置 {key} 应为{expected}: {value!r}")
+    return value
+
+
+def resolve_profile(profile=None):
+    """把配置名或设置字典解析为完整的配置字典
+
+    profile 为 None 时使用 DEFAULT_PROFILE；字典中可以用 'profile' 指定基础配置，
+    其余键覆盖基础配置中的单项设置。配置名、设置项或其取值无效时抛出 ValueError。
+    """
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    if isinstance(profile, str):
+        profile = {'profile': profile}
+    if not isinstance(profile, dict):
+        raise ValueError(f"数据库连接配置应为配置名或设置字典: {profile!r}")
+
+    overrides = dict(profile)
+    name = overrides.pop('profile', DEFAULT_PROFILE)
+    if name not in CONNECTION_PROFILES:
+        raise ValueError(f"未知的数据库连接配置: {name}（可选: {', '.join(CONNECTION_PROFILES)}）")
+    unknown = set(overrides) - set(CONNECTION_PROFILES[name])
+    if unknown:
+        raise ValueError(f"未知的数据库连接设置: {', '.join(sorted(unknown))}")
+
+    settings = dict(CONNECTION_PROFILES[name], **overrides)
+    settings = {key: _check_setting(key, value) for key, value in settings.items()}
+    settings['profile'] = name
+    return settings
+
+
+def load_profile_file(config_file):
+    """从 JSON 配置文件读取连接配置
+
+    文件不存在时使用默认配置；文件无法读取、格式错误或含有无效的设置时打印警告，
+    改用与 sqlite3 默认连接相同的 compatible 配置。
+    """
+    if not config_file or not os.path.exists(config_file):
+        return resolve_profile()
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return resolve_profile(json.load(f))
+    except (OSError, ValueError) as e:
+        print(f"读取数据库连接配置失败，使用 compatible 配置: {e}")
+        return resolve_profile('compatible')
+
+
+def connect(db_path, profile=None):
+    """按连接配置打开数据库，返回 (连接, 配置字典)"""
+    settings = resolve_profile(profile)
+    conn = sqlite3.connect(db_path, cached_statements=settings['cached_statements'])
+    for pragma in PRAGMA_SETTINGS:
+        value = settings[pragma]
+        if isinstance(value, str):
+            value = value.upper()
+        conn.execute(f"PRAGMA {pragma} = {value}").fetchall()
+    return conn, settings
+
+
+def read_settings(conn, settings):
+    """读取连接实际生效的设置（例如内存数据库不支持 WAL，会保持 memory 日志模式）"""
+    actual = {}
+    for pragma in PRAGMA_SETTINGS:
+        row = conn.execute(f"PRAGMA {pragma}").fetchone()
+        # 内存数据库不支持 mmap，读取 mmap_size 时没有结果
+        actual[pragma] = row[0] if row else 0
+    actual['synchronous'] = SYNCHRONOUS_NAMES.get(actual['synchronous'], actual['synchronous'])
+    actual['temp_store'] = TEMP_STORE_NAMES.get(actual['temp_store'], actual['temp_store'])
+    actual['cached_statements'] = settings['cached_statements']
+    actual['profile'] = settings['profile']
+    return actual
+
+
+def format_size(kib):
+    return f"{kib / 1024:.0f} MB" if kib >= 1024 else f"{kib} KB"
+
+
+def describe_settings(actual):
+    """把 read_settings 的结果格式化为多行文本，用于关于对话框"""
+    lines = [f"数据库连接配置: {actual['profile']}"]
+    for key, label in SETTING_LABELS.items():
+        value = actual[key]
+        if key == 'mmap_size':
+            value = format_size(value // 1024) if value else '关闭'
+        elif key == 'cache_size':
+            # 正数为页数，负数为KB
+            value = format_size(-value) if value < 0 else f"{value} 页"
+        elif key == 'cached_statements':
+            value = f"{value} 条"
+        lines.append(f"• {label}: {value}")
+    return "\n".join(lines)
+
+
+# ===================================================================
+#  独立测试脚本
+#  运行方式: python connection_profile.py
+# ===================================================================
+if __name__ == '__main__':
+    import tempfile
+
+    print("--- Running Connection Profile Self-Test ---")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'profile_test.db')
+
+        print("\n[Test Case 1] 默认配置")
+        conn, settings = connect(db_path)
+        actual = read_settings(conn, settings)
+        print(describe_settings(actual))
+        assert actual['journal_mode'] == 'wal' and actual['synchronous'] == 'normal'
+        assert actual['temp_store'] == 'memory' and actual['cache_size'] == -16000
+        conn.close()
+
+        print("\n[Test Case 2] 配置文件选择配置并覆盖单项设置")
+        config_file = os.path.join(tmp_dir, 'db_config.json')
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump({'profile': 'compatible', 'cache_size': -4000}, f)
+        conn, settings = connect(db_path, load_profile_file(config_file))
+        actual = read_settings(conn, settings)
+        print(describe_settings(actual))
+        assert actual['journal_mode'] == 'delete' and actual['synchronous'] == 'full'
+        assert actual['cache_size'] == -4000 and actual['mmap_size'] == 0
+        conn.close()
+
+        print("\n[Test Case 3] 无效配置")
+        for bad in ('fastest', {'cache': 1}, {'journal_mode': 'wal; DROP TABLE x'}, {'synchronous': 1},
+                    {'cache_size': '-4000'}, {'mmap_size': -1}, {'cached_statements': True}, ['tuned']):
+            try:
+                resolve_profile(bad)
+                raise AssertionError(f"无效配置没有报错: {bad}")
+            except ValueError as e:
+                print(f"预期的错误: {e}")
+        assert resolve_profile({'journal_mode': 'WAL'})['journal_mode'] == 'wal'
+
+        print("\n[Test Case 4] 配置文件中的无效设置改用 compatible 配置")
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump({'profile': 'tuned', 'journal_mode': 'fast', 'cache_size': 'big'}, f)
+        settings = load_profile_file(config_file)
+        assert settings == resolve_profile('compatible')
+        conn, settings = connect(db_path, settings)
+        assert read_settings(conn, settings)['journal_mode'] == 'delete'
+        conn.close()
+
+        print("\n[Test Case 5] 内存数据库保持 memory 日志模式")
+        conn, settings = connect(':memory:')
+        assert read_settings(conn, settings)['journal_mode'] == 'memory'
+        conn.close()
+
+    print("\n--- Test Completed Successfully ---")
@@ -1,82 +1,394 @@
 # database.py
 import sqlite3
 import os
+import csv
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
 from pathlib import Path
 
+from backup_scheduler import BackupScheduler
+from connection_profile import connect, read_settings, describe_settings
+from migrations import migrate
+from period_utils import (NAME_TRIM_CHARS, to_storage_period, to_display_period, period_to_key,
+                          key_to_period, normalize_period, shift_period_key)
+
+
+def calc_growth(current, previous):
+    """计算相对于上一期的增长百分比，上一期为0时按0→100%处理"""
+    if previous == 0:
+        return 100.0 if current > 0 else 0.0
+    return ((current - previous) / previous) * 100.0
+
+
+def _growth_sql(current, previous):
+    """生成与 calc_growth 规则一致的SQL增长率表达式（无上一期时为0）"""
+    current, previous = f"({current})", f"({previous})"
+    return (f"CASE WHEN {previous} IS NULL THEN 0.0 "
+            f"WHEN {previous} = 0 THEN (CASE WHEN {current} > 0 THEN 100.0 ELSE 0.0 END) "
+            f"ELSE (({current} - {previous}) / {previous}) * 100.0 END")
+
+
+# 窗口函数需要SQLite 3.25+，UPDATE ... FROM 需要SQLite 3.33+
+SQLITE_HAS_WINDOW = sqlite3.sqlite_version_info >= (3, 25, 0)
+SQLITE_HAS_UPDATE_FROM = sqlite3.sqlite_version_info >= (3, 33, 0)
+
+# 基于 LAG() 窗口函数一次性计算每条记录相对于该人员上一期的增长率
+GROWTH_WINDOW_SQL = f"""
+    SELECT person_id, period_id,
+           {_growth_sql('left_perf', 'prev_left')} AS left_growth,
+           {_growth_sql('right_perf', 'prev_right')} AS right_growth,
+           {_growth_sql('left_perf + right_perf', 'prev_left + prev_right')} AS total_growth
+    FROM (
+        SELECT person_id, period_id, left_perf, right_perf,
+               LAG(left_perf) OVER w AS prev_left,
+               LAG(right_perf) OVER w AS prev_right
+        FROM performance {{where}}
+        WINDOW w AS (PARTITION BY person_id ORDER BY period_key, period)
+    )
+"""
+
+# 按维度表id写回增长率
+GROWTH_UPDATE_SQL = """
+    UPDATE performance_fact
+    SET left_growth_pct = ?, right_growth_pct = ?, total_growth_pct = ?
+    WHERE person_id = ? AND period_id = ?
+"""
+
+# 时期内排名的业绩指标，表达式与迁移中建立的排名索引一致，ORDER BY ... LIMIT 可以直接沿索引读取
+RANKING_METRICS = {
+    'left': "f.left_perf",
+    'right': "f.right_perf",
+    'total': "f.left_perf + f.right_perf",
+}
+
+# 人员 × 时期矩阵（热力图、多人趋势）可选的指标
+MATRIX_METRICS = {
+    'total': "left_perf + right_perf",
+    'left': "left_perf",
+    'right': "right_perf",
+    'growth': "total_growth_pct",
+}
+
+# 每名人员最近一期的职级：聚合查询中与 MAX() 同行的其他列取自最大值所在的记录
+CURRENT_POSITION_SQL = """
+    SELECT f.person_id, f.position, MAX(d.period_key)
+    FROM performance_fact AS f JOIN period AS d ON d.id = f.period_id
+    GROUP BY f.person_id
+"""
+
+# 按时期匹配 performance 视图中的记录，参数为 (时期键, 时期)：
+# 能解析的时期按时期键匹配，同一时期的任何写法都能找到；无法解析的时期没有时期键，按写法匹配
+PERIOD_MATCH_SQL = "period_key IS ? AND (period_key IS NOT NULL OR period = ?)"
+
+
+def write_backup_csv(conn, csv_file):
+    """使用给定的数据库连接导出所有数据到CSV文件
+
+    先写入同一目录下名称唯一的临时文件，完成后再原子替换目标文件，避免备份中途失败留下残缺文件；
+    手动导出和后台备份同时写同一目标时也不会共用临时文件。
+    """
+    tmp_file = None
+    try:
+        cursor = conn.cursor()
+        # 获取所有业绩数据，按时期和sort_order排序
+        cursor.execute("""
+            SELECT name, period, left_perf, right_perf, left_orders, right_orders,
+                   left_growth_pct, right_growth_pct, total_growth_pct, sort_order
+            FROM performance 
+            ORDER BY period_key ASC, period ASC, sort_order ASC, name ASC
+        """)
+        performance_data = cursor.fetchall()
+        
+        # 获取所有总结数据
+        cursor.execute("SELECT period, summary_text FROM summaries ORDER BY period")
+        summary_data = {period: summary for period, summary in cursor.fetchall()}
+        
+        with tempfile.NamedTemporaryFile('w', newline='', encoding='utf-8-sig', delete=False,
+                                         dir=os.path.dirname(os.path.abspath(csv_file)),
+                                         prefix=f"{os.path.basename(csv_file)}.", suffix='.tmp') as f:
+            tmp_file = f.name
+            writer = csv.writer(f)
+            
+            # 写入元数据
+            writer.writerow(['# 业绩数据备份文件'])
+            writer.writerow(['# 导出时间:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+            writer.writerow(['# 数据格式: 编号,姓名,时期,左区业绩,右区业绩,左区订单,右区订单,左区增长%,右区增长%,总增长%'])
+            writer.writerow([])
+            
+            # 写入业绩数据头部
+            writer.writerow(['[PERFORMANCE_DATA]'])
+            writer.writerow(['编号', '姓名', '时期', '左区业绩', '右区业绩', '左区订单', '右区订单', 
+                           '左区增长%', '右区增长%', '总增长%'])
+            
+            # 按时期分组，为每个时期重新编号
+            current_period = None
+            period_number = 0
+            
+            for row in performance_data:
+                name, period, left_perf, right_perf, left_orders, right_orders, left_growth_pct, right_growth_pct, total_growth_pct, sort_order = row
+                
+                # 如果是新的时期，重置编号
+                if period != current_period:
+                    current_period = period
+                    period_number = 0
+                
+                period_number += 1
+                
+                # 写入包含编号的数据行
+                writer.writerow([period_number, name, period, left_perf, right_perf, left_orders, right_orders, 
+                               left_growth_pct, right_growth_pct, total_growth_pct])
+            
+            writer.writerow([])
+            
+            # 写入总结数据头部
+            writer.writerow(['[SUMMARY_DATA]'])
+            writer.writerow(['时期', '总结内容'])
+            
+            # 写入总结数据
+            for period, summary in summary_data.items():
+                # 处理总结中的换行符
+                clean_summary = summary.replace('\n', '\\n').replace('\r', '\\r') if summary else ''
+                writer.writerow([period, clean_summary])
+        os.replace(tmp_file, csv_file)
+        
+        print(f"数据已导出到 {csv_file}")
+        return True
+        
+    except Exception as e:
+        print(f"导出CSV失败: {e}")
+        if tmp_file is not None and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        return False
+
+
+def export_database_file(db_path, csv_file):
+    """打开独立连接导出数据库文件，供后台备份线程使用"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return write_backup_csv(conn, csv_file)
+    finally:
+        conn.close()
+
+
+PERFORMANCE_SECTION = '[PERFORMANCE_DATA]'
+SUMMARY_SECTION = '[SUMMARY_DATA]'
+
+# 导入报告中最多保留的被拒绝行明细数量
+MAX_REPORTED_REJECTS = 100
+
+# 导入时直接按维度表id写入事实表，不经过 performance 视图的触发器
+PERFORMANCE_INSERT_SQL = """
+    INSERT INTO performance_fact
+    (person_id, period_id, left_perf, right_perf, left_orders, right_orders,
+     left_growth_pct, right_growth_pct, total_growth_pct, sort_order)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+PERSON_INSERT_SQL = "INSERT INTO person (id, name) VALUES (?, ?)"
+PERIOD_INSERT_SQL = "INSERT INTO period (id, period, period_key) VALUES (?, ?, ?)"
+
+SUMMARY_INSERT_SQL = "INSERT INTO summaries (period, summary_text) VALUES (?, ?)"
+
+
+def iter_csv_sections(f):
+    """逐行解析备份CSV文件，产生 (数据段, 行号, 行)，不会把整个文件读入内存
+
+    业绩数据段在遇到空行或下一个数据段标记时结束；总结数据段跳过空行。
+    各数据段标记后的第一行为标题行，自动跳过。
+    """
+    reader = csv.reader(f)
+    section = None
+    skip_header = False
+    for row in reader:
+        if row and row[0] in (PERFORMANCE_SECTION, SUMMARY_SECTION):
+            section = row[0]
+            skip_header = True
+            continue
+        if skip_header:
+            skip_header = False
+            continue
+
+        if section == PERFORMANCE_SECTION:
+            if not row or row[0].startswith('[') or not row[0].strip():
+                section = None
+                continue
+        elif section == SUMMARY_SECTION:
+            if not row or not row[0].strip():
+                continue
+        else:
+            continue
+        yield section, reader.line_num, row
+
+
+def parse_performance_row(row, default_sort_order):
+    """把各版本备份格式的业绩数据行统一解析为一条记录
+
+    支持四种格式：
+    - 编号,姓名,时期,左区业绩,右区业绩,左区订单,右区订单,左区增长%,右区增长%,总增长%
+    - 姓名,时期,左区业绩,右区业绩,左区订单,右区订单,左区增长%,右区增长%,总增长%
+    - 以上两种缺少总增长%（或增长率）的旧数据
+    返回 (name, period, left_perf, right_perf, left_orders, right_orders,
+          left_growth_pct, right_growth_pct, total_growth_pct, sort_order)，格式无效时抛出 ValueError。
+    """
+    if len(row) < 8:
+        raise ValueError(f"列数不足（{len(row)}列）")
+
+    if row[0].isdigit():
+        # 带编号的新格式，编号从1开始，sort_order从0开始
+        sort_order = int(row[0]) - 1
+        fields = row[1:]
+    else:
+        sort_order = default_sort_order  # 使用行序号作为排序
+        fields = row
+
+    if len(fields) < 7:
+        raise ValueError(f"列数不足（{len(row)}列）")
+
+    # 增长率列可能缺失或为空，按0处理
+    growth = [float(value) if value.strip() else 0.0 for value in fields[6:9]]
+    growth.extend([0.0] * (3 - len(growth)))
+
+    return (fields[0], fields[1], float(fields[2]), float(fields[3]), int(fields[4]), int(fields[5]),
+            growth[0], growth[1], growth[2], sort_order)
+
+
+class DataVersion:
+    """数据版本号，可由同一数据库的多个连接共享
+
+    任一连接提交写操作后递增，各连接的查询缓存以此判断是否失效。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def bump(self):
+        with self._lock:
+            self.value += 1
+            return self.value
+
+
+def print_migration_progress(done, total, description):
+    """在控制台显示数据库结构升级进度"""
+    print(f"升级数据库结构 ({done}/{total}): {description}")
+
+
 class DatabaseManager:
     """负责所有数据库操作"""
-    def __init__(self, db_name="performance.db"):
+    # 时期快照（记录和总结）LRU 缓存保留的时期数
+    PERIOD_SNAPSHOT_CACHE_SIZE = 16
+
+    def __init__(self, db_name="performance.db", backup_file="performance_backup.csv", backup_delay=2.0,
+                 migration_progress=None, connection_profile=None, data_version=None, backup_scheduler=None):
         self.db_path = Path(db_name)
-        self.conn = sqlite3.connect(self.db_path)
+        # 升级旧数据库时的进度回调 progress(已完成步骤数, 需执行步骤数, 步骤说明)
+        self.migration_progress = migration_progress or print_migration_progress
+        # connection_profile 为配置名或设置字典（见 connection_profile.py），None 时使用默认配置
+        self.conn, self.connection_settings = connect(self.db_path, connection_profile)
         self.cursor = self.conn.cursor()
+
+        # 数据版本号：每次提交写操作后递增，查询缓存以此判断是否失效；
+        # open_secondary() 打开的连接共享同一个版本号，任一连接的写入都会使所有连接的缓存失效
+        self.version_registry = data_version or DataVersion()
+        self._lookup_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # 时期快照缓存：存储格式的时期 -> (记录, 总结)，按最近使用排序，整体随数据版本号失效
+        self._snapshot_cache = OrderedDict()
+        self._snapshot_version = None
+        self.snapshot_hits = 0
+        self.snapshot_misses = 0
+
         self.create_tables()
 
-    def create_tables(self):
-        """创建数据库表（如果不存在）"""
-        # 业绩数据表，使用复合主键(name, period)确保唯一性
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance (
-                name TEXT NOT NULL,
-                period TEXT NOT NULL,
-                left_perf REAL DEFAULT 0,
-                right_perf REAL DEFAULT 0,
-                left_orders INTEGER DEFAULT 0,
-                right_orders INTEGER DEFAULT 0,
-                left_growth_pct REAL DEFAULT 0,
-                right_growth_pct REAL DEFAULT 0,
-                total_growth_pct REAL DEFAULT 0,
-                position TEXT DEFAULT '',
-                sort_order INTEGER DEFAULT 0,
-                PRIMARY KEY (name, period)
-            )
-        ''')
-        # 时期总结表
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS summaries (
-                period TEXT PRIMARY KEY,
-                summary_text TEXT
-            )
-        ''')
-        
-        # 所有人员姓名表
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS all_names (
-                name TEXT PRIMARY KEY,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active INTEGER DEFAULT 1
-            )
-        ''')
-        
-        # 检查是否需要添加新列（兼容旧数据库）
-        self.cursor.execute("PRAGMA table_info(performance)")
-        columns = [row[1] for row in self.cursor.fetchall()]
-        if 'left_growth_pct' not in columns:
-            self.cursor.execute('ALTER TABLE performance ADD COLUMN left_growth_pct REAL DEFAULT 0')
-        if 'right_growth_pct' not in columns:
-            self.cursor.execute('ALTER TABLE performance ADD COLUMN right_growth_pct REAL DEFAULT 0')
-        if 'total_growth_pct' not in columns:
-            self.cursor.execute('ALTER TABLE performance ADD COLUMN total_growth_pct REAL DEFAULT 0')
-        if 'position' not in columns:
-            self.cursor.execute('ALTER TABLE performance ADD COLUMN position TEXT DEFAULT ""')
-        if 'sort_order' not in columns:
-            self.cursor.execute('ALTER TABLE performance ADD COLUMN sort_order INTEGER DEFAULT 0')
-        
+        # 自动备份由后台线程在写入停止 backup_delay 秒后合并执行；
+        # 内存数据库无法被其他连接读取，backup_delay 为 None 时也改为同步备份
+        self.backup_file = os.path.abspath(backup_file)
+        # 传入的 backup_scheduler 由创建它的连接负责停止
+        self.backup_scheduler = backup_scheduler
+        self._owns_backup_scheduler = backup_scheduler is None
+        if backup_scheduler is None and backup_delay is not None and str(db_name) != ':memory:':
+            self.backup_scheduler = BackupScheduler(
+                partial(export_database_file, str(self.db_path), self.backup_file), backup_delay)
+
+    @property
+    def data_version(self):
+        return self.version_registry.value
+
+    def open_secondary(self):
+        """在调用线程中打开同一数据库的另一个连接，供后台查询线程使用
+
+        新连接使用相同的连接配置，并共享数据版本号和自动备份调度器。
+        内存数据库无法被其他连接访问，抛出 ValueError。
+        """
+        if str(self.db_path) == ':memory:':
+            raise ValueError("内存数据库不能打开第二个连接")
+        return DatabaseManager(self.db_path, self.backup_file, backup_delay=None,
+                               migration_progress=self.migration_progress,
+                               connection_profile=self.connection_settings,
+                               data_version=self.version_registry,
+                               backup_scheduler=self.backup_scheduler)
+
+    def _commit(self):
+        """提交事务并递增数据版本号，使查询缓存失效"""
         self.conn.commit()
-        
-        # 初始化ALL_NAMES表
-        self.initialize_all_names()
+        self.version_registry.bump()
+
+    def _cached_lookup(self, key, loader):
+        """读取缓存的查询结果，数据版本号变化后重新调用 loader 查询"""
+        entry = self._lookup_cache.get(key)
+        if entry is not None and entry[0] == self.data_version:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            entry = (self.data_version, loader())
+            self._lookup_cache[key] = entry
+        # 返回副本，调用方修改列表不会影响缓存
+        return list(entry[1])
+
+    def get_connection_settings(self):
+        """返回数据库连接实际生效的配置（日志模式、同步级别、缓存大小等）"""
+        return read_settings(self.conn, self.connection_settings)
+
+    def describe_connection_settings(self):
+        """返回数据库连接配置的说明文字，用于关于对话框"""
+        return describe_settings(self.get_connection_settings())
+
+    def get_cache_stats(self):
+        """返回查询缓存和时期快照缓存的命中/未命中次数以及当前数据版本号"""
+        return {'hits': self.cache_hits, 'misses': self.cache_misses,
+                'snapshot_hits': self.snapshot_hits, 'snapshot_misses': self.snapshot_misses,
+                'data_version': self.data_version}
+
+    def create_tables(self):
+        """创建或升级数据库表结构
+
+        结构版本记录在 PRAGMA user_version 中，已是最新版本时只读取一次版本号；
+        旧版本的数据库在一个事务中按顺序执行 migrations.py 中尚未执行的迁移步骤。
+        """
+        migrate(self.conn, self.migration_progress)
 
     def initialize_all_names(self):
         """初始化ALL_NAMES表，从现有的performance数据中提取所有姓名"""
-        # 获取performance表中的所有不重复姓名
-        self.cursor.execute("SELECT DISTINCT name FROM performance WHERE name IS NOT NULL AND name != ''")
-        existing_names = [row[0] for row in self.cursor.fetchall()]
-        
-        # 将这些姓名添加到all_names表（如果不存在）
-        for name in existing_names:
-            self.add_name_to_all_names(name)
+        self._register_names_from_performance()
+        self._commit()
         
-        print(f"初始化ALL_NAMES表完成，包含 {len(existing_names)} 个姓名")
+        self.cursor.execute("SELECT COUNT(*) FROM all_names")
+        print(f"初始化ALL_NAMES表完成，包含 {self.cursor.fetchone()[0]} 个姓名")
+
+    def _register_names_from_performance(self):
+        """用一条 INSERT OR IGNORE ... SELECT DISTINCT 把performance中的姓名登记到ALL_NAMES表
+
+        不提交事务，返回新增的姓名数。姓名去除首尾空白（包括全角空格）后登记。
+        """
+        self.cursor.execute(f"""
+            INSERT OR IGNORE INTO all_names (name, is_active)
+            SELECT DISTINCT TRIM(name, {NAME_TRIM_CHARS}), 1 FROM performance
+            WHERE name IS NOT NULL AND TRIM(name, {NAME_TRIM_CHARS}) != ''
+        """)
+        return self.cursor.rowcount
 
     def add_name_to_all_names(self, name):
         """添加姓名到ALL_NAMES表"""
@@ -89,7 +401,7 @@ class DatabaseManager:
                 INSERT OR IGNORE INTO all_names (name, is_active) 
                 VALUES (?, 1)
             """, (name,))
-            self.conn.commit()
+            self._commit()
             return True
         except Exception as e:
             print(f"添加姓名到ALL_NAMES失败: {e}")
@@ -97,6 +409,9 @@ class DatabaseManager:
 
     def get_all_names(self, active_only=True):
         """获取所有姓名列表，开头包含空白选项"""
+        return self._cached_lookup(('all_names', active_only), lambda: self._query_all_names(active_only))
+
+    def _query_all_names(self, active_only):
         if active_only:
             self.cursor.execute("SELECT name FROM all_names WHERE is_active = 1 ORDER BY name")
         else:
@@ -108,12 +423,12 @@ class DatabaseManager:
     def deactivate_name(self, name):
         """停用姓名（不删除，只标记为非活跃）"""
         self.cursor.execute("UPDATE all_names SET is_active = 0 WHERE name = ?", (name,))
-        self.conn.commit()
+        self._commit()
 
     def activate_name(self, name):
         """激活姓名"""
         self.cursor.execute("UPDATE all_names SET is_active = 1 WHERE name = ?", (name,))
-        self.conn.commit()
+        self._commit()
 
     def rename_person(self, old_name, new_name):
         """重命名人员，将数据库中所有出现的旧名字替换为新名字"""
@@ -127,12 +442,19 @@ class DatabaseManager:
             return True  # 名字相同，无需操作
         
         try:
-            # 1. 更新performance表中的所有记录
-            self.cursor.execute("""
-                UPDATE performance 
-                SET name = ? 
-                WHERE name = ?
-            """, (new_name, old_name))
+            # 1. 姓名只保存在person表中，改名只需更新一行
+            self.cursor.execute("SELECT id FROM person WHERE name = ?", (new_name,))
+            existing = self.cursor.fetchone()
+            if existing is None:
+                self.cursor.execute("UPDATE person SET name = ? WHERE name = ?", (new_name, old_name))
+            else:
+                # 新名字已有业绩记录，把旧名字的记录合并过去（同一时期都有记录时失败并回滚）
+                self.cursor.execute("""
+                    UPDATE performance_fact
+                    SET person_id = ?
+                    WHERE person_id = (SELECT id FROM person WHERE name = ?)
+                """, (existing[0], old_name))
+                self.cursor.execute("DELETE FROM person WHERE name = ?", (old_name,))
             
             # 2. 更新all_names表
             # 首先检查新名字是否已存在
@@ -151,7 +473,7 @@ class DatabaseManager:
                     WHERE name = ?
                 """, (old_name,))
             
-            self.conn.commit()
+            self._commit()
             
             # 3. 重新计算新名字人员的增长率
             self.recalculate_person_growth_rates(new_name)
@@ -164,16 +486,8 @@ class DatabaseManager:
 
     def update_all_names_from_performance(self):
         """从performance表更新ALL_NAMES，确保performance中的姓名都在ALL_NAMES中"""
-        self.cursor.execute("SELECT DISTINCT name FROM performance WHERE name IS NOT NULL AND name != ''")
-        performance_names = [row[0] for row in self.cursor.fetchall()]
-        
-        new_names_count = 0
-        for name in performance_names:
-            # 检查是否已存在
-            self.cursor.execute("SELECT COUNT(*) FROM all_names WHERE name = ?", (name,))
-            if self.cursor.fetchone()[0] == 0:
-                self.add_name_to_all_names(name)
-                new_names_count += 1
+        new_names_count = self._register_names_from_performance()
+        self._commit()
         
         if new_names_count > 0:
             print(f"从performance表新增 {new_names_count} 个姓名到ALL_NAMES")
@@ -187,7 +501,7 @@ class DatabaseManager:
             SELECT period, left_perf, right_perf 
             FROM performance 
             WHERE name = ? 
-            ORDER BY period ASC
+            ORDER BY period_key ASC, period ASC
         """, (name,))
         
         history = self.cursor.fetchall()
@@ -210,11 +524,6 @@ class DatabaseManager:
         # 取前一期数据作为基准
         prev_period, prev_left, prev_right = history[current_index - 1]
         
-        def calc_growth(current, previous):
-            if previous == 0:
-                return 100.0 if current > 0 else 0.0
-            return ((current - previous) / previous) * 100.0
-        
         left_growth = calc_growth(left_perf, prev_left)
         right_growth = calc_growth(right_perf, prev_right)
         total_growth = calc_growth(left_perf + right_perf, prev_left + prev_right)
@@ -223,188 +532,371 @@ class DatabaseManager:
 
     def recalculate_all_growth_rates(self):
         """重新计算所有人员的增长率"""
-        # 获取所有不重复的姓名
-        self.cursor.execute("SELECT DISTINCT name FROM performance ORDER BY name")
-        names = [row[0] for row in self.cursor.fetchall()]
-        
+        self._recalculate_growth_rates()
+        self._commit()
+
+    def recalculate_person_growth_rates(self, name):
+        """重新计算特定人员的增长率"""
+        self._recalculate_growth_rates(name)
+        self._commit()
+
+    def _recalculate_growth_rates(self, name=None):
+        """按人员分区、时期排序整体计算增长率（不提交事务）
+
+        SQLite 3.33+ 使用一条 UPDATE ... FROM 窗口函数语句完成；3.25~3.32 用窗口函数
+        查询后批量写回；更旧的版本在Python中逐行计算后批量写回。
+        """
+        where = "WHERE name = ?" if name is not None else ""
+        params = (name,) if name is not None else ()
+
+        # 增长率直接写入事实表，不经过 performance 视图的触发器
+        if SQLITE_HAS_UPDATE_FROM:
+            self.cursor.execute(f"""
+                UPDATE performance_fact
+                SET left_growth_pct = g.left_growth,
+                    right_growth_pct = g.right_growth,
+                    total_growth_pct = g.total_growth
+                FROM ({GROWTH_WINDOW_SQL.format(where=where)}) AS g
+                WHERE performance_fact.person_id = g.person_id AND performance_fact.period_id = g.period_id
+                  AND (performance_fact.left_growth_pct IS NOT g.left_growth
+                       OR performance_fact.right_growth_pct IS NOT g.right_growth
+                       OR performance_fact.total_growth_pct IS NOT g.total_growth)
+            """, params)
+            return
+
+        if SQLITE_HAS_WINDOW:
+            self.cursor.execute(GROWTH_WINDOW_SQL.format(where=where), params)
+            updates = [(left, right, total, person_id, period_id)
+                       for person_id, period_id, left, right, total in self.cursor.fetchall()]
+        else:
+            self.cursor.execute(f"""
+                SELECT person_id, period_id, left_perf, right_perf
+                FROM performance {where}
+                ORDER BY person_id ASC, period_key ASC, period ASC
+            """, params)
+            updates = []
+            prev_person = prev = None
+            for person_id, period_id, left_perf, right_perf in self.cursor.fetchall():
+                if person_id != prev_person:
+                    # 第一条记录，增长率为0
+                    growth = (0.0, 0.0, 0.0)
+                else:
+                    prev_left, prev_right = prev
+                    growth = (calc_growth(left_perf, prev_left),
+                              calc_growth(right_perf, prev_right),
+                              calc_growth(left_perf + right_perf, prev_left + prev_right))
+                updates.append(growth + (person_id, period_id))
+                prev_person, prev = person_id, (left_perf, right_perf)
+
+        self.cursor.executemany(GROWTH_UPDATE_SQL, updates)
+
+    def recalculate_growth_rates_around(self, period, names):
+        """增量重新计算增长率：只处理指定人员在该时期及其下一期的记录
+
+        period 为数据库中保存的时期格式。该方法不提交事务，由调用方统一提交。
+        """
+        key = period_to_key(period)
+        if key is None:
+            # 无法解析的时期没有时期键，退回到按人员整体重新计算
+            for name in names:
+                self._recalculate_growth_rates(name)
+            return
+
+        updates = []
         for name in names:
-            # 获取该人员的所有记录，按时期正序排序
+            # 该人员在本时期之前的最近一期，作为增长率基准
             self.cursor.execute("""
-                SELECT period, left_perf, right_perf, left_orders, right_orders 
-                FROM performance 
-                WHERE name = ? 
-                ORDER BY period ASC
-            """, (name,))
-            
-            records = self.cursor.fetchall()
-            
-            for i, (period, left_perf, right_perf, left_orders, right_orders) in enumerate(records):
-                if i == 0:
+                SELECT left_perf, right_perf
+                FROM performance
+                WHERE name = ? AND period_key < ?
+                ORDER BY period_key DESC LIMIT 1
+            """, (name, key))
+            prev = self.cursor.fetchone()
+
+            # 本时期及其后的一期（若本时期已无记录，则只取下一期）
+            self.cursor.execute("""
+                SELECT period_key, person_id, period_id, left_perf, right_perf
+                FROM performance
+                WHERE name = ? AND period_key >= ?
+                ORDER BY period_key ASC LIMIT 2
+            """, (name, key))
+            rows = self.cursor.fetchall()
+            if rows and rows[0][0] != key:
+                rows = rows[:1]
+
+            for _, person_id, period_id, left_perf, right_perf in rows:
+                if prev is None:
                     # 第一条记录，增长率为0
-                    left_growth = right_growth = total_growth = 0.0
+                    growth = (0.0, 0.0, 0.0)
                 else:
-                    # 计算相对于前一期的增长率
-                    prev_period, prev_left, prev_right, _, _ = records[i - 1]
-                    
-                    def calc_growth(current, previous):
-                        if previous == 0:
-                            return 100.0 if current > 0 else 0.0
-                        return ((current - previous) / previous) * 100.0
-                    
-                    left_growth = calc_growth(left_perf, prev_left)
-                    right_growth = calc_growth(right_perf, prev_right)
-                    total_growth = calc_growth(left_perf + right_perf, prev_left + prev_right)
-                
-                # 更新增长率
-                self.cursor.execute("""
-                    UPDATE performance 
-                    SET left_growth_pct = ?, right_growth_pct = ?, total_growth_pct = ? 
-                    WHERE name = ? AND period = ?
-                """, (left_growth, right_growth, total_growth, name, period))
-        
-        self.conn.commit()
+                    prev_left, prev_right = prev
+                    growth = (calc_growth(left_perf, prev_left),
+                              calc_growth(right_perf, prev_right),
+                              calc_growth(left_perf + right_perf, prev_left + prev_right))
+                updates.append(growth + (person_id, period_id))
+                prev = (left_perf, right_perf)
 
-    def recalculate_person_growth_rates(self, name):
-        """重新计算特定人员的增长率"""
-        # 获取该人员的所有记录，按时期正序排序
-        self.cursor.execute("""
-            SELECT period, left_perf, right_perf, left_orders, right_orders 
-            FROM performance 
-            WHERE name = ? 
-            ORDER BY period ASC
-        """, (name,))
-        
-        records = self.cursor.fetchall()
-        
-        for i, (period, left_perf, right_perf, left_orders, right_orders) in enumerate(records):
-            if i == 0:
-                # 第一条记录，增长率为0
-                left_growth = right_growth = total_growth = 0.0
-            else:
-                # 计算相对于前一期的增长率
-                prev_period, prev_left, prev_right, _, _ = records[i - 1]
-                
-                def calc_growth(current, previous):
-                    if previous == 0:
-                        return 100.0 if current > 0 else 0.0
-                    return ((current - previous) / previous) * 100.0
-                
-                left_growth = calc_growth(left_perf, prev_left)
-                right_growth = calc_growth(right_perf, prev_right)
-                total_growth = calc_growth(left_perf + right_perf, prev_left + prev_right)
-            
-            # 更新增长率
-            self.cursor.execute("""
-                UPDATE performance 
-                SET left_growth_pct = ?, right_growth_pct = ?, total_growth_pct = ? 
-                WHERE name = ? AND period = ?
-            """, (left_growth, right_growth, total_growth, name, period))
-        
-        self.conn.commit()
+        self.cursor.executemany(GROWTH_UPDATE_SQL, updates)
+        return len(updates)
 
     def save_period_data(self, period, data_list):
         """保存一个时期的所有人员数据，使用INSERT OR REPLACE进行插入或更新"""
-        # 如果是新格式，转换为旧格式保存
-        original_period = period
-        if "上" in period:
-            original_period = period.replace("上", "First Half")
-        elif "下" in period:
-            original_period = period.replace("下", "Second Half")
+        # 统一为数据库保存的时期写法（界面格式、月份不补零等写法都会转换）
+        original_period = normalize_period(period)
         
+        key = period_to_key(original_period)
+        condition, param = self._period_condition(original_period)
+
+        # 记录该时期原有的人员，被移出本期的人员其下一期增长率同样需要重算
+        self.cursor.execute(f"SELECT name FROM performance WHERE {condition}", (param,))
+        affected_names = {row[0] for row in self.cursor.fetchall()}
+
         # 首先删除该时期的所有现有数据
-        self.cursor.execute("DELETE FROM performance WHERE period = ?", (original_period,))
-            
-        for i, d in enumerate(data_list):
-            # 确保姓名存在于ALL_NAMES中
-            self.add_name_to_all_names(d['name'])
+        self.cursor.execute(f"DELETE FROM performance WHERE {condition}", (param,))
             
-            query = '''
-                INSERT INTO performance 
-                (name, period, left_perf, right_perf, left_orders, right_orders, 
-                 left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order) 
-                VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0, ?, ?)
-            '''
-            position = d.get('position', '')
-            sort_order = d.get('sort_order', i)
-            self.cursor.execute(query, (
-                d['name'], original_period, d['left_perf'], d['right_perf'], 
-                d['left_orders'], d['right_orders'], position, sort_order
-            ))
-        self.conn.commit()
+        # 确保姓名存在于ALL_NAMES中
+        self._register_names(d['name'] for d in data_list)
         
-        # 保存完成后，重新计算所有人员的增长率
-        self.recalculate_all_growth_rates()
+        self.cursor.executemany('''
+            INSERT INTO performance 
+            (name, period, left_perf, right_perf, left_orders, right_orders, 
+             left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order, period_key) 
+            VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0, ?, ?, ?)
+        ''', [(d['name'], original_period, d['left_perf'], d['right_perf'], d['left_orders'], d['right_orders'],
+               d.get('position', ''), d.get('sort_order', i), key)
+              for i, d in enumerate(data_list)])
+        affected_names.update(d['name'] for d in data_list)
+        
+        # 只重新计算受影响人员在本期及下一期的增长率，与写入在同一事务中提交
+        self.recalculate_growth_rates_around(original_period, affected_names)
+        self._commit()
         
         # 自动备份到CSV
-        self.export_to_csv("performance_backup.csv")
+        self.schedule_backup()
     
+    def apply_period_changes(self, period, upserts=(), deletes=(), sort_orders=(), summary=None):
+        """在一个事务中只写入按时期编辑产生的修改，返回写入的记录数
+
+        upserts: 新增或修改过的记录（字段与 save_period_data 相同）
+        deletes: 从该时期删除的姓名
+        sort_orders: 只调整了顺序的 (姓名, sort_order)
+        summary: 修改后的时期总结，None 表示总结未修改（不计入返回的记录数）
+        只有新增、修改和删除的人员需要重算增长率，仅调整顺序不影响增长率。
+        """
+        if not (upserts or deletes or sort_orders) and summary is None:
+            return 0
+
+        original_period = normalize_period(period)
+        key = period_to_key(original_period)
+        changed = 0
+        try:
+            if deletes:
+                # 视图上的 INSTEAD OF 触发器不计入 rowcount，用 total_changes 的差值统计
+                before = self.conn.total_changes
+                self.cursor.executemany(f"DELETE FROM performance WHERE name = ? AND {PERIOD_MATCH_SQL}",
+                                        [(name, key, original_period) for name in deletes])
+                changed += self.conn.total_changes - before
+
+            if upserts:
+                self._register_names(d['name'] for d in upserts)
+                self.cursor.executemany('''
+                    INSERT OR REPLACE INTO performance
+                    (name, period, left_perf, right_perf, left_orders, right_orders,
+                     left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order, period_key)
+                    VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0, ?, ?, ?)
+                ''', [(d['name'], original_period, d['left_perf'], d['right_perf'],
+                       d['left_orders'], d['right_orders'], d.get('position', ''), d.get('sort_order', 0), key)
+                      for d in upserts])
+                changed += len(upserts)
+
+            if sort_orders:
+                before = self.conn.total_changes
+                self.cursor.executemany(f"UPDATE performance SET sort_order = ? WHERE name = ? AND {PERIOD_MATCH_SQL}",
+                                        [(sort_order, name, key, original_period) for name, sort_order in sort_orders])
+                changed += self.conn.total_changes - before
+
+            if summary is not None:
+                self.cursor.execute("INSERT OR REPLACE INTO summaries (period, summary_text) VALUES (?, ?)",
+                                    (original_period, summary))
+
+            affected_names = set(deletes) | {d['name'] for d in upserts}
+            if affected_names:
+                self.recalculate_growth_rates_around(original_period, affected_names)
+            self._commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        # 自动备份到CSV
+        self.schedule_backup()
+        return changed
+
+    def update_sort_orders(self, period, sort_orders):
+        """批量更新一个时期内人员的排序 [(姓名, sort_order)]，不重算增长率"""
+        return self.apply_period_changes(period, sort_orders=sort_orders)
+
+    def _register_names(self, names):
+        """把姓名批量登记到ALL_NAMES表，不提交事务"""
+        rows = {(name.strip(),) for name in names if name and name.strip()}
+        if rows:
+            self.cursor.executemany("INSERT OR IGNORE INTO all_names (name, is_active) VALUES (?, 1)", rows)
+
     def save_single_record(self, name, period, left_perf, right_perf, left_orders, right_orders, position='', sort_order=0):
         """保存或更新单个人员记录"""
-        # 如果是新格式，转换为旧格式保存
-        original_period = period
-        if "上" in period:
-            original_period = period.replace("上", "First Half")
-        elif "下" in period:
-            original_period = period.replace("下", "Second Half")
+        # 统一为数据库保存的时期写法（界面格式、月份不补零等写法都会转换）
+        original_period = normalize_period(period)
         
         # 确保姓名存在于ALL_NAMES中
-        self.add_name_to_all_names(name)
+        self._register_names([name])
             
         query = '''
             INSERT OR REPLACE INTO performance 
             (name, period, left_perf, right_perf, left_orders, right_orders,
-             left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order) 
-            VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0, ?, ?)
+             left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order, period_key) 
+            VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0, ?, ?, ?)
         '''
         self.cursor.execute(query, (
-            name, original_period, left_perf, right_perf, left_orders, right_orders, position, sort_order
+            name, original_period, left_perf, right_perf, left_orders, right_orders, position, sort_order,
+            period_to_key(original_period)
         ))
-        self.conn.commit()
+        self._commit()
         
         # 保存完成后，重新计算该人员的增长率
         self.recalculate_person_growth_rates(name)
         
         # 自动备份到CSV
-        self.export_to_csv("performance_backup.csv")
+        self.schedule_backup()
     
+    def save_person_records(self, name, records):
+        """在一个事务中保存一个人员多个时期的记录，返回保存的记录数
+
+        records 中每条记录包含 period、position、left_perf、right_perf、left_orders、right_orders。
+        已有记录保留其在时期内的排序，新增时期的记录排在该时期末尾。
+        保存后只重新计算该人员的增长率，并安排一次自动备份。
+        """
+        if not records:
+            return 0
+
+        rows = [(normalize_period(d['period']), d) for d in records]
+        rows = [(period, period_to_key(period), d) for period, d in rows]
+        try:
+            self._register_names([name])
+            # 新时期的记录先以该时期最大排序+1插入，已有记录保持不变
+            self.cursor.executemany(f'''
+                INSERT OR IGNORE INTO performance
+                (name, period, left_perf, right_perf, left_orders, right_orders,
+                 left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order, period_key)
+                SELECT ?, ?, 0, 0, 0, 0, 0, 0, 0, '', COALESCE(MAX(sort_order) + 1, 0), ?
+                FROM performance WHERE {PERIOD_MATCH_SQL}
+            ''', [(name, period, key, key, period) for period, key, _ in rows])
+            self.cursor.executemany(f'''
+                UPDATE performance
+                SET left_perf = ?, right_perf = ?, left_orders = ?, right_orders = ?, position = ?
+                WHERE name = ? AND {PERIOD_MATCH_SQL}
+            ''', [(d['left_perf'], d['right_perf'], d['left_orders'], d['right_orders'], d.get('position', ''),
+                   name, key, period) for period, key, d in rows])
+
+            self._recalculate_growth_rates(name)
+            self._commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        # 自动备份到CSV
+        self.schedule_backup()
+        return len(rows)
+
     def delete_single_record(self, name, period):
         """删除单个人员记录"""
-        # 如果是新格式，转换为旧格式删除
-        original_period = period
-        if "上" in period:
-            original_period = period.replace("上", "First Half")
-        elif "下" in period:
-            original_period = period.replace("下", "Second Half")
+        # 统一为数据库保存的时期写法（界面格式、月份不补零等写法都会转换）
+        original_period = normalize_period(period)
             
-        self.cursor.execute("DELETE FROM performance WHERE name = ? AND period = ?", (name, original_period))
-        deleted_count = self.cursor.rowcount
-        self.conn.commit()
+        # 视图上的 INSTEAD OF 触发器不计入 rowcount，用 total_changes 的差值统计
+        before = self.conn.total_changes
+        self.cursor.execute(f"DELETE FROM performance WHERE name = ? AND {PERIOD_MATCH_SQL}",
+                            (name, period_to_key(original_period), original_period))
+        deleted_count = self.conn.total_changes - before
+        self._commit()
         
         # 删除后，重新计算该人员的增长率
         if deleted_count > 0:
             self.recalculate_person_growth_rates(name)
             # 自动备份到CSV
-            self.export_to_csv("performance_backup.csv")
+            self.schedule_backup()
         
         return deleted_count  # 返回被删除的行数
         
     def get_data_by_period(self, period):
         """获取特定时期的数据，按编号顺序排序"""
-        # 如果是新格式，转换为旧格式查询
-        original_period = period
-        if "上" in period:
-            original_period = period.replace("上", "First Half")
-        elif "下" in period:
-            original_period = period.replace("下", "Second Half")
+        # 统一为数据库保存的时期写法（界面格式、月份不补零等写法都会转换）
+        original_period = normalize_period(period)
+        condition, param = self._period_condition(original_period)
             
-        self.cursor.execute("""
+        self.cursor.execute(f"""
             SELECT name, left_perf, right_perf, left_orders, right_orders, 
                    left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order
-            FROM performance WHERE period = ? 
+            FROM performance WHERE {condition} 
             ORDER BY sort_order ASC, name ASC
-        """, (original_period,))
+        """, (param,))
         return self.cursor.fetchall()
 
+    def get_matrix_cells(self, metric='total', names=None, position=None):
+        """一次读取一组人员全部记录的一项指标，用于整理人员 × 时期矩阵（图表用）
+
+        metric 为 'total'（总业绩）、'left'、'right' 或 'growth'（总增长率）。
+        names 为姓名列表时只读取这些人员，position 不为 None 时只读取最近一期职级为 position 的人员，
+        都不指定时读取全部人员。返回 (人员, 时期, 记录)：
+        人员为 [(id, 姓名)]；时期为 [(id, 界面格式的时期)]，按时期从早到晚排序；
+        记录为 [(人员id, 时期id, 指标值)]，直接读取事实表，不经过视图的连接。
+        """
+        if names is not None:
+            person_filter, params = f"WHERE name IN ({', '.join('?' * len(names))})", list(names)
+        elif position is not None:
+            person_filter, params = f"WHERE id IN (SELECT person_id FROM ({CURRENT_POSITION_SQL}) WHERE position = ?)", [position]
+        else:
+            person_filter, params = "", []
+        self.cursor.execute(f"SELECT id, name FROM person {person_filter} ORDER BY id", params)
+        persons = self.cursor.fetchall()
+        # 无法解析的旧时期没有时期键，排在最后
+        self.cursor.execute("SELECT id, period FROM period ORDER BY period_key IS NULL, period_key, period")
+        periods = [(period_id, to_display_period(period)) for period_id, period in self.cursor.fetchall()]
+        cell_filter = f"WHERE person_id IN (SELECT id FROM person {person_filter})" if person_filter else ""
+        self.cursor.execute(f"SELECT person_id, period_id, {MATRIX_METRICS[metric]} FROM performance_fact {cell_filter}",
+                            params)
+        return persons, periods, self.cursor.fetchall()
+
+    def _period_condition(self, period):
+        """返回按时期筛选的SQL条件及参数，能解析的时期使用整数时期键索引"""
+        key = period_to_key(period)
+        if key is None:
+            return "period = ?", period
+        return "period_key = ?", key
+
+    def get_period_ranking(self, period, metric='total', limit=20, offset=0):
+        """按业绩指标读取时期内第 offset+1 名起的 limit 人（图表用）
+
+        metric 为 'left'、'right' 或 'total'。返回 (名次记录, 时期合计)：
+        名次记录为 [(名次, 姓名, 左区业绩, 右区业绩)]，时期合计为 (人数, 左区合计, 右区合计)。
+        排序沿排名索引读取，只读取本页的记录，读取量与本页人数有关而与时期总人数无关；
+        名次相同的人员按人员id排序，翻页时顺序稳定。
+        """
+        order = RANKING_METRICS[metric]
+        condition, param = self._period_condition(to_storage_period(period))
+        period_id = f"(SELECT id FROM period WHERE {condition})"
+        self.cursor.execute(f"""
+            SELECT p.name, f.left_perf, f.right_perf
+            FROM performance_fact AS f JOIN person AS p ON p.id = f.person_id
+            WHERE f.period_id = {period_id}
+            ORDER BY {order} DESC, f.person_id DESC
+            LIMIT ? OFFSET ?
+        """, (param, limit, offset))
+        rows = [(offset + i + 1,) + row for i, row in enumerate(self.cursor.fetchall())]
+        self.cursor.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(left_perf), 0), COALESCE(SUM(right_perf), 0)
+            FROM performance_fact WHERE period_id = {period_id}
+        """, (param,))
+        return rows, self.cursor.fetchone()
+
     def get_all_data_by_name(self, name):
         """获取特定人员的所有时期完整数据，按时期从新到旧排序"""
         self.cursor.execute("""
@@ -412,7 +904,7 @@ class DatabaseManager:
                    left_growth_pct, right_growth_pct, total_growth_pct, position
             FROM performance 
             WHERE name = ? 
-            ORDER BY period DESC
+            ORDER BY period_key DESC, period DESC
         """, (name,))
         data = self.cursor.fetchall()
         # 转换时期格式显示
@@ -423,300 +915,328 @@ class DatabaseManager:
             converted_data.append(converted_row)
         return converted_data
 
-    def get_data_by_name(self, name):
-        """获取特定人员的所有时期数据，按时期排序（图表用）"""
-        self.cursor.execute("SELECT period, left_perf, right_perf FROM performance WHERE name = ? ORDER BY period", (name,))
+    def get_data_by_name(self, name, start_period=None, end_period=None):
+        """获取特定人员的所有时期数据，按时期排序（图表用）
+
+        可以用 start_period / end_period 限定时期范围（包含两端），两种时期格式均可。
+        """
+        conditions = ["name = ?"]
+        params = [name]
+        for period, op in ((start_period, ">="), (end_period, "<=")):
+            key = period_to_key(period) if period else None
+            if key is not None:
+                conditions.append(f"period_key {op} ?")
+                params.append(key)
+        self.cursor.execute(f"""
+            SELECT period, left_perf, right_perf FROM performance
+            WHERE {' AND '.join(conditions)}
+            ORDER BY period_key, period
+        """, params)
         return self.cursor.fetchall()
 
     def get_distinct_names(self):
         """获取所有不重复的姓名列表"""
-        self.cursor.execute("SELECT DISTINCT name FROM performance ORDER BY name")
+        return self._cached_lookup('distinct_names', self._query_distinct_names)
+
+    def _query_distinct_names(self):
+        # 直接读取人员维度表，只保留仍有业绩记录的人员
+        self.cursor.execute("""
+            SELECT name FROM person AS p
+            WHERE EXISTS (SELECT 1 FROM performance_fact WHERE person_id = p.id)
+            ORDER BY name
+        """)
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def get_distinct_positions(self):
+        """获取各人员最近一期的职级列表（不含空职级），按职级排序"""
+        return self._cached_lookup('distinct_positions', self._query_distinct_positions)
+
+    def _query_distinct_positions(self):
+        self.cursor.execute(f"""
+            SELECT DISTINCT position FROM ({CURRENT_POSITION_SQL})
+            WHERE position != '' ORDER BY position
+        """)
         return [row[0] for row in self.cursor.fetchall()]
 
     def convert_period_format(self, period):
         """将时期格式从旧格式转换为新格式"""
-        if "First Half" in period:
-            return period.replace("First Half", "上")
-        elif "Second Half" in period:
-            return period.replace("Second Half", "下")
-        return period
+        return to_display_period(period)
 
     def get_distinct_periods(self):
-        """获取所有不重复的时期列表，转换格式"""
-        self.cursor.execute("SELECT DISTINCT period FROM performance ORDER BY period DESC")
-        periods = [row[0] for row in self.cursor.fetchall()]
-        # 转换时期格式
-        converted_periods = [self.convert_period_format(period) for period in periods]
-        return converted_periods
+        """获取所有不重复的时期列表（界面格式），按时期从新到旧排序"""
+        return self._cached_lookup('distinct_periods', self._query_distinct_periods)
+
+    def _query_distinct_periods(self):
+        # 直接读取时期维度表，只保留仍有业绩记录的时期
+        self.cursor.execute("""
+            SELECT DISTINCT period_key FROM period AS d
+            WHERE period_key IS NOT NULL
+              AND EXISTS (SELECT 1 FROM performance_fact WHERE period_id = d.id)
+            ORDER BY period_key DESC
+        """)
+        periods = [key_to_period(row[0], display=True) for row in self.cursor.fetchall()]
+        # 无法解析的旧时期没有时期键，按原文附在最后
+        self.cursor.execute("""
+            SELECT period FROM period AS d
+            WHERE period_key IS NULL
+              AND EXISTS (SELECT 1 FROM performance_fact WHERE period_id = d.id)
+            ORDER BY period DESC
+        """)
+        periods.extend(to_display_period(row[0]) for row in self.cursor.fetchall())
+        return periods
 
     def get_latest_performance_period(self):
         """获取PERFORMANCE_DATA表中的最新时期（不包括SUMMARY_DATA）"""
-        self.cursor.execute("SELECT DISTINCT period FROM performance ORDER BY period DESC LIMIT 1")
+        self.cursor.execute("""
+            SELECT period FROM period AS d
+            WHERE period_key IS NOT NULL
+              AND EXISTS (SELECT 1 FROM performance_fact WHERE period_id = d.id)
+            ORDER BY period_key DESC LIMIT 1
+        """)
         result = self.cursor.fetchone()
         return result[0] if result else None
 
     def save_summary(self, period, text):
         """保存或更新时期总结"""
-        # 如果是新格式，转换为旧格式保存
-        original_period = period
-        if "上" in period:
-            original_period = period.replace("上", "First Half")
-        elif "下" in period:
-            original_period = period.replace("下", "Second Half")
+        # 统一为数据库保存的时期写法（界面格式、月份不补零等写法都会转换）
+        original_period = normalize_period(period)
             
         self.cursor.execute("INSERT OR REPLACE INTO summaries (period, summary_text) VALUES (?, ?)", (original_period, text))
-        self.conn.commit()
+        self._commit()
         
         # 自动备份到CSV
-        self.export_to_csv("performance_backup.csv")
+        self.schedule_backup()
+
+    def get_period_snapshot(self, period):
+        """一次读取时期的全部记录和总结，返回 (get_data_by_period 的结果, 总结)
+
+        最近读取的时期保存在 LRU 缓存中，任何连接提交写操作后整体失效。
+        """
+        original_period = normalize_period(period)
+        snapshot = self._cached_snapshot(original_period)
+        if snapshot is None:
+            self.snapshot_misses += 1
+            snapshot = self._load_snapshot(original_period)
+        else:
+            self.snapshot_hits += 1
+        # 返回记录列表的副本，调用方修改列表不会影响缓存
+        return list(snapshot[0]), snapshot[1]
+
+    def prefetch_adjacent_periods(self, period, distance=1):
+        """把前后各 distance 个半月的时期快照预先读入缓存，返回实际读取的时期数"""
+        key = period_to_key(to_storage_period(period))
+        if key is None:
+            return 0
+        loaded = 0
+        for offset in range(1, distance + 1):
+            for neighbour_key in (shift_period_key(key, -offset), shift_period_key(key, offset)):
+                neighbour = key_to_period(neighbour_key)
+                if self._cached_snapshot(neighbour, touch=False) is None:
+                    self._load_snapshot(neighbour)
+                    loaded += 1
+        return loaded
+
+    def _cached_snapshot(self, original_period, touch=True):
+        """读取缓存的时期快照，数据版本号变化后清空缓存并返回 None"""
+        if self._snapshot_version != self.data_version:
+            self._snapshot_cache.clear()
+            return None
+        snapshot = self._snapshot_cache.get(original_period)
+        if snapshot is not None and touch:
+            self._snapshot_cache.move_to_end(original_period)
+        return snapshot
+
+    def _load_snapshot(self, original_period):
+        # 查询前记下版本号，查询期间其他连接的写入会使这次结果在下次读取时失效
+        version = self.data_version
+        snapshot = (self.get_data_by_period(original_period), self.get_summary(original_period))
+        if self._snapshot_version != version:
+            self._snapshot_cache.clear()
+            self._snapshot_version = version
+        self._snapshot_cache[original_period] = snapshot
+        self._snapshot_cache.move_to_end(original_period)
+        while len(self._snapshot_cache) > self.PERIOD_SNAPSHOT_CACHE_SIZE:
+            self._snapshot_cache.popitem(last=False)
+        return snapshot
 
     def get_summary(self, period):
         """获取时期总结"""
-        # 如果是新格式，转换为旧格式查询
-        original_period = period
-        if "上" in period:
-            original_period = period.replace("上", "First Half")
-        elif "下" in period:
-            original_period = period.replace("下", "Second Half")
+        # 统一为数据库保存的时期写法（界面格式、月份不补零等写法都会转换）
+        original_period = normalize_period(period)
             
         self.cursor.execute("SELECT summary_text FROM summaries WHERE period = ?", (original_period,))
         result = self.cursor.fetchone()
         return result[0] if result else ""
 
+    def schedule_backup(self):
+        """安排一次自动备份到 performance_backup.csv"""
+        if self.backup_scheduler is None:
+            self.export_to_csv(self.backup_file)
+        else:
+            self.backup_scheduler.request()
+
     def export_to_csv(self, csv_file="performance_backup.csv"):
         """导出所有数据到CSV文件，包含编号"""
-        import csv
-        from datetime import datetime
-        
-        try:
-            # 获取所有业绩数据，按时期和sort_order排序
-            self.cursor.execute("""
-                SELECT name, period, left_perf, right_perf, left_orders, right_orders,
-                       left_growth_pct, right_growth_pct, total_growth_pct, sort_order
-                FROM performance 
-                ORDER BY period ASC, sort_order ASC, name ASC
-            """)
-            performance_data = self.cursor.fetchall()
-            
-            # 获取所有总结数据
-            self.cursor.execute("SELECT period, summary_text FROM summaries ORDER BY period")
-            summary_data = {period: summary for period, summary in self.cursor.fetchall()}
-            
-            with open(csv_file, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
-                
-                # 写入元数据
-                writer.writerow(['# 业绩数据备份文件'])
-                writer.writerow(['# 导出时间:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
-                writer.writerow(['# 数据格式: 编号,姓名,时期,左区业绩,右区业绩,左区订单,右区订单,左区增长%,右区增长%,总增长%'])
-                writer.writerow([])
-                
-                # 写入业绩数据头部
-                writer.writerow(['[PERFORMANCE_DATA]'])
-                writer.writerow(['编号', '姓名', '时期', '左区业绩', '右区业绩', '左区订单', '右区订单', 
-                               '左区增长%', '右区增长%', '总增长%'])
-                
-                # 按时期分组，为每个时期重新编号
-                current_period = None
-                period_number = 0
-                
-                for row in performance_data:
-                    name, period, left_perf, right_perf, left_orders, right_orders, left_growth_pct, right_growth_pct, total_growth_pct, sort_order = row
-                    
-                    # 如果是新的时期，重置编号
-                    if period != current_period:
-                        current_period = period
-                        period_number = 0
-                    
-                    period_number += 1
-                    
-                    # 写入包含编号的数据行
-                    writer.writerow([period_number, name, period, left_perf, right_perf, left_orders, right_orders, 
-                                   left_growth_pct, right_growth_pct, total_growth_pct])
-                
-                writer.writerow([])
-                
-                # 写入总结数据头部
-                writer.writerow(['[SUMMARY_DATA]'])
-                writer.writerow(['时期', '总结内容'])
-                
-                # 写入总结数据
-                for period, summary in summary_data.items():
-                    # 处理总结中的换行符
-                    clean_summary = summary.replace('\n', '\\n').replace('\r', '\\r') if summary else ''
-                    writer.writerow([period, clean_summary])
-            
-            print(f"数据已导出到 {csv_file}")
-            return True
-            
-        except Exception as e:
-            print(f"导出CSV失败: {e}")
-            return False
+        return write_backup_csv(self.conn, csv_file)
+
+    def import_from_csv(self, csv_file="performance_backup.csv", chunk_size=1000):
+        """从CSV文件导入数据
+
+        逐行流式解析文件，按 chunk_size 条一批写入，整个导入在一个事务中完成；
+        导入统计（速度、被拒绝的行）保存在 last_import_report 中。
+        """
+        report = {'performance_count': 0, 'summary_count': 0, 'rejected_count': 0,
+                  'rejected_rows': [], 'seconds': 0.0, 'rows_per_second': 0.0}
+        self.last_import_report = report
+        start_time = time.perf_counter()
+
+        def reject(line_no, reason):
+            report['rejected_count'] += 1
+            if len(report['rejected_rows']) < MAX_REPORTED_REJECTS:
+                report['rejected_rows'].append((line_no, reason))
+            print(f"跳过无效的数据行 {line_no}: {reason}")
 
-    def import_from_csv(self, csv_file="performance_backup.csv"):
-        """从CSV文件导入数据"""
-        import csv
-        
         try:
             if not os.path.exists(csv_file):
                 print(f"CSV文件不存在: {csv_file}")
                 return False
-            
-            with open(csv_file, 'r', encoding='utf-8-sig') as f:
-                reader = csv.reader(f)
-                rows = list(reader)
-            
-            # 查找数据段
-            performance_start = -1
-            summary_start = -1
-            
-            for i, row in enumerate(rows):
-                if row and row[0] == '[PERFORMANCE_DATA]':
-                    performance_start = i + 2  # 跳过标题行
-                elif row and row[0] == '[SUMMARY_DATA]':
-                    summary_start = i + 2  # 跳过标题行
-            
-            if performance_start == -1:
-                print("CSV文件格式错误：找不到业绩数据段")
-                return False
-            
-            # 清空现有数据
+
+            # 清空现有数据（与导入在同一事务中，失败时回滚）
             print("清空现有数据...")
-            self.cursor.execute("DELETE FROM performance")
+            # 直接清空事实表和维度表，不逐行经过 performance 视图的触发器
+            self.cursor.execute("DELETE FROM performance_fact")
+            self.cursor.execute("DELETE FROM person")
+            self.cursor.execute("DELETE FROM period")
             self.cursor.execute("DELETE FROM summaries")
-            
-            # 导入业绩数据
-            print("导入业绩数据...")
-            performance_count = 0
-            for i in range(performance_start, len(rows)):
-                row = rows[i]
-                if not row or row[0].startswith('[') or not row[0].strip():
-                    break
-                
-                if len(row) >= 9:  # 检查是否有足够的列
-                    try:
-                        # 检测CSV格式：是否包含编号列
-                        if len(row) >= 10 and row[0].isdigit():
-                            # 新格式：编号,姓名,时期,左区业绩,右区业绩,左区订单,右区订单,左区增长%,右区增长%,总增长%
-                            number = int(row[0])
-                            name = row[1]
-                            period = row[2]
-                            left_perf = float(row[3])
-                            right_perf = float(row[4])
-                            left_orders = int(row[5])
-                            right_orders = int(row[6])
-                            left_growth_pct = float(row[7])
-                            right_growth_pct = float(row[8])
-                            total_growth_pct = float(row[9])
-                            sort_order = number - 1  # 编号从1开始，sort_order从0开始
-                        else:
-                            # 旧格式：姓名,时期,左区业绩,右区业绩,左区订单,右区订单,左区增长%,右区增长%,总增长%
-                            name = row[0]
-                            period = row[1]
-                            left_perf = float(row[2])
-                            right_perf = float(row[3])
-                            left_orders = int(row[4])
-                            right_orders = int(row[5])
-                            left_growth_pct = float(row[6])
-                            right_growth_pct = float(row[7])
-                            total_growth_pct = float(row[8])
-                            sort_order = performance_count  # 使用行序号作为排序
-                        
-                        self.cursor.execute("""
-                            INSERT INTO performance 
-                            (name, period, left_perf, right_perf, left_orders, right_orders,
-                             left_growth_pct, right_growth_pct, total_growth_pct, sort_order)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (name, period, left_perf, right_perf, left_orders, right_orders,
-                             left_growth_pct, right_growth_pct, total_growth_pct, sort_order))
-                        performance_count += 1
-                    except (ValueError, IndexError) as e:
-                        print(f"跳过无效的业绩数据行 {i+1}: {e}")
-                elif len(row) >= 8:  # 兼容缺少总增长率的旧数据
-                    try:
-                        if row[0].isdigit():
-                            # 新格式但缺少总增长率
-                            number = int(row[0])
-                            name = row[1]
-                            period = row[2]
-                            left_perf = float(row[3])
-                            right_perf = float(row[4])
-                            left_orders = int(row[5])
-                            right_orders = int(row[6])
-                            left_growth_pct = float(row[7]) if len(row) > 7 else 0.0
-                            right_growth_pct = float(row[8]) if len(row) > 8 else 0.0
-                            total_growth_pct = 0.0
-                            sort_order = number - 1
-                        else:
-                            # 旧格式缺少增长率
-                            name = row[0]
-                            period = row[1]
-                            left_perf = float(row[2])
-                            right_perf = float(row[3])
-                            left_orders = int(row[4])
-                            right_orders = int(row[5])
-                            left_growth_pct = float(row[6]) if len(row) > 6 else 0.0
-                            right_growth_pct = float(row[7]) if len(row) > 7 else 0.0
-                            total_growth_pct = 0.0
-                            sort_order = performance_count
-                        
-                        self.cursor.execute("""
-                            INSERT INTO performance 
-                            (name, period, left_perf, right_perf, left_orders, right_orders,
-                             left_growth_pct, right_growth_pct, total_growth_pct, sort_order)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (name, period, left_perf, right_perf, left_orders, right_orders,
-                             left_growth_pct, right_growth_pct, total_growth_pct, sort_order))
-                        performance_count += 1
-                    except (ValueError, IndexError) as e:
-                        print(f"跳过无效的业绩数据行 {i+1}: {e}")
-            
-            # 导入总结数据
-            summary_count = 0
-            if summary_start != -1:
-                print("导入总结数据...")
-                for i in range(summary_start, len(rows)):
-                    row = rows[i]
-                    if not row or not row[0].strip():
-                        continue
-                    
-                    if len(row) >= 2:
+
+            print("导入数据...")
+            found_performance = False
+            # 维度表已清空，姓名和时期的id在导入过程中依次分配
+            person_ids, period_ids = {}, {}
+            new_people, new_periods = [], []
+            performance_batch = []
+            summary_batch = []
+            with open(csv_file, 'r', encoding='utf-8-sig', newline='') as f:
+                for section, line_no, row in iter_csv_sections(f):
+                    if section == PERFORMANCE_SECTION:
+                        found_performance = True
                         try:
-                            period = row[0]
-                            summary = row[1].replace('\\n', '\n').replace('\\r', '\r') if row[1] else ''
-                            
-                            self.cursor.execute("""
-                                INSERT INTO summaries (period, summary_text)
-                                VALUES (?, ?)
-                            """, (period, summary))
-                            summary_count += 1
-                        except Exception as e:
-                            print(f"跳过无效的总结数据行 {i+1}: {e}")
-            
-            self.conn.commit()
-            print(f"导入完成: {performance_count}条业绩记录, {summary_count}条总结记录")
-            
-            # 导入完成后更新ALL_NAMES
-            self.update_all_names_from_performance()
-            
+                            record = parse_performance_row(row, report['performance_count'])
+                        except (ValueError, IndexError) as e:
+                            reject(line_no, e)
+                            continue
+                        # 同一时期的不同写法（如“上”与“First Half”、月份不补零）归为一个时期
+                        name, period = record[0], normalize_period(record[1])
+                        if name not in person_ids:
+                            person_ids[name] = len(person_ids) + 1
+                            new_people.append((person_ids[name], name))
+                        if period not in period_ids:
+                            period_ids[period] = len(period_ids) + 1
+                            new_periods.append((period_ids[period], period, period_to_key(period)))
+                        performance_batch.append((line_no, (person_ids[name], period_ids[period]) + record[2:]))
+                        report['performance_count'] += 1
+                        if len(performance_batch) >= chunk_size:
+                            self._insert_import_dimensions(new_people, new_periods)
+                            report['performance_count'] -= self._insert_import_chunk(
+                                PERFORMANCE_INSERT_SQL, performance_batch, reject)
+                            performance_batch = []
+                    else:
+                        if len(row) < 2:
+                            reject(line_no, "总结数据列数不足")
+                            continue
+                        summary = row[1].replace('\\n', '\n').replace('\\r', '\r') if row[1] else ''
+                        summary_batch.append((line_no, (normalize_period(row[0]), summary)))
+                        report['summary_count'] += 1
+                        if len(summary_batch) >= chunk_size:
+                            report['summary_count'] -= self._insert_import_chunk(
+                                SUMMARY_INSERT_SQL, summary_batch, reject)
+                            summary_batch = []
+
+            if not found_performance:
+                print("CSV文件格式错误：找不到业绩数据段")
+                self.conn.rollback()
+                return False
+
+            self._insert_import_dimensions(new_people, new_periods)
+            report['performance_count'] -= self._insert_import_chunk(
+                PERFORMANCE_INSERT_SQL, performance_batch, reject)
+            report['summary_count'] -= self._insert_import_chunk(
+                SUMMARY_INSERT_SQL, summary_batch, reject)
+            # 导入的姓名在同一事务中登记到ALL_NAMES
+            new_names_count = self._register_names_from_performance()
+            self._commit()
+
+            report['seconds'] = time.perf_counter() - start_time
+            imported = report['performance_count'] + report['summary_count']
+            report['rows_per_second'] = imported / report['seconds'] if report['seconds'] > 0 else 0.0
+            print(f"导入完成: {report['performance_count']}条业绩记录, {report['summary_count']}条总结记录, "
+                  f"跳过 {report['rejected_count']} 行, 耗时 {report['seconds']:.2f} 秒 "
+                  f"({report['rows_per_second']:.0f} 行/秒)")
+
+            if new_names_count > 0:
+                print(f"从performance表新增 {new_names_count} 个姓名到ALL_NAMES")
+
             return True
-            
+
         except Exception as e:
             print(f"导入CSV失败: {e}")
             self.conn.rollback()
             return False
 
+    def _insert_import_dimensions(self, new_people, new_periods):
+        """写入导入中新出现的姓名和时期并清空待写列表
+
+        在批次的保存点之外写入，批次回滚逐行重试时维度表记录不会丢失。
+        """
+        self.cursor.executemany(PERSON_INSERT_SQL, new_people)
+        self.cursor.executemany(PERIOD_INSERT_SQL, new_periods)
+        new_people.clear()
+        new_periods.clear()
+
+    def _insert_import_chunk(self, sql, batch, reject):
+        """批量写入一批导入记录，返回被拒绝的条数
+
+        整批写入失败（如重复的主键）时回滚到保存点，再逐行写入以找出有问题的行。
+        """
+        if not batch:
+            return 0
+        self.cursor.execute("SAVEPOINT import_chunk")
+        try:
+            self.cursor.executemany(sql, [record for _, record in batch])
+            self.cursor.execute("RELEASE SAVEPOINT import_chunk")
+            return 0
+        except sqlite3.IntegrityError:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT import_chunk")
+            self.cursor.execute("RELEASE SAVEPOINT import_chunk")
+
+        rejected = 0
+        for line_no, record in batch:
+            try:
+                self.cursor.execute(sql, record)
+            except sqlite3.IntegrityError as e:
+                reject(line_no, e)
+                rejected += 1
+        return rejected
+
     def auto_backup_to_csv(self):
         """自动备份到CSV文件"""
-        from datetime import datetime
         backup_file = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         return self.export_to_csv(backup_file)
 
+    def close(self):
+        """写出尚未完成的自动备份并关闭数据库连接"""
+        if getattr(self, 'backup_scheduler', None):
+            if self._owns_backup_scheduler:
+                self.backup_scheduler.stop()
+            self.backup_scheduler = None
+        if getattr(self, 'conn', None):
+            self.conn.close()
+            self.conn = None
+
     def __del__(self):
         """关闭数据库连接"""
         try:
-            if hasattr(self, 'conn') and self.conn:
-                self.conn.close()
+            self.close()
         except:
             pass  # 忽略关闭连接时的任何错误
 
@@ -770,7 +1290,7 @@ if __name__ == '__main__':
     names = db_test.get_distinct_names()
     periods = db_test.get_distinct_periods()
     assert '张三' in names and '李四' in names and '王五' in names
-    assert period1 in periods and period2 in periods
+    assert db_test.convert_period_format(period1) in periods and db_test.convert_period_format(period2) in periods
     print(f"5. Distinct names: {names}, Distinct periods: {periods}")
 
     # 7. 测试总结功能
@@ -790,13 +1310,85 @@ if __name__ == '__main__':
     assert zhangsan_record[1] == 999.0
     print("7. Tested single record update.")
 
+    # 测试时期快照缓存：重复读取命中缓存，写入后失效，预读相邻时期
+    hits = db_test.get_cache_stats()['snapshot_hits']
+    rows, summary = db_test.get_period_snapshot(period1)
+    assert db_test.get_period_snapshot(period1) == (rows, summary) and summary == summary_text
+    assert db_test.get_cache_stats()['snapshot_hits'] == hits + 1
+    db_test.save_summary(period1, "修改后的总结")
+    assert db_test.get_period_snapshot(period1)[1] == "修改后的总结"
+    assert db_test.prefetch_adjacent_periods(period1) == 2
+    assert db_test.prefetch_adjacent_periods(period1) == 0
+    print(f"7. Tested period snapshot cache: {db_test.get_cache_stats()}")
+
+    # 测试时期排名分页：按总业绩排序，合计包含全部人员
+    ranking, totals = db_test.get_period_ranking(period1, 'total', limit=1)
+    assert ranking == [(1, '张三', 999.0, 999.0)] and totals == (2, 1199.0, 1049.5), (ranking, totals)
+    assert db_test.get_period_ranking("2023-01-上", 'right', limit=1, offset=1)[0] == [(2, '李四', 200.0, 50.5)]
+    print(f"7. Tested period ranking: {ranking}, totals={totals}")
+
+    # 测试矩阵数据：时期按从早到晚排列
+    persons, periods, cells = db_test.get_matrix_cells('total')
+    assert [period for _, period in periods] == ["2023-01-上", "2023-01-下"]
+    person_names, period_names = dict(persons), dict(periods)
+    assert {(person_names[p], period_names[d]): value for p, d, value in cells}[('王五', "2023-01-下")] == 650.0
+    print(f"7. Tested matrix cells: {len(persons)} persons, {len(periods)} periods, {len(cells)} cells")
+
+    # 测试按姓名和最近一期职级筛选人员
+    assert [name for _, name in db_test.get_matrix_cells('left', names=['王五', '李四'])[0]] == ['李四', '王五']
+    db_test.save_single_record('李四', period1, 200.0, 50.5, 15, 5, position='经理')
+    db_test.save_single_record('张三', period1, 999.0, 999.0, 99, 99, position='经理')
+    db_test.save_single_record('张三', period2, 120.0, 180.0, 11, 15, position='主管')
+    assert db_test.get_distinct_positions() == ['主管', '经理']
+    persons, _, cells = db_test.get_matrix_cells('total', position='经理')
+    assert [name for _, name in persons] == ['李四'] and len(cells) == 1
+    print(f"7. Tested position filter: {db_test.get_distinct_positions()}")
+
+    # 测试用其他写法的时期保存：更新原有的记录和总结，新时期按规范写法保存
+    assert db_test.save_person_records('张三', [
+        {'period': '2023-1-上', 'left_perf': 99, 'right_perf': 1, 'left_orders': 9, 'right_orders': 1, 'position': '经理'},
+        {'period': '2023-2-上', 'left_perf': 5, 'right_perf': 5, 'left_orders': 1, 'right_orders': 1},
+    ]) == 2
+    zhangsan = {record[0]: record[1:3] for record in db_test.get_all_data_by_name('张三')}
+    assert zhangsan['2023-01-上'] == (99.0, 1.0) and zhangsan['2023-02-上'] == (5.0, 5.0), zhangsan
+    db_test.save_single_record('李四', '2023-1-First Half', 1.0, 2.0, 3, 4, position='经理')
+    assert [record[1:3] for record in db_test.get_data_by_period(period1) if record[0] == '李四'] == [(1.0, 2.0)]
+    db_test.save_summary('2023-1-上', "其他写法的总结")
+    assert db_test.get_summary(period1) == "其他写法的总结"
+    assert db_test.apply_period_changes('2023-1-上', sort_orders=[('李四', 0), ('张三', 1)]) == 2
+    assert [record[0] for record in db_test.get_data_by_period(period1)] == ['李四', '张三']
+    assert db_test.delete_single_record('张三', '2023-2-First Half') == 1
+    assert db_test.conn.execute("SELECT COUNT(*) FROM period").fetchone()[0] == 3
+    assert db_test.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0] == 1
+    print("7. Saved records and summary with alternate period spellings.")
+
     # 8. 测试CSV导出
     export_result = db_test.export_to_csv("test_backup.csv")
     assert export_result == True
     print("8. Exported data to CSV file.")
 
+    # 导入时同一时期的不同写法归为一个时期
+    with open("test_spellings.csv", 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['[PERFORMANCE_DATA]'])
+        writer.writerow(['编号', '姓名', '时期', '左区业绩', '右区业绩', '左区订单', '右区订单', '左区增长%', '右区增长%', '总增长%'])
+        writer.writerow([1, '张三', '2023-01-First Half', 100, 200, 1, 2, 0, 0, 0])
+        writer.writerow([2, '李四', '2023-01-上', 300, 400, 3, 4, 0, 0, 0])
+        writer.writerow([3, '王五', '2023-1-First Half', 500, 600, 5, 6, 0, 0, 0])
+        writer.writerow([])
+        writer.writerow(['[SUMMARY_DATA]'])
+        writer.writerow(['时期', '总结内容'])
+        writer.writerow(['2023-01-上', '总结'])
+    assert db_test.import_from_csv("test_spellings.csv")
+    os.remove("test_spellings.csv")
+    assert db_test.get_distinct_periods() == ["2023-01-上"]
+    assert len(db_test.get_data_by_period("2023-01-上")) == 3
+    assert db_test.get_period_ranking("2023-01-上", 'total')[1][0] == 3
+    assert db_test.get_summary("2023-01-上") == '总结'
+    print("8. Imported three spellings of one period as a single period.")
+
     # 9. 清理
     del db_test # 关闭连接
     os.remove(test_db_file)
     print(f"9. Cleaned up and removed {test_db_file}.")
-    print("--- Test Completed Successfully ---")
\ No newline at end of file
+    print("--- Test Completed Successfully ---")
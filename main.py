@@ -17,6 +17,7 @@
 依赖：
     - PyQt5 (界面框架)
     - matplotlib (图表绘制)
+    - numpy (图表数据处理)
     - sqlite3 (数据库，Python内置)
 
 作者: xilin_qian
@@ -47,6 +48,13 @@ def check_dependencies():
         print("❌ matplotlib 未安装，请运行: pip install matplotlib")
         return False
     
+    try:
+        import numpy
+        print("✅ numpy 已安装")
+    except ImportError:
+        print("❌ numpy 未安装，请运行: pip install numpy")
+        return False
+    
     return True
 
 def main():
@@ -66,6 +74,7 @@ def main():
     try:
         from ui.main_window import MainWindow
         from database import DatabaseManager
+        from connection_profile import load_profile_file
         print("✅ 核心模块加载成功")
     except ImportError as e:
         print(f"❌ 模块导入失败: {e}")
@@ -87,14 +96,21 @@ def main():
         # app.setWindowIcon(QIcon("icon.png"))
         
         print("\n📊 初始化数据库...")
-        # 创建数据库管理器
-        db_manager = DatabaseManager("performance.db")
+        # 创建数据库管理器，连接配置可在 db_config.json 中修改
+        db_manager = DatabaseManager("performance.db",
+                                     connection_profile=load_profile_file("db_config.json"))
         
         print("🖥️  创建主窗口...")
         # 创建主窗口
         main_window = MainWindow(db_manager)
         main_window.show()
         
+        # 退出前在后台写入尚未保存的排序并等待完成，停止图表绘制线程，等待后台查询线程完成已提交的请求，再写出尚未完成的自动备份
+        app.aboutToQuit.connect(main_window.data_entry_tab.flush_sort_orders)
+        app.aboutToQuit.connect(main_window.charts_tab.render_worker.shutdown)
+        app.aboutToQuit.connect(main_window.executor.shutdown)
+        app.aboutToQuit.connect(db_manager.close)
+        
         print("✅ 系统启动成功！")
         print("\n💡 使用提示:")
         print("   - 在'数据录入'标签页录入和管理业绩数据")
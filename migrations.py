@@ -0,0 +1,479 @@
+# migrations.py
+"""数据库结构迁移
+
+数据库文件的结构版本记录在 PRAGMA user_version 中。打开数据库时只读取一次版本号，
+版本落后时按顺序执行尚未执行的迁移步骤，所有步骤在同一个事务中完成并写入新版本号，
+失败时整体回滚，数据库保持原来的版本。
+"""
+import sqlite3
+
+from period_utils import NAME_TRIM_CHARS, period_to_key, normalize_period
+
+
+def _create_tables(conn):
+    """创建业绩、总结和姓名表，并为旧版本数据库补齐后来增加的列"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS performance (
+            name TEXT NOT NULL,
+            period TEXT NOT NULL,
+            left_perf REAL DEFAULT 0,
+            right_perf REAL DEFAULT 0,
+            left_orders INTEGER DEFAULT 0,
+            right_orders INTEGER DEFAULT 0,
+            left_growth_pct REAL DEFAULT 0,
+            right_growth_pct REAL DEFAULT 0,
+            total_growth_pct REAL DEFAULT 0,
+            position TEXT DEFAULT '',
+            sort_order INTEGER DEFAULT 0,
+            PRIMARY KEY (name, period)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS summaries (
+            period TEXT PRIMARY KEY,
+            summary_text TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS all_names (
+            name TEXT PRIMARY KEY,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active INTEGER DEFAULT 1
+        )
+    ''')
+
+    # 早期版本的数据库缺少增长率、职级和排序列
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(performance)")]
+    for column, definition in (('left_growth_pct', 'REAL DEFAULT 0'),
+                               ('right_growth_pct', 'REAL DEFAULT 0'),
+                               ('total_growth_pct', 'REAL DEFAULT 0'),
+                               ('position', 'TEXT DEFAULT ""'),
+                               ('sort_order', 'INTEGER DEFAULT 0')):
+        if column not in columns:
+            conn.execute(f'ALTER TABLE performance ADD COLUMN {column} {definition}')
+
+
+def _add_period_key(conn):
+    """增加整数时期键列和索引，并为已有数据回填时期键"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(performance)")]
+    if 'period_key' not in columns:
+        conn.execute('ALTER TABLE performance ADD COLUMN period_key INTEGER')
+
+    # 按时期查询、最新时期、时期范围和增长率计算都走索引
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_performance_period_key ON performance(period_key, sort_order)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_performance_name_period_key ON performance(name, period_key)")
+
+    conn.create_function("period_to_key", 1, period_to_key, deterministic=True)
+    conn.execute("UPDATE performance SET period_key = period_to_key(period) WHERE period_key IS NULL")
+
+
+def _register_existing_names(conn):
+    """把performance中已有的姓名登记到ALL_NAMES表（之后的写入会自行登记姓名）"""
+    conn.execute(f"""
+        INSERT OR IGNORE INTO all_names (name, is_active)
+        SELECT DISTINCT TRIM(name, {NAME_TRIM_CHARS}), 1 FROM performance
+        WHERE name IS NOT NULL AND TRIM(name, {NAME_TRIM_CHARS}) != ''
+    """)
+
+
+# performance 视图的列：与原 performance 表相同，末尾附加维度表的整数id
+PERFORMANCE_VIEW_SQL = """
+    CREATE VIEW performance AS
+    SELECT p.name, d.period, f.left_perf, f.right_perf, f.left_orders, f.right_orders,
+           f.left_growth_pct, f.right_growth_pct, f.total_growth_pct, f.position, f.sort_order,
+           d.period_key, f.person_id, f.period_id
+    FROM performance_fact AS f
+    JOIN person AS p ON p.id = f.person_id
+    JOIN period AS d ON d.id = f.period_id
+"""
+
+# 对视图的写入由 INSTEAD OF 触发器转到维度表和事实表；
+# 写入语句的冲突处理（OR REPLACE / OR IGNORE）会作用到触发器内对事实表的写入。
+# {period_match} 是按写入的时期查找 period 行的条件
+_PERFORMANCE_TRIGGER_TEMPLATES = [
+    """
+    CREATE TRIGGER performance_insert INSTEAD OF INSERT ON performance
+    BEGIN
+        INSERT INTO person (name) SELECT NEW.name
+        WHERE NOT EXISTS (SELECT 1 FROM person WHERE name = NEW.name);
+        INSERT INTO period (period, period_key) SELECT NEW.period, NEW.period_key
+        WHERE NOT EXISTS (SELECT 1 FROM period WHERE {period_match});
+        INSERT INTO performance_fact
+        (person_id, period_id, left_perf, right_perf, left_orders, right_orders,
+         left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order)
+        VALUES ((SELECT id FROM person WHERE name = NEW.name),
+                (SELECT id FROM period WHERE {period_match}),
+                COALESCE(NEW.left_perf, 0), COALESCE(NEW.right_perf, 0),
+                COALESCE(NEW.left_orders, 0), COALESCE(NEW.right_orders, 0),
+                COALESCE(NEW.left_growth_pct, 0), COALESCE(NEW.right_growth_pct, 0),
+                COALESCE(NEW.total_growth_pct, 0), COALESCE(NEW.position, ''), COALESCE(NEW.sort_order, 0));
+    END
+    """,
+    """
+    CREATE TRIGGER performance_update INSTEAD OF UPDATE ON performance
+    BEGIN
+        INSERT INTO person (name) SELECT NEW.name
+        WHERE NOT EXISTS (SELECT 1 FROM person WHERE name = NEW.name);
+        INSERT INTO period (period, period_key) SELECT NEW.period, NEW.period_key
+        WHERE NOT EXISTS (SELECT 1 FROM period WHERE {period_match});
+        UPDATE performance_fact
+        SET person_id = (SELECT id FROM person WHERE name = NEW.name),
+            period_id = (SELECT id FROM period WHERE {period_match}),
+            left_perf = NEW.left_perf, right_perf = NEW.right_perf,
+            left_orders = NEW.left_orders, right_orders = NEW.right_orders,
+            left_growth_pct = NEW.left_growth_pct, right_growth_pct = NEW.right_growth_pct,
+            total_growth_pct = NEW.total_growth_pct, position = NEW.position, sort_order = NEW.sort_order
+        WHERE person_id = OLD.person_id AND period_id = OLD.period_id;
+    END
+    """,
+    """
+    CREATE TRIGGER performance_delete INSTEAD OF DELETE ON performance
+    BEGIN
+        DELETE FROM performance_fact WHERE person_id = OLD.person_id AND period_id = OLD.period_id;
+    END
+    """,
+]
+
+# 拆分维度表（第4步）时创建的触发器，按写法查找时期
+SPLIT_TRIGGERS_SQL = [sql.format(period_match="period = NEW.period")
+                      for sql in _PERFORMANCE_TRIGGER_TEMPLATES]
+
+# 合并时期写法（第6步）起使用的触发器，按写法或时期键查找时期，
+# 同一时期的不同写法写入同一行 period，不会与唯一的时期键冲突
+PERFORMANCE_TRIGGERS_SQL = [sql.format(period_match="period = NEW.period OR period_key = NEW.period_key")
+                            for sql in _PERFORMANCE_TRIGGER_TEMPLATES]
+
+
+def _split_dimension_tables(conn):
+    """把performance表拆分为 person、period 维度表和以整数id为主键的 performance_fact 事实表
+
+    姓名和时期字符串各只保存一次，改名只需更新 person 表的一行。
+    原 performance 表改为同名视图，原有的查询和写入语句无需修改。
+    """
+    conn.execute("CREATE TABLE person (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.execute("CREATE TABLE period (id INTEGER PRIMARY KEY, period TEXT NOT NULL UNIQUE, period_key INTEGER)")
+    conn.execute('''
+        CREATE TABLE performance_fact (
+            person_id INTEGER NOT NULL REFERENCES person(id),
+            period_id INTEGER NOT NULL REFERENCES period(id),
+            left_perf REAL DEFAULT 0,
+            right_perf REAL DEFAULT 0,
+            left_orders INTEGER DEFAULT 0,
+            right_orders INTEGER DEFAULT 0,
+            left_growth_pct REAL DEFAULT 0,
+            right_growth_pct REAL DEFAULT 0,
+            total_growth_pct REAL DEFAULT 0,
+            position TEXT DEFAULT '',
+            sort_order INTEGER DEFAULT 0,
+            PRIMARY KEY (person_id, period_id)
+        ) WITHOUT ROWID
+    ''')
+
+    conn.execute("INSERT INTO person (name) SELECT DISTINCT name FROM performance ORDER BY name")
+    conn.execute("""
+        INSERT INTO period (period, period_key)
+        SELECT period, MIN(period_key) FROM performance GROUP BY period ORDER BY MIN(period_key), period
+    """)
+    conn.execute("""
+        INSERT INTO performance_fact
+        (person_id, period_id, left_perf, right_perf, left_orders, right_orders,
+         left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order)
+        SELECT p.id, d.id, f.left_perf, f.right_perf, f.left_orders, f.right_orders,
+               f.left_growth_pct, f.right_growth_pct, f.total_growth_pct, f.position, f.sort_order
+        FROM performance AS f
+        JOIN person AS p ON p.name = f.name
+        JOIN period AS d ON d.period = f.period
+    """)
+    # 删除原表时其索引一并删除
+    conn.execute("DROP TABLE performance")
+
+    # 按时期查询和排序、按时期键查找时期
+    conn.execute("CREATE INDEX idx_period_period_key ON period(period_key)")
+    conn.execute("CREATE INDEX idx_performance_fact_period ON performance_fact(period_id, sort_order)")
+    conn.execute(PERFORMANCE_VIEW_SQL)
+    for trigger_sql in SPLIT_TRIGGERS_SQL:
+        conn.execute(trigger_sql)
+
+
+def _add_ranking_indexes(conn):
+    """按左区、右区、总业绩排名的索引，时期对比图按名次分页读取时不必排序整个时期
+
+    事实表没有 rowid，索引项末尾带有主键 person_id，名次相同时按它排序也能直接使用索引。
+    """
+    conn.execute("CREATE INDEX idx_performance_fact_left ON performance_fact(period_id, left_perf)")
+    conn.execute("CREATE INDEX idx_performance_fact_right ON performance_fact(period_id, right_perf)")
+    conn.execute("CREATE INDEX idx_performance_fact_total ON performance_fact(period_id, (left_perf + right_perf))")
+
+
+def _merge_period_spellings(conn):
+    """合并同一时期（时期键相同）的不同写法，并把时期键索引改为唯一索引
+
+    每个时期保留一行 period（优先保留规范写法，其次id最小的一行），其余写法的记录移到保留的一行，
+    同一人重复的记录保留原来就在保留行上的一条；时期和总结统一为 normalize_period 的写法。
+    触发器改为按写法或时期键查找时期。唯一索引允许多个 NULL，无法解析的时期不受影响。
+    """
+    conn.create_function("normalize_period", 1, normalize_period, deterministic=True)
+    conn.execute("""
+        CREATE TEMP TABLE period_merge AS
+        SELECT d.id AS old_id,
+               (SELECT s.id FROM period AS s WHERE s.period_key = d.period_key
+                ORDER BY s.period != normalize_period(s.period), s.id LIMIT 1) AS new_id
+        FROM period AS d WHERE d.period_key IS NOT NULL
+    """)
+    conn.execute("DELETE FROM period_merge WHERE old_id = new_id")
+    conn.execute("""
+        INSERT OR IGNORE INTO performance_fact
+        (person_id, period_id, left_perf, right_perf, left_orders, right_orders,
+         left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order)
+        SELECT f.person_id, m.new_id, f.left_perf, f.right_perf, f.left_orders, f.right_orders,
+               f.left_growth_pct, f.right_growth_pct, f.total_growth_pct, f.position, f.sort_order
+        FROM performance_fact AS f JOIN period_merge AS m ON m.old_id = f.period_id
+    """)
+    conn.execute("DELETE FROM performance_fact WHERE period_id IN (SELECT old_id FROM period_merge)")
+    conn.execute("DELETE FROM period WHERE id IN (SELECT old_id FROM period_merge)")
+    conn.execute("DROP TABLE period_merge")
+    conn.execute("UPDATE period SET period = normalize_period(period) WHERE period != normalize_period(period)")
+    conn.execute("UPDATE OR IGNORE summaries SET period = normalize_period(period) WHERE period != normalize_period(period)")
+
+    conn.execute("DROP INDEX idx_period_period_key")
+    conn.execute("CREATE UNIQUE INDEX idx_period_period_key ON period(period_key)")
+    for trigger in ('performance_insert', 'performance_update', 'performance_delete'):
+        conn.execute(f"DROP TRIGGER {trigger}")
+    for trigger_sql in PERFORMANCE_TRIGGERS_SQL:
+        conn.execute(trigger_sql)
+
+
+def _merge_summary_spellings(conn):
+    """统一时期和总结的写法，同一时期不同写法的总结合并为一条
+
+    合并时期写法（第6步）时，规范写法已有总结的其他写法的总结没有改名，仍留在原来的写法下。
+    这些总结按原来的顺序以空行分隔接在规范写法的总结之后（内容相同的只保留一份），
+    合并的时期会打印出来以便核对。之后以非规范写法新建的时期也统一为规范写法。
+    """
+    conn.create_function("normalize_period", 1, normalize_period, deterministic=True)
+    conn.execute("UPDATE period SET period = normalize_period(period) WHERE period != normalize_period(period)")
+
+    rows = conn.execute("""
+        SELECT rowid, period, normalize_period(period), summary_text FROM summaries
+        WHERE period != normalize_period(period) ORDER BY rowid
+    """).fetchall()
+    for rowid, period, normalized, summary_text in rows:
+        existing = conn.execute("SELECT summary_text FROM summaries WHERE period = ?", (normalized,)).fetchone()
+        if existing is None:
+            conn.execute("UPDATE summaries SET period = ? WHERE rowid = ?", (normalized, rowid))
+            continue
+        paragraphs = existing[0].split("\n\n") if existing[0] else []
+        if summary_text and summary_text not in paragraphs:
+            merged = "\n\n".join(paragraphs + [summary_text])
+            conn.execute("UPDATE summaries SET summary_text = ? WHERE period = ?", (merged, normalized))
+            print(f"合并总结：{period} 的总结已接在 {normalized} 的总结之后")
+        conn.execute("DELETE FROM summaries WHERE rowid = ?", (rowid,))
+
+
+# 按顺序排列的迁移步骤，第 i 个步骤把数据库从版本 i 升级到版本 i+1。
+# 已发布的步骤不能修改或调整顺序，新的结构变化只能追加新步骤。
+MIGRATIONS = [
+    ("创建数据表", _create_tables),
+    ("增加时期键及索引", _add_period_key),
+    ("登记已有姓名", _register_existing_names),
+    ("拆分人员和时期维度表", _split_dimension_tables),
+    ("增加业绩排名索引", _add_ranking_indexes),
+    ("合并同一时期的不同写法", _merge_period_spellings),
+    ("合并同一时期不同写法的总结", _merge_summary_spellings),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# 升级跨过该版本（拆分维度表）时，在迁移提交后执行 VACUUM 回收原表占用的空间
+VACUUM_AFTER_VERSION = 4
+
+
+def get_schema_version(conn):
+    """读取数据库文件记录的结构版本"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, progress=None):
+    """把数据库升级到 SCHEMA_VERSION，返回执行的迁移步骤数
+
+    progress(已完成步骤数, 需执行步骤数, 步骤说明) 在每个步骤开始前调用，用于显示升级进度。
+    比当前程序更新的数据库文件无法安全打开，抛出 RuntimeError。
+    """
+    version = get_schema_version(conn)
+    if version == SCHEMA_VERSION:
+        return 0
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"数据库结构版本 {version} 高于程序支持的版本 {SCHEMA_VERSION}，请升级程序后再打开")
+
+    pending = MIGRATIONS[version:]
+    conn.execute("BEGIN")
+    try:
+        for done, (description, step) in enumerate(pending):
+            if progress:
+                progress(done, len(pending), description)
+            step(conn)
+        # user_version 随事务一起提交，中途失败时保持原版本
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if version < VACUUM_AFTER_VERSION <= SCHEMA_VERSION:
+        if progress:
+            progress(len(pending), len(pending), "回收空间")
+        conn.execute("VACUUM")
+        # WAL 模式下 VACUUM 的结果先写入 -wal 文件，立即检查点使数据库文件缩小并清空 -wal 文件
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    if progress:
+        progress(len(pending), len(pending), "完成")
+    return len(pending)
+
+
+# ===================================================================
+#  独立测试脚本
+#  运行方式: python migrations.py
+# ===================================================================
+if __name__ == '__main__':
+    print("--- Running Migrations Test ---")
+
+    # 1. 新数据库：从版本0执行全部步骤
+    conn = sqlite3.connect(":memory:")
+    steps = []
+    assert migrate(conn, lambda done, total, description: steps.append(description)) == SCHEMA_VERSION
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    assert steps == [description for description, _ in MIGRATIONS] + ["回收空间", "完成"]
+    print(f"1. Migrated new database to version {SCHEMA_VERSION}: {steps}")
+
+    # 2. 已是最新版本：不执行任何步骤
+    assert migrate(conn) == 0
+    print("2. Up-to-date database needs no migration.")
+
+    # 3. 早期版本的数据库：缺少后加的列、没有时期键和姓名登记
+    legacy = sqlite3.connect(":memory:")
+    legacy.execute('''
+        CREATE TABLE performance (
+            name TEXT NOT NULL, period TEXT NOT NULL,
+            left_perf REAL DEFAULT 0, right_perf REAL DEFAULT 0,
+            left_orders INTEGER DEFAULT 0, right_orders INTEGER DEFAULT 0,
+            PRIMARY KEY (name, period)
+        )
+    ''')
+    legacy.executemany("INSERT INTO performance (name, period, left_perf) VALUES (?, ?, ?)",
+                       [('张三', '2023-01-First Half', 1), (' 李四 ', '2023-01-Second Half', 2), ('王五', 'weird', 3),
+                        ('赵六', '2023-01-上', 4), ('张三', '2023-1-First Half', 9)])
+    legacy.commit()
+    assert migrate(legacy) == SCHEMA_VERSION
+    columns = [row[1] for row in legacy.execute("PRAGMA table_info(performance)")]
+    assert {'position', 'sort_order', 'total_growth_pct', 'period_key'} <= set(columns)
+    keys = dict(legacy.execute("SELECT period, period_key FROM performance"))
+    assert keys == {'2023-01-First Half': 404602, '2023-01-Second Half': 404603, 'weird': None}
+    names = [row[0] for row in legacy.execute("SELECT name FROM all_names ORDER BY name")]
+    assert sorted(names) == sorted(['张三', '李四', '王五', '赵六'])
+    # 同一时期的不同写法合并为一个时期，同一人重复的记录保留规范写法的一条
+    periods = [row[0] for row in legacy.execute("SELECT period FROM period ORDER BY period_key IS NULL, period_key")]
+    assert periods == ['2023-01-First Half', '2023-01-Second Half', 'weird'], periods
+    assert legacy.execute("SELECT left_perf FROM performance WHERE name = '张三'").fetchall() == [(1.0,)]
+    print(f"3. Upgraded legacy database: columns={columns}, names={names}, periods={periods}")
+
+    # 4. 维度表拆分后，performance 视图的读写与原表一致
+    legacy.execute("INSERT INTO performance (name, period, left_perf, period_key) VALUES ('张三', '2023-01-Second Half', 5, 404603)")
+    legacy.execute("INSERT OR REPLACE INTO performance (name, period, left_perf, period_key) VALUES ('张三', '2023-01-Second Half', 6, 404603)")
+    try:
+        legacy.execute("INSERT INTO performance (name, period, period_key) VALUES ('张三', '2023-01-Second Half', 404603)")
+        raise AssertionError("duplicate (name, period) should be rejected")
+    except sqlite3.IntegrityError:
+        pass
+    legacy.execute("UPDATE performance SET sort_order = 3 WHERE name = '张三' AND period = '2023-01-Second Half'")
+    legacy.execute("UPDATE person SET name = '张三丰' WHERE name = '张三'")
+    rows = legacy.execute("SELECT name, period, left_perf, position, sort_order FROM performance WHERE name = '张三丰' ORDER BY period_key").fetchall()
+    assert rows == [('张三丰', '2023-01-First Half', 1.0, '', 0), ('张三丰', '2023-01-Second Half', 6.0, '', 3)], rows
+    legacy.execute("DELETE FROM performance WHERE period = 'weird'")
+    # 用另一种写法写入已有的时期，记录归入原来的时期
+    legacy.execute("INSERT INTO performance (name, period, left_perf, period_key) VALUES ('李四', '2023-01-上', 7, 404602)")
+    assert legacy.execute("SELECT COUNT(*) FROM period").fetchone()[0] == 3
+    assert legacy.execute("SELECT period FROM performance WHERE name = '李四' AND left_perf = 7").fetchall() == [('2023-01-First Half',)]
+    assert legacy.execute("SELECT COUNT(*) FROM performance_fact").fetchone()[0] == 5
+    print(f"4. View writes go to the fact table: {rows}")
+
+    # 5. 迁移失败时整体回滚，版本号不变
+    def migrate_with_failing_step(conn):
+        """在全部步骤之后追加一个必然失败的步骤再升级，返回抛出的异常"""
+        global SCHEMA_VERSION
+        MIGRATIONS.append(("故意失败的步骤", lambda c: c.execute("SELECT * FROM missing_table")))
+        SCHEMA_VERSION = len(MIGRATIONS)
+        try:
+            migrate(conn)
+        except sqlite3.OperationalError as e:
+            return e
+        finally:
+            MIGRATIONS.pop()
+            SCHEMA_VERSION = len(MIGRATIONS)
+        raise AssertionError("migration should have failed")
+
+    broken = sqlite3.connect(":memory:")
+    migrate_with_failing_step(broken)
+    assert get_schema_version(broken) == 0
+    assert broken.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'performance'").fetchone()[0] == 0
+    print("5. Failed migration rolled back to version 0.")
+
+    # 6. 从中间版本升级时，前面已成功的步骤（拆分维度表等）也随失败的步骤一起回滚
+    def migrate_to(conn, version):
+        """只执行前 version 个步骤，得到旧版本程序创建的数据库"""
+        global SCHEMA_VERSION
+        all_steps, MIGRATIONS[:] = MIGRATIONS[:], MIGRATIONS[:version]
+        SCHEMA_VERSION = len(MIGRATIONS)
+        try:
+            assert migrate(conn) == version
+        finally:
+            MIGRATIONS[:] = all_steps
+            SCHEMA_VERSION = len(MIGRATIONS)
+
+    partial = sqlite3.connect(":memory:")
+    migrate_to(partial, 3)
+    partial.execute("INSERT INTO performance (name, period, left_perf, period_key) VALUES ('张三', '2023-01-First Half', 1, 404602)")
+    partial.commit()
+    schema = partial.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall()
+    migrate_with_failing_step(partial)
+    assert get_schema_version(partial) == 3
+    assert partial.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall() == schema
+    assert partial.execute("SELECT name, left_perf FROM performance").fetchall() == [('张三', 1.0)]
+    print("6. Failed migration from version 3 left the version and schema unchanged.")
+
+    # 7. 版本5的数据库中同一时期有两种写法：合并为一行，时期键索引改为唯一
+    spelled = sqlite3.connect(":memory:")
+    migrate_to(spelled, 5)
+    spelled.execute("INSERT INTO performance (name, period, left_perf, period_key) VALUES ('张三', '2023-01-First Half', 1, 404602)")
+    spelled.execute("INSERT INTO period (period, period_key) VALUES ('2023-01-上', 404602)")
+    spelled.execute("INSERT INTO person (name) VALUES ('李四')")
+    spelled.executemany("INSERT INTO performance_fact (person_id, period_id, left_perf) VALUES (?, 2, ?)", [(1, 8), (2, 2)])
+    spelled.execute("INSERT INTO summaries VALUES ('2023-01-上', '总结')")
+    spelled.commit()
+    assert migrate(spelled) == 2
+    rows = spelled.execute("SELECT name, period, left_perf FROM performance ORDER BY name").fetchall()
+    assert rows == [('张三', '2023-01-First Half', 1.0), ('李四', '2023-01-First Half', 2.0)], rows
+    assert spelled.execute("SELECT period FROM summaries").fetchall() == [('2023-01-First Half',)]
+    unique = {name: is_unique for _, name, is_unique, *_ in spelled.execute("PRAGMA index_list(period)")}
+    assert unique['idx_period_period_key'] == 1
+    try:
+        spelled.execute("INSERT INTO period (period, period_key) VALUES ('2023-1-First Half', 404602)")
+        raise AssertionError("duplicate period_key should be rejected")
+    except sqlite3.IntegrityError:
+        pass
+    print(f"7. Merged period spellings: {rows}")
+
+    # 8. 版本6的数据库中规范写法和其他写法各有一条总结：其他写法的总结接在后面，不再单独留下
+    summaries = sqlite3.connect(":memory:")
+    migrate_to(summaries, 6)
+    summaries.execute("INSERT INTO performance (name, period, period_key) VALUES ('张三', '2023-1-Second Half', 404603)")
+    summaries.executemany("INSERT INTO summaries VALUES (?, ?)",
+                          [('2023-01-First Half', '规范写法'), ('2023-01-上', '其他写法'), ('2023-1-First Half', '规范写法'),
+                           ('2023-01-下', '下半月'), ('weird', '无法解析')])
+    summaries.commit()
+    assert migrate(summaries) == 1
+    merged = summaries.execute("SELECT period, summary_text FROM summaries ORDER BY period").fetchall()
+    assert merged == [('2023-01-First Half', '规范写法\n\n其他写法'), ('2023-01-Second Half', '下半月'),
+                      ('weird', '无法解析')], merged
+    assert summaries.execute("SELECT period FROM period").fetchall() == [('2023-01-Second Half',)]
+    print(f"8. Merged summary spellings: {merged}")
+
+    print("--- Test Completed Successfully ---")
@@ -0,0 +1,103 @@
+# period_utils.py
+"""时期和姓名的规范写法
+
+数据库写入、查询和结构迁移共用的时期格式转换、整数时期键以及姓名首尾空白的处理。
+"""
+
+
+# 登记姓名时从首尾去除的空白字符：空格、制表符、换行、回车和全角空格
+NAME_TRIM_CHARS = "char(32, 9, 10, 13, 12288)"
+
+
+# 时期的半月标记，数据库中保存英文格式，界面显示上/下
+HALF_INDEX = {'First Half': 0, 'Second Half': 1, '上': 0, '下': 1}
+STORAGE_HALVES = ('First Half', 'Second Half')
+DISPLAY_HALVES = ('上', '下')
+
+
+def to_storage_period(period):
+    """将界面格式的时期（YYYY-MM-上/下）转换为数据库保存的格式（YYYY-MM-First Half/Second Half）"""
+    if "上" in period:
+        return period.replace("上", "First Half")
+    elif "下" in period:
+        return period.replace("下", "Second Half")
+    return period
+
+
+def to_display_period(period):
+    """将数据库保存的时期格式转换为界面显示的格式"""
+    if "First Half" in period:
+        return period.replace("First Half", "上")
+    elif "Second Half" in period:
+        return period.replace("Second Half", "下")
+    return period
+
+
+def period_to_key(period):
+    """将时期转换为整数键 yyyymm*2+半月（上半月为0，下半月为1），用于排序和范围查询
+
+    两种时期格式都可以解析，无法解析时返回 None。
+    """
+    parts = period.split('-', 2) if period else []
+    if len(parts) != 3:
+        return None
+    try:
+        year, month = int(parts[0]), int(parts[1])
+    except ValueError:
+        return None
+    half = HALF_INDEX.get(parts[2].strip())
+    if half is None or not 1 <= month <= 12:
+        return None
+    return (year * 100 + month) * 2 + half
+
+
+def key_to_period(key, display=False):
+    """将整数时期键转换回时期字符串，display为True时返回界面格式"""
+    yyyymm, half = divmod(key, 2)
+    year, month = divmod(yyyymm, 100)
+    halves = DISPLAY_HALVES if display else STORAGE_HALVES
+    return f"{year}-{month:02d}-{halves[half]}"
+
+
+def normalize_period(period):
+    """将时期转换为数据库保存的规范写法，同一时期（时期键相同）只有一种写法
+
+    能解析的时期统一为 YYYY-MM-First Half/Second Half，无法解析的时期原样返回。
+    """
+    key = period_to_key(to_storage_period(period))
+    return key_to_period(key) if key is not None else period
+
+
+def shift_period_key(key, offset):
+    """把整数时期键向后（offset > 0）或向前移动 offset 个半月，可跨月、跨年"""
+    yyyymm, half = divmod(key, 2)
+    year, month = divmod(yyyymm, 100)
+    months, half = divmod((year * 12 + month - 1) * 2 + half + offset, 2)
+    year, month = divmod(months, 12)
+    return (year * 100 + month + 1) * 2 + half
+
+
+# ===================================================================
+#  独立测试脚本
+#  运行方式: python period_utils.py
+# ===================================================================
+if __name__ == '__main__':
+    print("--- Running Period Utils Test ---")
+
+    assert to_storage_period("2023-01-上") == "2023-01-First Half"
+    assert to_display_period("2023-01-Second Half") == "2023-01-下"
+    assert period_to_key("2023-01-上") == period_to_key("2023-1-First Half") == 202301 * 2
+    assert period_to_key("2023-13-上") is None and period_to_key("自定义") is None
+    assert key_to_period(202312 * 2 + 1, display=True) == "2023-12-下"
+    print("1. Period formats and keys OK.")
+
+    for spelling in ("2023-1-上", "2023-01-First Half", " 2023-01-上"):
+        assert normalize_period(spelling.strip()) == "2023-01-First Half", spelling
+    assert normalize_period("自定义") == "自定义"
+    print("2. normalize_period maps every spelling to the stored form.")
+
+    assert shift_period_key(202312 * 2 + 1, 1) == 202401 * 2
+    assert shift_period_key(202401 * 2, -1) == 202312 * 2 + 1
+    print("3. shift_period_key crosses months and years.")
+
+    print("\n--- Test Completed Successfully ---")
@@ -0,0 +1,123 @@
+# ui/chart_cache.py
+import sys
+from collections import OrderedDict
+
+# 默认内存上限：150 dpi 下一张全屏图表的位图约 6~8 MB
+CHART_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def estimate_data_size(data):
+    """估算查询结果（元组列表）占用的字节数；NumPy 数组或矩阵按其 nbytes 计算"""
+    if hasattr(data, 'nbytes'):
+        return data.nbytes
+    if not data:
+        return sys.getsizeof(data)
+    return sys.getsizeof(data) + sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+                                     for row in data)
+
+
+class ChartCacheEntry:
+    """一张已绘制图表的数据和位图，bitmap_size 为位图的 (宽, 高) 像素"""
+    def __init__(self, data, bitmap=None, bitmap_size=None):
+        self.data = data
+        self.bitmap = bitmap
+        self.bitmap_size = bitmap_size
+        self.nbytes = estimate_data_size(data)
+        if bitmap is not None:
+            self.nbytes += bitmap_size[0] * bitmap_size[1] * 4  # RGBA
+
+    def bitmap_for(self, size):
+        """位图尺寸与当前画布一致时返回位图，否则返回 None"""
+        return self.bitmap if self.bitmap_size == size else None
+
+
+class ChartCache:
+    """按字节数限制内存的图表 LRU 缓存
+
+    键由调用方决定（图表类型、选择、字号和数据版本号），超过 max_bytes 时
+    淘汰最久未使用的图表；单张超过上限的图表不缓存。
+    """
+    def __init__(self, max_bytes=CHART_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, data, bitmap=None, bitmap_size=None):
+        """保存（或替换）一张图表，返回缓存条目；超过上限时返回 None"""
+        self.discard(key)
+        entry = ChartCacheEntry(data, bitmap, bitmap_size)
+        if entry.nbytes > self.max_bytes:
+            return None
+        self._entries[key] = entry
+        self.total_bytes += entry.nbytes
+        while self.total_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+            self.evictions += 1
+        return entry
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def get_stats(self):
+        """返回命中/未命中/淘汰次数、缓存的图表数和占用字节数"""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(self._entries), 'bytes': self.total_bytes}
+
+
+# ===================================================================
+#  独立测试脚本
+#  运行方式: python ui/chart_cache.py
+# ===================================================================
+if __name__ == '__main__':
+    print("--- Running ChartCache Self-Test ---")
+    rows = [('张三', 100.0, 80.0)] * 10
+    bitmap_size = (100, 50)  # 每张位图 20000 字节
+    cache = ChartCache(max_bytes=3 * (bitmap_size[0] * bitmap_size[1] * 4 + estimate_data_size(rows)))
+
+    print("\n[Test Case 1] 命中与未命中")
+    assert cache.get((0, '张三')) is None
+    cache.put((0, '张三'), rows, object(), bitmap_size)
+    entry = cache.get((0, '张三'))
+    assert entry.data == rows and entry.bitmap_for(bitmap_size) is not None
+    assert entry.bitmap_for((200, 100)) is None  # 画布尺寸变化后位图不可用
+    print(cache.get_stats())
+
+    print("\n[Test Case 2] 按字节数淘汰最久未使用的图表")
+    for name in ('李四', '王五'):
+        cache.put((0, name), rows, object(), bitmap_size)
+    cache.get((0, '张三'))  # 张三变为最近使用
+    cache.put((0, '赵六'), rows, object(), bitmap_size)
+    assert cache.get((0, '李四')) is None and cache.get((0, '张三')) is not None
+    assert len(cache) == 3 and cache.total_bytes <= cache.max_bytes and cache.evictions == 1
+    print(cache.get_stats())
+
+    print("\n[Test Case 3] 替换条目时重新计算占用，超过上限的图表不缓存")
+    cache.put((0, '张三'), rows)
+    assert cache.get((0, '张三')).bitmap is None
+    assert cache.put((1, '2024-01-上'), rows, object(), (1000, 1000)) is None
+    cache.clear()
+    assert len(cache) == 0 and cache.total_bytes == 0
+
+    print("\n--- Test Completed Successfully ---")
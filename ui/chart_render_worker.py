@@ -0,0 +1,211 @@
+# ui/chart_render_worker.py
+import queue
+import threading
+from concurrent.futures import Future
+
+from PyQt5.QtCore import QObject, QRectF, pyqtSignal
+from PyQt5.QtGui import QImage
+
+try:
+    from chart_renderer import OffscreenChart
+except ImportError:
+    from ui.chart_renderer import OffscreenChart
+
+
+class RenderedChart:
+    """绘制好的图表：图片及其坐标轴区域，用于鼠标位置与数据x坐标的换算
+
+    rect 为坐标轴区域（逻辑像素，原点在左上角），xlim / ylim 为坐标轴的数据范围。
+    """
+    def __init__(self, image, rect, xlim, ylim):
+        self.image = image
+        self.rect = rect
+        self.xlim = xlim
+        self.ylim = ylim
+
+    def size(self):
+        """图片的像素尺寸"""
+        return (self.image.width(), self.image.height())
+
+
+class ChartRenderJob:
+    """一次图表绘制请求，width/height 为位图的像素尺寸"""
+    def __init__(self, request_id, chart_type, args, message, fonts, width, height, dpi, pixel_ratio, on_result):
+        self.request_id = request_id
+        self.chart_type = chart_type
+        self.args = args
+        self.message = message
+        self.fonts = fonts
+        self.width = width
+        self.height = height
+        self.dpi = dpi
+        self.pixel_ratio = pixel_ratio
+        self.on_result = on_result
+        self.future = Future()
+
+
+class ChartRenderWorker(QObject):
+    """在专用的后台线程中用 Agg 绘制图表，绘制好的图表（RenderedChart）通过 Qt 信号回到界面线程
+
+    后台线程拥有自己的 OffscreenChart，界面线程不再执行 matplotlib 绘制。
+    每次 submit 都会取代之前的请求：尚未开始的旧请求直接跳过，已绘制完的旧结果被丢弃，
+    只有最后一次请求的图片交给 on_result。
+    threaded=False 时在调用线程中同步绘制，便于单独运行各界面模块。
+    """
+    _finished = pyqtSignal(object)
+
+    def __init__(self, parent=None, threaded=True):
+        super().__init__(parent)
+        self.threaded = threaded
+        self.pending_count = 0   # 尚未交付的请求数
+        self.rendered_count = 0  # 实际绘制的次数
+        self.dropped_count = 0   # 被新请求取代而跳过或丢弃的次数
+        self._next_id = 0
+        self._latest = 0
+        self._finished.connect(self._deliver)
+
+        self._chart = None  # 在绘制线程中创建
+        self._queue = queue.Queue()
+        self._thread = None
+        if self.threaded:
+            self._thread = threading.Thread(target=self._run, name="ChartRenderWorker", daemon=True)
+            self._thread.start()
+
+    def is_busy(self):
+        return self.pending_count > 0
+
+    def submit(self, chart_type, args=None, message=None, fonts=(12, 10), size=(640, 480), dpi=100,
+               pixel_ratio=1.0, on_result=None):
+        """绘制图表，返回 concurrent.futures.Future，结果为 RenderedChart
+
+        size 为位图的像素尺寸，dpi 已包含屏幕的像素比例 pixel_ratio。
+        """
+        self._next_id += 1
+        job = ChartRenderJob(self._next_id, chart_type, args, message, fonts, size[0], size[1],
+                             dpi, pixel_ratio, on_result)
+        self._latest = job.request_id
+        self.pending_count += 1
+        if self.threaded:
+            self._queue.put(job)
+        else:
+            self._execute(job)
+            self._deliver(job)
+        return job.future
+
+    def cancel(self):
+        """丢弃所有尚未交付的绘制结果"""
+        self._next_id += 1
+        self._latest = self._next_id
+
+    def shutdown(self):
+        """停止绘制线程，排队中的请求不再绘制"""
+        if self._thread is not None:
+            self.cancel()
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _is_stale(self, job):
+        return job.request_id != self._latest
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if self._is_stale(job):
+                # 已被新请求取代，不再绘制
+                job.future.cancel()
+            else:
+                self._execute(job)
+            self._finished.emit(job)
+
+    def _execute(self, job):
+        if not job.future.set_running_or_notify_cancel():
+            return
+        try:
+            if self._chart is None:
+                self._chart = OffscreenChart()
+            buffer = self._chart.render(job.chart_type, job.args, job.message, job.fonts,
+                                        job.width, job.height, job.dpi)
+            # copy() 让图片拥有自己的像素数据，不再引用 Agg 画布的缓冲区
+            image = QImage(bytes(buffer), job.width, job.height, job.width * 4,
+                           QImage.Format_RGBA8888).copy()
+            image.setDevicePixelRatio(job.pixel_ratio)
+            (left, top, width, height), xlim, ylim = self._chart.axes_geometry()
+            ratio = job.pixel_ratio
+            rect = QRectF(left / ratio, top / ratio, width / ratio, height / ratio)
+            self.rendered_count += 1
+            job.future.set_result(RenderedChart(image, rect, xlim, ylim))
+        except Exception as e:
+            job.future.set_exception(e)
+
+    def _deliver(self, job):
+        """在界面线程中把绘制好的图表交给回调"""
+        self.pending_count -= 1
+        if job.future.cancelled() or self._is_stale(job):
+            self.dropped_count += 1
+            return
+        error = job.future.exception()
+        if error is not None:
+            print(f"绘制图表出错: {error}")
+        elif job.on_result:
+            job.on_result(job.future.result())
+
+
+# ===================================================================
+#  独立测试脚本
+#  运行方式: python ui/chart_render_worker.py
+# ===================================================================
+if __name__ == '__main__':
+    import sys
+    import time
+    from PyQt5.QtCore import QCoreApplication
+
+    def wait_idle(worker, timeout=30):
+        deadline = time.monotonic() + timeout
+        while worker.is_busy() and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.001)
+        assert not worker.is_busy(), "等待图表绘制超时"
+
+    print("--- Running ChartRenderWorker Self-Test ---")
+    app = QCoreApplication(sys.argv)
+    worker = ChartRenderWorker()
+    gui_thread = threading.get_ident()
+
+    print("\n[Test Case 1] 后台绘制，图片在界面线程交付")
+    images = []
+    worker.submit(0, ('张三', ['2024-01-上', '2024-01-下'], [100, 120], [80, 90]), size=(400, 300),
+                  on_result=lambda chart: images.append((threading.get_ident(), chart)))
+    wait_idle(worker)
+    thread_id, chart = images[0]
+    assert thread_id == gui_thread and chart.size() == (400, 300)
+    assert chart.image.pixelColor(0, 0).name() == '#ffffff'  # 背景为白色
+    assert 0 < chart.rect.left() < chart.rect.right() < 400 and chart.xlim[0] < 0 < 1 < chart.xlim[1]
+    print(f"图片: {chart.size()}，坐标轴区域: {chart.rect}，绘制次数: {worker.rendered_count}")
+
+    print("\n[Test Case 2] 连续提交只交付最后一次请求的图片")
+    delivered = []
+    for i in range(5):
+        worker.submit(1, ('2024-01-上', ['张三', '李四'], [100, 50 + i], [80, 60]), size=(400, 300),
+                      on_result=lambda image, i=i: delivered.append(i))
+    wait_idle(worker)
+    assert delivered == [4], delivered
+    print(f"交付: {delivered}，跳过或丢弃: {worker.dropped_count}")
+
+    print("\n[Test Case 3] 取消后不再交付")
+    worker.submit(0, message="暂无数据", on_result=delivered.append)
+    worker.cancel()
+    wait_idle(worker)
+    assert delivered == [4]
+
+    print("\n[Test Case 4] 同步模式，像素比例为2时图片按逻辑尺寸显示")
+    inline = ChartRenderWorker(threaded=False)
+    future = inline.submit(0, message="请选择一个姓名", size=(800, 600), dpi=200, pixel_ratio=2.0)
+    chart = future.result()
+    assert chart.image.devicePixelRatio() == 2.0 and chart.size() == (800, 600)
+    assert chart.rect.right() <= 400  # 坐标轴区域为逻辑像素
+    worker.shutdown()
+
+    print("\n--- Test Completed Successfully ---")
@@ -0,0 +1,521 @@
+# ui/chart_renderer.py
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
+
+try:
+    from downsample import lttb_indices, extrema_indices
+except ImportError:
+    from ui.downsample import lttb_indices, extrema_indices
+
+# 系列颜色与 matplotlib 默认颜色循环一致
+LEFT_COLOR, RIGHT_COLOR, TOTAL_COLOR = 'C0', 'C1', 'C2'
+
+
+class ChartRenderer:
+    """一种图表的渲染器：坐标轴和图形元素只创建一次，之后原地更新数据和字体
+
+    每个渲染器拥有自己的坐标轴，同一时间只有一个渲染器挂在 figure 上（attach/detach），
+    figure.tight_layout 只需考虑当前图表。数据点的标签使用对象池，数量变化时
+    只新建不足的部分，多余的隐藏；多出需要数量一倍以上时删除多余的部分，
+    因为图例自动选位置时隐藏的元素也要参与计算。
+    """
+    def __init__(self, figure):
+        self.figure = figure
+        self.ax = figure.add_subplot(111)
+        figure.delaxes(self.ax)
+        self.data_font_size = 12
+        self.xlabel_font_size = 10
+        self._labels = []  # 数据标签对象池
+        self._ticks = None  # 当前x轴刻度的 (位置, 标签)
+        self.layout_dirty = True  # 刻度标签或字体变化后需要重新 tight_layout
+
+    def attach(self):
+        if self.ax not in self.figure.axes:
+            # 另一种图表重新布局时修改了 figure 的边距，先让坐标轴位置与之一致
+            self.ax.set_position(self.ax.get_subplotspec().get_position(self.figure))
+            self.figure.add_axes(self.ax)
+            self.layout_dirty = True
+
+    def detach(self):
+        if self.ax in self.figure.axes:
+            self.figure.delaxes(self.ax)
+
+    def set_fonts(self, data_font_size, xlabel_font_size):
+        """原地修改数据标签、图例和刻度的字号"""
+        if (data_font_size, xlabel_font_size) == (self.data_font_size, self.xlabel_font_size):
+            return
+        self.data_font_size = data_font_size
+        self.xlabel_font_size = xlabel_font_size
+        for label in self._labels:
+            label.set_fontsize(data_font_size)
+        legend = self.ax.get_legend()
+        if legend is not None:
+            for text in legend.get_texts():
+                text.set_fontsize(data_font_size)
+        self._apply_tick_fonts()
+        self.layout_dirty = True
+
+    def _apply_tick_fonts(self):
+        self.ax.tick_params(axis='x', labelsize=self.xlabel_font_size)
+        self.ax.tick_params(axis='y', labelsize=self.data_font_size)
+
+    def show_message(self, text):
+        """隐藏全部数据和图例，只在标题显示提示文字"""
+        self._show_count(0)
+        self._set_labels([])
+        self._set_categories([])
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        self.ax.set_title(text)
+
+    def _show_legend(self, **kwargs):
+        """显示图例：显示提示文字时图例被移除，再次显示数据时重新创建"""
+        if self.ax.get_legend() is None:
+            self.ax.legend(fontsize=self.data_font_size, **kwargs)
+
+    def _set_categories(self, categories, rotation=45, ha='center'):
+        """设置x轴的分类刻度，第 i 个分类位于 x=i"""
+        categories = list(categories)
+        self._set_ticks(range(len(categories)), categories, rotation, ha)
+
+    def _set_ticks(self, positions, labels, rotation=45, ha='center'):
+        """设置x轴刻度的位置和标签，有变化时标记需要重新布局"""
+        ticks = (list(positions), list(labels))
+        if ticks != self._ticks or not ticks[1]:
+            self.ax.set_xticks(ticks[0])
+            self.ax.set_xticklabels(ticks[1], rotation=rotation, ha=ha)
+            self._ticks = ticks
+            self.layout_dirty = True
+
+    def _set_labels(self, items, offset=10):
+        """更新数据标签 [(文字, x, y, 颜色)]，复用已创建的标签"""
+        if len(self._labels) > 2 * len(items):
+            for label in self._labels[len(items):]:
+                label.remove()
+            del self._labels[len(items):]
+        while len(self._labels) < len(items):
+            self._labels.append(self.ax.annotate(
+                '', (0, 0), textcoords="offset points", xytext=(0, offset), ha='center',
+                fontsize=self.data_font_size))
+        for label, (text, x, y, color) in zip(self._labels, items):
+            label.set_text(text)
+            label.xy = (x, y)
+            label.set_color(color)
+            label.set_visible(True)
+        for label in self._labels[len(items):]:
+            label.set_visible(False)
+
+    def _show_count(self, count):
+        """只显示前 count 个数据点，子类按需覆盖；默认没有需要隐藏的元素"""
+
+    def _rescale(self, view=None):
+        """按可见数据调整坐标范围；view 为指定的x范围 (起, 止)，此时只自动调整y轴"""
+        self.ax.relim(visible_only=True)
+        if view is None:
+            self.ax.set_autoscalex_on(True)
+            self.ax.autoscale_view()
+        else:
+            self.ax.set_xlim(view)
+            self.ax.autoscale_view(scalex=False)
+
+    def finish(self):
+        """数据或字体更新后调用：只在刻度标签或字体变化时重新布局"""
+        if self.layout_dirty:
+            self.figure.tight_layout()
+            self.layout_dirty = False
+
+
+class TrendChartRenderer(ChartRenderer):
+    """个人业绩趋势折线图：左区、右区、总业绩三条折线及数值标签
+
+    显示范围内的时期数超过 MAX_POINTS 时，每条折线用 LTTB 降采样，只标注最高点和最低点；
+    放大到范围内不超过 MAX_POINTS 个时期时按完整数据绘制，并标注每个点。
+    """
+    MAX_POINTS = 60  # 显示范围内超过该点数时降采样
+    MAX_TICKS = 24   # x轴最多显示的时期标签数
+
+    def __init__(self, figure):
+        super().__init__(figure)
+        ax = self.ax
+        self.left_line, = ax.plot([], [], marker='o', linestyle='-', color=LEFT_COLOR, label='左区业绩')
+        self.right_line, = ax.plot([], [], marker='o', linestyle='-', color=RIGHT_COLOR, label='右区业绩')
+        self.total_line, = ax.plot([], [], marker='s', linestyle='--', color=TOTAL_COLOR, label='总业绩')
+        self.lines = (self.left_line, self.right_line, self.total_line)
+        self.downsampled = False  # 最近一次更新是否降采样
+        ax.set_xlabel("时期")
+        ax.set_ylabel("业绩")
+        ax.grid(True)
+        self._show_legend()
+        ax.tick_params(axis='x', rotation=45)
+        self._apply_tick_fonts()
+
+    def update(self, name, periods, left_perfs, right_perfs, view=None):
+        """显示一名人员的业绩趋势，periods 为界面格式的时期
+
+        第 i 个时期位于 x=i；view 为显示的x范围 (起, 止)，None 表示全部时期。
+        """
+        left = np.asarray(left_perfs, dtype=float)
+        right = np.asarray(right_perfs, dtype=float)
+        count = len(periods)
+        first, last = 0, count - 1
+        if view is not None:
+            first, last = max(first, int(np.ceil(view[0]))), min(last, int(np.floor(view[1])))
+        # 两侧各多取一个时期，放大时折线能延伸到显示范围的边缘
+        start, stop = max(0, first - 1), min(count, last + 2)
+        self.downsampled = stop - start > self.MAX_POINTS
+
+        labels = []
+        for line, values in zip(self.lines, (left, right, left + right)):
+            if self.downsampled:
+                keep = start + lttb_indices(values[start:stop], self.MAX_POINTS)
+                labeled = [first + i for i in extrema_indices(values[first:last + 1])]
+            else:
+                keep = np.arange(start, stop)
+                labeled = range(first, last + 1)
+            line.set_data(keep, values[keep])
+            line.set_visible(True)
+            labels += [(f'{values[i]:.1f}', i, values[i], line.get_color()) for i in labeled]
+        self._set_labels(labels)
+
+        step = max(1, -(-(last - first + 1) // self.MAX_TICKS))
+        ticks = list(range(first, last + 1, step))
+        self._set_ticks(ticks, [periods[i] for i in ticks])
+        self.ax.set_title(f"{name} 的业绩趋势")
+        self._show_legend()
+        self._rescale(view)
+
+    def _show_count(self, count):
+        for line in self.lines:
+            line.set_data([], [])
+
+
+class ComparisonChartRenderer(ChartRenderer):
+    """时期业绩对比柱状图：每人左区、右区两根柱子及柱顶数值
+
+    按名次分页显示时，最后一组柱子可以是本页以外其余人员的合计（“其他”），用斜线填充区分；
+    合计远大于本页人员时y轴按本页人员设置，“其他”柱子超出坐标轴顶端，数值标签放在顶端下方。
+    """
+    BAR_WIDTH = 0.35
+    OTHERS_HATCH = '//'
+    OTHERS_HEADROOM = 1.25  # “其他”柱子超出本页最高值的该倍数时截断显示
+
+    def __init__(self, figure):
+        super().__init__(figure)
+        ax = self.ax
+        self.left_bars = []
+        self.right_bars = []
+        ax.set_ylabel("业绩")
+        # 柱子数量随时期变化，图例使用固定的色块
+        self.legend_handles = [Patch(color=LEFT_COLOR, label='左区业绩'), Patch(color=RIGHT_COLOR, label='右区业绩')]
+        self._show_legend(handles=self.legend_handles)
+        self._apply_tick_fonts()
+
+    def update(self, title, names, left_perfs, right_perfs, others=False, view=None):
+        """显示一个时期各人员的左右区业绩，第 i 个人位于 x=i
+
+        others 为 True 时最后一组柱子是其余人员的合计；view 为显示的x范围 (起, 止)。
+        """
+        count = len(names)
+        self._resize_bars(count)
+        self._show_count(count)
+        for bars, values in ((self.left_bars, left_perfs), (self.right_bars, right_perfs)):
+            for i, (bar, value) in enumerate(zip(bars, values)):
+                bar.set_height(value)
+                bar.set_hatch(self.OTHERS_HATCH if others and i == count - 1 else None)
+        self._set_categories(names, ha='right')
+        top = None
+        if others and count > 1:
+            page_max = max(max(left_perfs[:-1]), max(right_perfs[:-1]))
+            if page_max > 0 and max(left_perfs[-1], right_perfs[-1]) > page_max * self.OTHERS_HEADROOM:
+                top = page_max * self.OTHERS_HEADROOM
+        # 截断的左右区标签上下错开，避免重叠
+        self._set_labels([(f'{value:.2f}', bar.get_x() + bar.get_width() / 2,
+                           value if top is None else min(value, top * clip), 'black')
+                          for bars, values, clip in ((self.left_bars, left_perfs, 0.84),
+                                                     (self.right_bars, right_perfs, 0.93))
+                          for bar, value in zip(bars, values)], offset=3)
+        self.ax.set_title(title)
+        self._show_legend(handles=self.legend_handles)
+        self._rescale(view)
+        if top is not None:
+            # auto=None 不关闭y轴自动缩放，之后的图表仍按数据调整
+            self.ax.set_ylim(top=top, auto=None)
+
+    def _resize_bars(self, count):
+        """柱子不足时补建，已有的柱子保留复用；多出一倍以上时删除多余的柱子"""
+        if len(self.left_bars) > 2 * count:
+            for bar in self.left_bars[count:] + self.right_bars[count:]:
+                bar.remove()
+            del self.left_bars[count:], self.right_bars[count:]
+        start = len(self.left_bars)
+        if count <= start:
+            return
+        x = range(start, count)
+        self.left_bars += list(self.ax.bar([i - self.BAR_WIDTH / 2 for i in x], [0] * len(x),
+                                           self.BAR_WIDTH, color=LEFT_COLOR))
+        self.right_bars += list(self.ax.bar([i + self.BAR_WIDTH / 2 for i in x], [0] * len(x),
+                                            self.BAR_WIDTH, color=RIGHT_COLOR))
+
+    def _show_count(self, count):
+        for bars in (self.left_bars, self.right_bars):
+            for i, bar in enumerate(bars):
+                bar.set_visible(i < count)
+
+
+class OverlayTrendChartRenderer(ChartRenderer):
+    """多人业绩趋势叠加图：每人一条折线，全部折线放在一个 LineCollection 中
+
+    values 的每一行是一名人员在共同时期轴上的数据，缺失的时期为 NaN，转换为掩码数组后折线在此断开。
+    人数不超过 MAX_LEGEND 时每人一种颜色并显示图例；人数更多时所有折线用同一种半透明颜色，
+    另画一条各时期中位数的粗线，图例只显示人数和中位数。
+    人数超过 MAX_LINES 时绘制耗时随折线总长度增长，且折线已无法分辨，
+    改为绘制各时期的分位数带（10%–90%、25%–75%）和中位数，绘制耗时只与时期数有关。
+    """
+    MAX_LEGEND = 10  # 超过该人数时不再逐人区分颜色
+    MAX_LINES = 200  # 超过该人数时绘制分位数带而不是每人的折线
+    MAX_TICKS = 24   # x轴最多显示的时期标签数
+    BANDS = ((10, 90, 0.2), (25, 75, 0.35))  # (下分位数, 上分位数, 透明度)
+
+    def __init__(self, figure):
+        super().__init__(figure)
+        ax = self.ax
+        self.lines = LineCollection([], linewidths=1.5)
+        ax.add_collection(self.lines)
+        self.bands = []
+        for low, high, alpha in self.BANDS:
+            band = PolyCollection([], facecolors=LEFT_COLOR, edgecolors='none', alpha=alpha,
+                                  label=f'{low}%–{high}%')
+            ax.add_collection(band)
+            self.bands.append(band)
+        self.median_line, = ax.plot([], [], color='black', linewidth=2.5, label='中位数')
+        ax.set_xlabel("时期")
+        ax.grid(True)
+        self._apply_tick_fonts()
+
+    def update(self, title, names, periods, values, ylabel, view=None):
+        """显示 len(names) 名人员在 len(periods) 个时期的折线，第 i 个时期位于 x=i
+
+        view 为显示的x范围 (起, 止)，None 表示全部时期。
+        """
+        rows, columns = values.shape
+        x = np.arange(columns, dtype=float)
+        banded = rows > self.MAX_LINES
+        if banded:
+            # 每列至少有一个值（全空的时期已被去掉），nanpercentile 按列忽略缺失的人员
+            percentiles = np.nanpercentile(values, [p for band in self.BANDS for p in band[:2]], axis=0)
+            for band, low, high in zip(self.bands, percentiles[0::2], percentiles[1::2]):
+                band.set_verts([np.column_stack([np.concatenate([x, x[::-1]]),
+                                                 np.concatenate([low, high[::-1]])])])
+            self.lines.set_segments([])
+            handles = [Patch(color=LEFT_COLOR, alpha=0.55, label=f'{rows} 人')] + self.bands
+            bounds = percentiles[[0, -1]]
+        else:
+            points = np.stack([np.broadcast_to(x, values.shape), values], axis=-1)
+            self.lines.set_segments(list(np.ma.masked_invalid(points)))
+            bounds = values
+            if rows <= self.MAX_LEGEND:
+                colors = [f'C{i}' for i in range(rows)]
+                self.lines.set_color(colors)
+                self.lines.set_alpha(None)
+                handles = [Line2D([], [], color=color, label=name) for color, name in zip(colors, names)]
+            else:
+                # 人数越多每条线越淡，重叠处颜色加深，能看出大多数人所在的区间
+                self.lines.set_color(LEFT_COLOR)
+                self.lines.set_alpha(min(0.6, max(0.05, 20 / rows)))
+                handles = [Line2D([], [], color=LEFT_COLOR, label=f'{rows} 人')]
+        self.lines.set_visible(not banded)
+        for band in self.bands:
+            band.set_visible(banded)
+        if rows > 1:
+            self.median_line.set_data(x, np.nanmedian(values, axis=0))
+            self.median_line.set_visible(True)
+            handles.append(self.median_line)
+        else:
+            self.median_line.set_visible(False)
+        self.ax.legend(handles=handles, loc='upper left', fontsize=self.data_font_size)
+
+        first, last = 0, columns - 1
+        if view is not None:
+            first, last = max(first, int(np.ceil(view[0]))), min(last, int(np.floor(view[1])))
+        step = max(1, -(-(last - first + 1) // self.MAX_TICKS))
+        ticks = list(range(first, last + 1, step))
+        self._set_ticks(ticks, [periods[i] for i in ticks])
+        self.ax.set_title(title)
+        self.ax.set_ylabel(ylabel)
+        # 集合不参与 relim，坐标范围按显示范围内的数据（或分位数带）计算
+        margin = max(0.5, (columns - 1) * 0.05)
+        self.ax.set_xlim(view if view is not None else (-margin, columns - 1 + margin))
+        visible = bounds[:, first:last + 1]
+        low, high = np.nanmin(visible), np.nanmax(visible)
+        padding = (high - low) * 0.05 or 1.0
+        self.ax.set_ylim(low - padding, high + padding)
+
+    def _show_count(self, count):
+        self.lines.set_visible(count > 0)
+        self.median_line.set_visible(count > 0)
+        for band in self.bands:
+            band.set_visible(False)
+
+
+class HeatmapChartRenderer(ChartRenderer):
+    """团队业绩热力图：人员 × 时期的矩阵用一个 AxesImage 绘制，右侧为颜色条
+
+    无论人员和时期有多少，图上只有一个图像元素，绘制耗时取决于图片像素数而不是格子数；
+    人员多于坐标轴的像素行数时图像按抗锯齿方式缩小，否则每个格子按原色放大。没有记录的格子显示为浅灰色。
+    总业绩使用顺序色带；增长率使用以 0 为中心的红绿色带，范围取绝对值的第 95 百分位，
+    少数极端值不会使其余格子都接近中间色。
+    """
+    MAX_TICKS = 24      # x轴最多显示的时期标签数
+    MAX_ROW_TICKS = 40  # y轴最多显示的姓名数，图表较矮时按字号相应减少
+    METRICS = {  # 指标 -> (色带, 颜色条标题)
+        'total': ('viridis', "总业绩"),
+        'growth': ('RdYlGn', "总增长率 (%)"),
+    }
+
+    def __init__(self, figure):
+        super().__init__(figure)
+        ax = self.ax
+        self.image = ax.imshow(np.zeros((1, 1)), aspect='auto', interpolation='antialiased')
+        # 颜色条占用坐标轴右侧的一格，两者都属于同一个 gridspec，tight_layout 一并布局；
+        # 创建颜色条时坐标轴需要在 figure 上
+        figure.add_axes(ax)
+        self.colorbar = figure.colorbar(self.image, ax=ax)
+        self.cax = self.colorbar.ax
+        for axes in (ax, self.cax):
+            figure.delaxes(axes)
+        self._row_ticks = None
+        self.metric = None
+        ax.set_xlabel("时期")
+        self._apply_tick_fonts()
+
+    def attach(self):
+        super().attach()
+        if self.cax not in self.figure.axes:
+            self.cax.set_position(self.cax.get_subplotspec().get_position(self.figure))
+            self.figure.add_axes(self.cax)
+
+    def detach(self):
+        super().detach()
+        if self.cax in self.figure.axes:
+            self.figure.delaxes(self.cax)
+
+    def _apply_tick_fonts(self):
+        super()._apply_tick_fonts()
+        self.ax.tick_params(axis='y', labelsize=self.xlabel_font_size)
+        self.cax.tick_params(labelsize=self.data_font_size)
+        self.colorbar.set_label(self.colorbar.ax.get_ylabel(), fontsize=self.data_font_size)
+
+    def update(self, title, names, periods, values, metric, view=None):
+        """显示 len(names) × len(periods) 的矩阵 values，第 i 个时期位于 x=i，第 j 个人位于 y=j
+
+        metric 为 'total' 或 'growth'；view 为显示的x范围 (起, 止)，None 表示全部时期。
+        """
+        rows, columns = values.shape
+        self.image.set_data(values)
+        self.image.set_interpolation('nearest' if rows <= self.ax.bbox.height else 'antialiased')
+        self.image.set_extent((-0.5, columns - 0.5, rows - 0.5, -0.5))
+        if metric != self.metric:
+            cmap, label = self.METRICS[metric]
+            self.image.set_cmap(colormaps[cmap].with_extremes(bad='#ecf0f1'))
+            self.colorbar.set_label(label, fontsize=self.data_font_size)
+            self.metric = metric
+            self.layout_dirty = True
+        finite = values[np.isfinite(values)]
+        if metric == 'growth':
+            limit = float(np.percentile(np.abs(finite), 95)) if finite.size else 1.0
+            self.image.set_clim(-limit or -1.0, limit or 1.0)
+        else:
+            low, high = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 1.0)
+            self.image.set_clim(low, high if high > low else low + 1)
+        self.image.set_visible(True)
+        self.cax.set_visible(True)
+
+        first, last = 0, columns - 1
+        if view is not None:
+            first, last = max(first, int(np.ceil(view[0]))), min(last, int(np.floor(view[1])))
+        step = max(1, -(-(last - first + 1) // self.MAX_TICKS))
+        ticks = list(range(first, last + 1, step))
+        self._set_ticks(ticks, [periods[i] for i in ticks])
+        self._set_row_ticks(names)
+        self.ax.set_title(title)
+        self.ax.set_xlim(view if view is not None else (-0.5, columns - 0.5))
+        self.ax.set_ylim(rows - 0.5, -0.5)
+
+    def _set_row_ticks(self, names):
+        """人员较多时只均匀标注其中一部分姓名，相邻姓名之间至少留出半行文字的间距"""
+        line_height = self.xlabel_font_size * self.figure.dpi / 72 * 1.5
+        limit = max(1, min(self.MAX_ROW_TICKS, int(self.ax.bbox.height / line_height)))
+        step = max(1, -(-len(names) // limit))
+        positions = list(range(0, len(names), step))
+        ticks = (positions, [names[i] for i in positions])
+        if ticks != self._row_ticks:
+            self.ax.set_yticks(ticks[0])
+            self.ax.set_yticklabels(ticks[1])
+            self._row_ticks = ticks
+            self.layout_dirty = True
+
+    def _show_count(self, count):
+        self.image.set_visible(count > 0)
+        self.cax.set_visible(count > 0)
+
+    def show_message(self, text):
+        super().show_message(text)
+        self._set_row_ticks([])
+
+
+class OffscreenChart:
+    """在 Agg 画布上绘制图表，不依赖 Qt，可以在后台线程中使用
+
+    每种图表一个渲染器，与界面线程中的图表一样原地更新；
+    只能在创建它的线程中使用。
+    """
+    def __init__(self):
+        self.figure = Figure()
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.renderers = (TrendChartRenderer(self.figure), ComparisonChartRenderer(self.figure),
+                          HeatmapChartRenderer(self.figure), OverlayTrendChartRenderer(self.figure))
+        self.active_renderer = None
+
+    def resize(self, width, height, dpi):
+        """设置画布的像素尺寸，尺寸变化后需要重新布局"""
+        if (self.figure.dpi, self.canvas.get_width_height()) == (dpi, (width, height)):
+            return
+        self.figure.set_dpi(dpi)
+        self.figure.set_size_inches(width / dpi, height / dpi)
+        for renderer in self.renderers:
+            renderer.layout_dirty = True
+
+    def render(self, chart_type, args, message, fonts, width, height, dpi):
+        """绘制图表并返回 RGBA 像素缓冲区
+
+        chart_type 0 为个人业绩趋势，1 为时期业绩对比，2 为团队业绩热力图，3 为多人业绩趋势；message 不为空时只显示提示文字，
+        否则用 args 调用对应渲染器的 update。
+        """
+        self.resize(width, height, dpi)
+        renderer = self.renderers[chart_type]
+        if self.active_renderer is not renderer:
+            if self.active_renderer is not None:
+                self.active_renderer.detach()
+            renderer.attach()
+            self.active_renderer = renderer
+        renderer.set_fonts(*fonts)
+        if message:
+            renderer.show_message(message)
+        else:
+            renderer.update(*args)
+        renderer.finish()
+        self.canvas.draw()
+        return self.canvas.buffer_rgba()
+
+    def axes_geometry(self):
+        """最近一次绘制的坐标轴区域，返回 ((左, 上, 宽, 高) 像素，x范围，y范围)，原点在左上角"""
+        ax = self.active_renderer.ax
+        box = ax.get_window_extent()
+        top = self.figure.bbox.height - box.y1
+        return (box.x0, top, box.width, box.height), tuple(ax.get_xlim()), tuple(ax.get_ylim())
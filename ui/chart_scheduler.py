@@ -0,0 +1,116 @@
+# ui/chart_scheduler.py
+from PyQt5.QtCore import QObject, QTimer
+
+# 控件停止变化多久后才重新生成图表（毫秒）
+CHART_REQUEST_DELAY = 150
+
+
+class ChartRequestScheduler(QObject):
+    """合并短时间内连续的图表请求，控件停止变化 delay 毫秒后只执行一次
+
+    请求分两级：request_render 只用已读取的数据重新绘制（字号、尺寸变化），
+    request_query 需要重新查询数据再绘制（图表类型、人员、时期变化）；
+    等待期间两种请求都有时执行 on_query。
+    requested_count 为收到的请求数，executed_count 为实际执行的次数。
+    """
+    RENDER, QUERY = 1, 2
+
+    def __init__(self, on_query, on_render, delay=CHART_REQUEST_DELAY, parent=None):
+        super().__init__(parent)
+        self.on_query = on_query
+        self.on_render = on_render
+        self.requested_count = 0
+        self.executed_count = 0
+        self._pending = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self.flush)
+
+    def request_query(self, *args):
+        """接受任意参数，可以直接连接控件的变化信号"""
+        self._request(self.QUERY)
+
+    def request_render(self, *args):
+        self._request(self.RENDER)
+
+    def _request(self, level):
+        self.requested_count += 1
+        self._pending = max(self._pending, level)
+        self._timer.start()  # 每次请求都重新计时
+
+    def is_pending(self):
+        return self._pending != 0
+
+    def cancel(self):
+        self._timer.stop()
+        self._pending = 0
+
+    def flush(self):
+        """立即执行等待中的请求"""
+        self._timer.stop()
+        level, self._pending = self._pending, 0
+        if not level:
+            return
+        self.executed_count += 1
+        if level == self.QUERY:
+            self.on_query()
+        else:
+            self.on_render()
+
+    def get_stats(self):
+        """返回收到的请求数、实际执行次数和被合并（或取消）的请求数"""
+        return {'requested': self.requested_count, 'executed': self.executed_count,
+                'coalesced': self.requested_count - self.executed_count - (1 if self._pending else 0)}
+
+
+# ===================================================================
+#  独立测试脚本
+#  运行方式: python ui/chart_scheduler.py
+# ===================================================================
+if __name__ == '__main__':
+    import sys
+    import time
+    from PyQt5.QtCore import QCoreApplication
+
+    def wait_idle(scheduler, timeout=5):
+        deadline = time.monotonic() + timeout
+        while scheduler.is_pending() and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.001)
+        assert not scheduler.is_pending(), "等待图表请求超时"
+
+    print("--- Running ChartRequestScheduler Self-Test ---")
+    app = QCoreApplication(sys.argv)
+    calls = []
+    scheduler = ChartRequestScheduler(lambda: calls.append('query'), lambda: calls.append('render'), delay=30)
+
+    print("\n[Test Case 1] 连续的选择变化只查询一次")
+    for i in range(10):
+        scheduler.request_query(f"人员{i}")
+    wait_idle(scheduler)
+    assert calls == ['query'], calls
+    print(scheduler.get_stats())
+
+    print("\n[Test Case 2] 字号变化只重新绘制，与选择变化合并时查询")
+    calls.clear()
+    scheduler.request_render("12")
+    scheduler.request_render("14")
+    wait_idle(scheduler)
+    scheduler.request_render("16")
+    scheduler.request_query("李四")
+    wait_idle(scheduler)
+    assert calls == ['render', 'query'], calls
+
+    print("\n[Test Case 3] 立即执行与取消")
+    calls.clear()
+    scheduler.request_query()
+    scheduler.flush()
+    scheduler.request_render()
+    scheduler.cancel()
+    assert calls == ['query'] and not scheduler.is_pending()
+    stats = scheduler.get_stats()
+    assert stats == {'requested': 16, 'executed': 4, 'coalesced': 12}, stats
+    print(stats)
+
+    print("\n--- Test Completed Successfully ---")
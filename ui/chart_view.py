@@ -0,0 +1,200 @@
+# ui/chart_view.py
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import Qt, QRect, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QPen, QTransform, QCursor
+
+
+class ChartView(QWidget):
+    """显示后台绘制好的图表，支持滚轮缩放、拖动平移和鼠标悬停读数
+
+    绘制进行中时显示占位提示：已有图片时在图片上半透明覆盖提示文字，
+    没有图片时只显示提示文字。尺寸变化后在新图片送达前先缩放显示旧图片。
+
+    缩放和平移只沿x轴进行：操作后立即把已有图片的坐标轴区域按新的x范围
+    拉伸或移动作为预览，同时发出 view_changed 请求按新范围重新绘制。
+    鼠标悬停时只重绘竖线和提示框所在的区域，图片本身作为背景缓存，不重新绘制。
+    """
+    resized = pyqtSignal()             # 尺寸变化或首次显示，需要按新尺寸重新绘制
+    view_changed = pyqtSignal(object)  # 新的x范围 (起, 止)，None 表示恢复显示全部
+    ZOOM_STEP = 1.25                   # 滚轮每一格的缩放倍数
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.chart = None           # RenderedChart
+        self.placeholder_text = ""
+        self.preview_xlim = None    # 等待重新绘制期间预览的x范围
+        self.hover_text_func = None  # hover_text_func(x下标, 数据y坐标) -> 提示文字或 None
+        self._hover = None          # (竖线x坐标, 提示文字, 提示框矩形)
+        self._drag = None           # (按下时鼠标x坐标, 按下时的x范围, 按下前的预览范围)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(200, 150)
+        self.setMouseTracking(True)
+
+    def render_size(self):
+        """按当前尺寸绘制图片时需要的 (宽, 高) 像素数，已包含屏幕像素比例"""
+        ratio = self.devicePixelRatioF()
+        return (max(1, round(self.width() * ratio)), max(1, round(self.height() * ratio)))
+
+    def set_chart(self, chart):
+        self.chart = chart
+        self.placeholder_text = ""
+        self.preview_xlim = None
+        self.update()
+        if self._hover is not None:
+            self.update_hover(self.mapFromGlobal(QCursor.pos()))
+
+    def set_placeholder(self, text):
+        self.placeholder_text = text
+        self.update()
+
+    def set_preview(self, xlim):
+        """在新图片送达前按 xlim 预览已有图片"""
+        self.preview_xlim = xlim
+        self.clear_hover()
+        self.update()
+
+    def current_xlim(self):
+        if self.preview_xlim is not None:
+            return self.preview_xlim
+        return self.chart.xlim if self.chart is not None else None
+
+    def data_x(self, px):
+        """窗口x坐标对应的数据x坐标"""
+        rect = self.chart.rect
+        x0, x1 = self.current_xlim()
+        return x0 + (px - rect.left()) / rect.width() * (x1 - x0)
+
+    def data_y(self, py):
+        """窗口y坐标对应的数据y坐标（y轴反向时同样适用）"""
+        rect = self.chart.rect
+        bottom, top = self.chart.ylim
+        return top + (py - rect.top()) / rect.height() * (bottom - top)
+
+    def pixel_x(self, x):
+        rect = self.chart.rect
+        x0, x1 = self.current_xlim()
+        return rect.left() + (x - x0) / (x1 - x0) * rect.width()
+
+    def _preview_transform(self):
+        """把图片中按原x范围绘制的坐标轴区域映射到预览范围"""
+        rect = self.chart.rect
+        (old0, old1), (new0, new1) = self.chart.xlim, self.preview_xlim
+        scale = (old1 - old0) / (new1 - new0)
+        dx = rect.left() + (old0 - new0) / (new1 - new0) * rect.width() - rect.left() * scale
+        return QTransform(scale, 0, 0, 1, dx, 0)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        if self.chart is not None:
+            # 图片已包含像素比例，尺寸一致时按原样绘制，否则临时缩放
+            painter.drawImage(self.rect(), self.chart.image)
+            if self.preview_xlim is not None:
+                rect = self.chart.rect
+                painter.fillRect(rect, Qt.white)
+                painter.save()
+                painter.setClipRect(rect)
+                painter.setTransform(self._preview_transform())
+                painter.drawImage(self.rect(), self.chart.image)
+                painter.restore()
+        if self.placeholder_text:
+            if self.chart is not None:
+                painter.fillRect(self.rect(), QColor(255, 255, 255, 160))
+            painter.setPen(QColor('#2c3e50'))
+            painter.drawText(self.rect(), Qt.AlignCenter, self.placeholder_text)
+        if self._hover is not None:
+            x, text, box = self._hover
+            rect = self.chart.rect
+            painter.setPen(QPen(QColor('#7f8c8d'), 1, Qt.DashLine))
+            painter.drawLine(round(x), round(rect.top()), round(x), round(rect.bottom()))
+            painter.setPen(QColor('#2c3e50'))
+            painter.setBrush(QColor(255, 255, 255, 230))
+            painter.drawRect(box)
+            painter.drawText(box.adjusted(6, 4, -6, -4), Qt.AlignLeft | Qt.AlignVCenter, text)
+        painter.end()
+
+    def _hover_region(self):
+        if self._hover is None:
+            return QRect()
+        x, _, box = self._hover
+        rect = self.chart.rect.toAlignedRect()
+        line = QRect(round(x) - 2, rect.top() - 1, 5, rect.height() + 2)
+        return line.united(box.adjusted(-2, -2, 2, 2))
+
+    def update_hover(self, pos):
+        """更新鼠标所在时期（或人员）的读数，只重绘竖线和提示框"""
+        old_region = self._hover_region()
+        self._hover = None
+        chart = self.chart
+        if (chart is not None and self.hover_text_func is not None and not self.placeholder_text
+                and self._drag is None and chart.rect.contains(pos.x(), pos.y())):
+            index = round(self.data_x(pos.x()))
+            text = self.hover_text_func(index, self.data_y(pos.y()))
+            if text:
+                x = self.pixel_x(index)
+                size = self.fontMetrics().boundingRect(QRect(0, 0, 400, 400), Qt.AlignLeft, text).size()
+                box = QRect(round(x) + 12, pos.y() + 12, size.width() + 12, size.height() + 8)
+                # 提示框靠近窗口边缘时移到竖线左侧或鼠标上方
+                if box.right() > self.width():
+                    box.moveRight(round(x) - 12)
+                if box.bottom() > self.height():
+                    box.moveBottom(pos.y() - 12)
+                self._hover = (x, text, box)
+        self.update(old_region.united(self._hover_region()))
+
+    def clear_hover(self):
+        if self._hover is not None:
+            region = self._hover_region()
+            self._hover = None
+            self.update(region)
+
+    def mouseMoveEvent(self, event):
+        if self._drag is not None:
+            start_x, (x0, x1), _ = self._drag
+            shift = -(event.x() - start_x) / self.chart.rect.width() * (x1 - x0)
+            self.preview_xlim = (x0 + shift, x1 + shift)
+            self.update()
+            return
+        self.update_hover(event.pos())
+
+    def mousePressEvent(self, event):
+        if (event.button() == Qt.LeftButton and self.chart is not None
+                and self.chart.rect.contains(event.x(), event.y())):
+            self._drag = (event.x(), self.current_xlim(), self.preview_xlim)
+            self.clear_hover()
+            self.setCursor(Qt.ClosedHandCursor)
+
+    def mouseReleaseEvent(self, event):
+        if self._drag is None:
+            return
+        start_x, _, previous_preview = self._drag
+        self._drag = None
+        self.unsetCursor()
+        if event.x() != start_x:
+            self.view_changed.emit(self.preview_xlim)
+        else:
+            self.preview_xlim = previous_preview
+            self.update_hover(event.pos())
+
+    def mouseDoubleClickEvent(self, event):
+        if self.chart is not None:
+            self.view_changed.emit(None)
+
+    def wheelEvent(self, event):
+        if self.chart is None or self._drag is not None:
+            return
+        factor = 1 / self.ZOOM_STEP if event.angleDelta().y() > 0 else self.ZOOM_STEP
+        x0, x1 = self.current_xlim()
+        center = min(max(self.data_x(event.x()), x0), x1)
+        self.view_changed.emit((center - (center - x0) * factor, center + (x1 - center) * factor))
+
+    def leaveEvent(self, event):
+        self.clear_hover()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.resized.emit()
@@ -1,9 +1,9 @@
 # ui/charts_tab.py
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, 
                                QPushButton, QStackedWidget)
+from PyQt5.QtCore import Qt
 import matplotlib
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+import numpy as np
 
 # 解决中文显示问题
 matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'DejaVu Sans']  # 多字体备选
@@ -11,14 +11,58 @@ matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 matplotlib.rcParams['figure.dpi'] = 150  # 提高图表清晰度
 matplotlib.rcParams['figure.figsize'] = [10, 6]  # 增大图表尺寸
 
+try:
+    from query_executor import QueryExecutor
+    from chart_cache import ChartCache
+    from chart_render_worker import ChartRenderWorker
+    from chart_view import ChartView
+    from chart_scheduler import ChartRequestScheduler
+    from performance_matrix import PerformanceMatrix, PerformanceMatrixCache
+except ImportError:
+    from ui.query_executor import QueryExecutor
+    from ui.chart_cache import ChartCache
+    from ui.chart_render_worker import ChartRenderWorker
+    from ui.chart_view import ChartView
+    from ui.chart_scheduler import ChartRequestScheduler
+    from ui.performance_matrix import PerformanceMatrix, PerformanceMatrixCache
+
 class ChartsTab(QWidget):
-    def __init__(self, db_manager):
+    MIN_VIEW_SPAN = 3  # 放大后至少显示的时期（或人员）数
+    # 时期业绩对比的显示方式：(显示名称, 排名指标)，指标为 None 时按编号顺序显示全部人员
+    RANKING_MODES = [("全部（按编号）", None), ("总业绩排名", 'total'),
+                     ("左区业绩排名", 'left'), ("右区业绩排名", 'right')]
+    PAGE_SIZES = ["10", "20", "50", "100"]
+    # 团队业绩热力图的指标和行排序方式：(显示名称, 取值)
+    HEATMAP_METRICS = [("总业绩", 'total'), ("总增长率", 'growth')]
+    HEATMAP_SORTS = [("全部时期", 'overall'), ("最近一期", 'latest'), ("姓名", 'name')]
+    # 多人业绩趋势的指标：(显示名称, 取值)
+    OVERLAY_METRICS = [("总业绩", 'total'), ("左区业绩", 'left'), ("右区业绩", 'right')]
+    def __init__(self, db_manager, executor=None):
         super().__init__()
         self.db = db_manager
+        # 图表数据通过 executor 在后台线程读取；单独运行本模块时在界面线程同步读取
+        self.executor = executor or QueryExecutor(db_manager, self, threaded=False)
         
-        # Matplotlib 图表组件
-        self.figure = Figure()
-        self.canvas = FigureCanvas(self.figure)
+        # 图表在后台线程中用 Agg 绘制，界面只显示绘制好的图片
+        self.render_worker = ChartRenderWorker(self, threaded=self.executor.threaded)
+        self.chart_view = ChartView()
+        self.chart_view.hover_text_func = self.hover_text
+        self.chart_view.view_changed.connect(self.change_view)
+        self.view_range = None  # 缩放或平移后的x范围，None 表示显示全部
+        self.full_xlim = None   # 显示全部时的x范围
+
+        # 控件快速连续变化（如滚轮滚动下拉框）时合并为一次查询或绘制
+        self.scheduler = ChartRequestScheduler(self.generate_chart, self.render_chart, parent=self)
+        self.chart_view.resized.connect(self.scheduler.request_render)
+
+        # 最近显示过的图表（数据和图片），再次选择时不查询数据库、不重新绘制
+        self.chart_cache = ChartCache()
+        self.chart_cache_version = None
+        # 整理好的人员 × 时期矩阵按数据版本号缓存，只在执行查询的线程中读写
+        self.matrix_cache = PerformanceMatrixCache()
+        self.chart_state = None  # 当前图表的 (图表类型, 选择, 数据, 数据版本号)
+        self.ranking_page = 0    # 按名次分页时当前的页码（从0开始）
+        self.overlay_names = []  # 多人业绩趋势中选定的人员
         
         self.init_ui()
 
@@ -29,7 +73,8 @@ class ChartsTab(QWidget):
         controls_layout = QHBoxLayout()
         controls_layout.addWidget(QLabel("图表类型："))
         self.chart_type_combo = QComboBox()
-        self.chart_type_combo.addItems(["个人业绩趋势（折线图）", "时期业绩对比（柱状图）"])
+        self.chart_type_combo.addItems(["个人业绩趋势（折线图）", "时期业绩对比（柱状图）", "团队业绩热力图",
+                                         "多人业绩趋势（叠加）"])
         self.chart_type_combo.setMinimumWidth(220)
         self.chart_type_combo.setMaximumWidth(280)
         self.chart_type_combo.setStyleSheet("""
@@ -63,7 +108,7 @@ class ChartsTab(QWidget):
             }
         """)
         self.chart_type_combo.currentIndexChanged.connect(self.update_controls)
-        self.chart_type_combo.currentIndexChanged.connect(self.generate_chart)  # 自动生成图表
+        self.chart_type_combo.currentIndexChanged.connect(self.scheduler.request_query)  # 自动生成图表
         controls_layout.addWidget(self.chart_type_combo)
         
         # 使用 QStackedWidget 来切换不同的筛选条件
@@ -76,7 +121,7 @@ class ChartsTab(QWidget):
         self.name_combo = QComboBox()
         self.name_combo.setMinimumWidth(150)
         self.name_combo.setMaximumWidth(200)
-        self.name_combo.currentTextChanged.connect(self.generate_chart)  # 自动生成图表
+        self.name_combo.currentTextChanged.connect(self.scheduler.request_query)  # 自动生成图表
         self.name_combo.setStyleSheet("""
             QComboBox {
                 background-color: #34495e;
@@ -117,7 +162,8 @@ class ChartsTab(QWidget):
         self.period_combo = QComboBox()
         self.period_combo.setMinimumWidth(180)
         self.period_combo.setMaximumWidth(220)
-        self.period_combo.currentTextChanged.connect(self.generate_chart)  # 自动生成图表
+        self.period_combo.currentTextChanged.connect(self.reset_ranking_page)
+        self.period_combo.currentTextChanged.connect(self.scheduler.request_query)  # 自动生成图表
         self.period_combo.setStyleSheet("""
             QComboBox {
                 background-color: #34495e;
@@ -149,7 +195,92 @@ class ChartsTab(QWidget):
             }
         """)
         period_layout.addWidget(self.period_combo)
+
+        # 人数较多时按名次分页显示，每页之外的人员合计为“其他”
+        period_layout.addWidget(QLabel("显示："))
+        self.ranking_combo = QComboBox()
+        self.ranking_combo.addItems([label for label, _ in self.RANKING_MODES])
+        self.ranking_combo.setStyleSheet(self.period_combo.styleSheet())
+        self.ranking_combo.currentIndexChanged.connect(self.reset_ranking_page)
+        self.ranking_combo.currentIndexChanged.connect(self.scheduler.request_query)
+        period_layout.addWidget(self.ranking_combo)
+
+        self.pager_widget = QWidget()
+        pager_layout = QHBoxLayout(self.pager_widget)
+        pager_layout.setContentsMargins(0, 0, 0, 0)
+        pager_layout.addWidget(QLabel("每页："))
+        self.page_size_combo = QComboBox()
+        self.page_size_combo.addItems(self.PAGE_SIZES)
+        self.page_size_combo.setCurrentText("20")
+        self.page_size_combo.setStyleSheet(self.period_combo.styleSheet())
+        self.page_size_combo.currentTextChanged.connect(self.reset_ranking_page)
+        self.page_size_combo.currentTextChanged.connect(self.scheduler.request_query)
+        pager_layout.addWidget(self.page_size_combo)
+        self.prev_page_button = QPushButton("上一页")
+        self.prev_page_button.clicked.connect(lambda: self.change_ranking_page(-1))
+        pager_layout.addWidget(self.prev_page_button)
+        self.page_label = QLabel()
+        pager_layout.addWidget(self.page_label)
+        self.next_page_button = QPushButton("下一页")
+        self.next_page_button.clicked.connect(lambda: self.change_ranking_page(1))
+        pager_layout.addWidget(self.next_page_button)
+        self.pager_widget.setVisible(False)
+        period_layout.addWidget(self.pager_widget)
         self.stacked_widget.addWidget(self.period_filter_widget)
+
+        # 筛选器3: 热力图的指标和排序
+        self.heatmap_filter_widget = QWidget()
+        heatmap_layout = QHBoxLayout(self.heatmap_filter_widget)
+        heatmap_layout.addWidget(QLabel("指标："))
+        self.heatmap_metric_combo = QComboBox()
+        self.heatmap_metric_combo.addItems([label for label, _ in self.HEATMAP_METRICS])
+        self.heatmap_metric_combo.setStyleSheet(self.period_combo.styleSheet())
+        self.heatmap_metric_combo.currentIndexChanged.connect(self.scheduler.request_query)
+        heatmap_layout.addWidget(self.heatmap_metric_combo)
+        heatmap_layout.addWidget(QLabel("排序："))
+        self.heatmap_sort_combo = QComboBox()
+        self.heatmap_sort_combo.addItems([label for label, _ in self.HEATMAP_SORTS])
+        self.heatmap_sort_combo.setStyleSheet(self.period_combo.styleSheet())
+        self.heatmap_sort_combo.currentIndexChanged.connect(self.scheduler.request_query)
+        heatmap_layout.addWidget(self.heatmap_sort_combo)
+        self.stacked_widget.addWidget(self.heatmap_filter_widget)
+
+        # 筛选器4: 多人业绩趋势的人员（选定人员或整个职级）和指标
+        self.overlay_filter_widget = QWidget()
+        overlay_layout = QHBoxLayout(self.overlay_filter_widget)
+        overlay_layout.addWidget(QLabel("人员："))
+        self.overlay_source_combo = QComboBox()
+        self.overlay_source_combo.addItems(["选定人员", "按职级"])
+        self.overlay_source_combo.setStyleSheet(self.period_combo.styleSheet())
+        self.overlay_source_combo.currentIndexChanged.connect(self.update_overlay_controls)
+        self.overlay_source_combo.currentIndexChanged.connect(self.scheduler.request_query)
+        overlay_layout.addWidget(self.overlay_source_combo)
+        self.overlay_name_combo = QComboBox()
+        self.overlay_name_combo.setMinimumWidth(120)
+        self.overlay_name_combo.setStyleSheet(self.period_combo.styleSheet())
+        overlay_layout.addWidget(self.overlay_name_combo)
+        self.add_overlay_name_button = QPushButton("添加")
+        self.add_overlay_name_button.clicked.connect(self.add_overlay_name)
+        overlay_layout.addWidget(self.add_overlay_name_button)
+        self.clear_overlay_names_button = QPushButton("清空")
+        self.clear_overlay_names_button.clicked.connect(self.clear_overlay_names)
+        overlay_layout.addWidget(self.clear_overlay_names_button)
+        self.overlay_names_label = QLabel("未选择")
+        self.overlay_names_label.setMaximumWidth(240)
+        overlay_layout.addWidget(self.overlay_names_label)
+        self.position_combo = QComboBox()
+        self.position_combo.setMinimumWidth(120)
+        self.position_combo.setStyleSheet(self.period_combo.styleSheet())
+        self.position_combo.currentTextChanged.connect(self.scheduler.request_query)
+        overlay_layout.addWidget(self.position_combo)
+        overlay_layout.addWidget(QLabel("指标："))
+        self.overlay_metric_combo = QComboBox()
+        self.overlay_metric_combo.addItems([label for label, _ in self.OVERLAY_METRICS])
+        self.overlay_metric_combo.setStyleSheet(self.period_combo.styleSheet())
+        self.overlay_metric_combo.currentIndexChanged.connect(self.scheduler.request_query)
+        overlay_layout.addWidget(self.overlay_metric_combo)
+        self.stacked_widget.addWidget(self.overlay_filter_widget)
+        self.update_overlay_controls()
         
         controls_layout.addWidget(self.stacked_widget)
         
@@ -160,7 +291,7 @@ class ChartsTab(QWidget):
         self.data_font_size_combo.setCurrentText("12")  # 默认字体调大到12
         self.data_font_size_combo.setMinimumWidth(60)
         self.data_font_size_combo.setMaximumWidth(80)
-        self.data_font_size_combo.currentTextChanged.connect(self.generate_chart)
+        self.data_font_size_combo.currentTextChanged.connect(self.scheduler.request_render)  # 只重新绘制
         self.data_font_size_combo.setStyleSheet("""
             QComboBox {
                 background-color: #34495e;
@@ -199,7 +330,7 @@ class ChartsTab(QWidget):
         self.xlabel_font_size_combo.setCurrentText("10")  # 默认字体调大到10
         self.xlabel_font_size_combo.setMinimumWidth(60)
         self.xlabel_font_size_combo.setMaximumWidth(80)
-        self.xlabel_font_size_combo.currentTextChanged.connect(self.generate_chart)
+        self.xlabel_font_size_combo.currentTextChanged.connect(self.scheduler.request_render)  # 只重新绘制
         self.xlabel_font_size_combo.setStyleSheet("""
             QComboBox {
                 background-color: #34495e;
@@ -237,13 +368,11 @@ class ChartsTab(QWidget):
         main_layout.addLayout(controls_layout)
 
         # 2. 图表显示区域
-        main_layout.addWidget(self.canvas)
-        
-        self.update_controls(0) # 初始化控件
-        self.populate_filters() # 初始填充筛选器
+        main_layout.addWidget(self.chart_view, 1)  # 图表区域占满控件以外的全部空间
         
-        # 初始化时生成图表
+        # 初始化时先显示空图表，筛选器填充完成后生成所选内容的图表
         self.generate_chart()
+        self.update_controls(0) # 初始化控件
 
     def update_controls(self, index):
         """根据图表类型切换筛选器"""
@@ -252,160 +381,407 @@ class ChartsTab(QWidget):
         # 不在这里调用 generate_chart，因为 populate_filters 会触发选择器的变化事件
 
     def populate_filters(self):
-        """从数据库获取数据填充姓名和时期下拉列表"""
-        try:
-            current_type_index = self.chart_type_combo.currentIndex()
-            if current_type_index == 0: # 按姓名
-                # 临时断开信号连接以避免在填充时触发图表生成
-                self.name_combo.currentTextChanged.disconnect()
-                self.name_combo.clear()
-                names = self.db.get_distinct_names()
-                self.name_combo.addItems(names)
-                # 重新连接信号
-                self.name_combo.currentTextChanged.connect(self.generate_chart)
-            else: # 按时期
-                # 临时断开信号连接以避免在填充时触发图表生成
-                self.period_combo.currentTextChanged.disconnect()
-                self.period_combo.clear()
-                periods = self.db.get_distinct_periods()
-                self.period_combo.addItems(periods)
-                # 重新连接信号
-                self.period_combo.currentTextChanged.connect(self.generate_chart)
-        except Exception as e:
-            print(f"Error populating filters: {e}")
-            # 如果出错，确保信号重新连接
-            try:
-                if current_type_index == 0:
-                    self.name_combo.currentTextChanged.connect(self.generate_chart)
-                else:
-                    self.period_combo.currentTextChanged.connect(self.generate_chart)
-            except:
-                pass
+        """在后台读取姓名或时期列表，完成后填充对应的下拉列表"""
+        if self.chart_type_combo.currentIndex() == 0: # 按姓名
+            self.executor.submit('get_distinct_names', key='chart_filter',
+                                 on_result=lambda names: self.fill_filter(self.name_combo, names),
+                                 on_error=lambda e: print(f"Error populating filters: {e}"))
+        elif self.chart_type_combo.currentIndex() == 1: # 按时期
+            self.executor.submit('get_distinct_periods', key='chart_filter',
+                                 on_result=lambda periods: self.fill_filter(self.period_combo, periods),
+                                 on_error=lambda e: print(f"Error populating filters: {e}"))
+        elif self.chart_type_combo.currentIndex() == 3: # 多人业绩趋势：可选的姓名和职级
+            self.executor.submit('get_distinct_names', key='chart_filter',
+                                 on_result=lambda names: self.fill_filter(self.overlay_name_combo, names),
+                                 on_error=lambda e: print(f"Error populating filters: {e}"))
+            self.executor.submit('get_distinct_positions', key='chart_filter_positions',
+                                 on_result=lambda positions: self.fill_filter(self.position_combo, positions),
+                                 on_error=lambda e: print(f"Error populating filters: {e}"))
+
+    def fill_filter(self, combo, items):
+        """填充筛选下拉列表，尽量保留原来的选择；选择变化时重新生成图表"""
+        previous = combo.currentText()
+        # 临时屏蔽信号以避免在填充时触发图表生成
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems(items)
+        if previous in items:
+            combo.setCurrentText(previous)
+        combo.blockSignals(False)
+        if combo.currentText() != previous:
+            self.scheduler.request_query()
 
     def generate_chart(self):
-        """根据选择生成相应的图表"""
-        # 防止在没有数据时出错
-        try:
-            self.figure.clear()
-            chart_type = self.chart_type_combo.currentIndex()
-
-            if chart_type == 0: # 个人业绩趋势
-                self.plot_person_trend()
-            else: # 时期业绩对比
-                self.plot_period_comparison()
-            
-            self.canvas.draw()
-        except Exception as e:
-            print(f"Error generating chart: {e}")
-            # 在出错时显示空图表
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            ax.set_title("暂无数据或数据加载中...")
-            self.canvas.draw()
-        
-    def plot_person_trend(self):
-        """绘制个人业绩折线图"""
-        ax = self.figure.add_subplot(111)
-        name = self.name_combo.currentText()
-        if not name:
-            ax.set_title("请选择一个姓名")
+        """根据选择在后台读取图表数据，完成后在后台绘制相应的图表
+
+        连续切换选择时只绘制最后一次选择的图表；最近显示过的图表直接从缓存显示。
+        """
+        chart_type = self.chart_type_combo.currentIndex()
+        if chart_type == 0: # 个人业绩趋势
+            selection = self.name_combo.currentText()
+            query, args = 'get_data_by_name', (selection,)
+        elif chart_type == 2: # 团队业绩热力图
+            metric = self.HEATMAP_METRICS[self.heatmap_metric_combo.currentIndex()][1]
+            sort = self.HEATMAP_SORTS[self.heatmap_sort_combo.currentIndex()][1]
+            selection = (metric, sort)
+            # 读取、整理和排序矩阵都在后台线程中进行，数据未变化时直接使用缓存的矩阵
+            query, args = (lambda db: self.matrix_cache.load(db, metric).sorted_by(sort)), ()
+        elif chart_type == 3: # 多人业绩趋势
+            metric = self.OVERLAY_METRICS[self.overlay_metric_combo.currentIndex()][1]
+            if self.overlay_source_combo.currentIndex() == 0:
+                group = tuple(self.overlay_names)
+                names, position = list(group), None
+            else:
+                group = self.position_combo.currentText()
+                names, position = None, group
+            selection = (self.overlay_source_combo.currentIndex(), group, metric) if group else None
+            # 一次查询读取所选人员的全部记录，在后台线程中对齐到共同的时期轴
+            query, args = (lambda db: self.matrix_cache.load(db, metric, names, position).sorted_by('overall')), ()
+        else: # 时期业绩对比
+            selection = self.period_combo.currentText()
+            query, args = 'get_data_by_period', (selection,)
+            metric = self.ranking_metric()
+            if metric is not None and selection:
+                # 按名次分页：只读取当前页的人员
+                page_size = self.page_size()
+                query = 'get_period_ranking'
+                args = (selection, metric, page_size, self.ranking_page * page_size)
+                selection = (selection, metric, page_size, self.ranking_page)
+
+        # 选择已变化，正在进行的查询和绘制结果都不再需要
+        self.executor.cancel_key('chart_data')
+        self.render_worker.cancel()
+        if self.chart_state is None or self.chart_state[:2] != (chart_type, selection):
+            self.view_range = None
+        if not selection:
+            self.draw_chart(chart_type, selection, None)
             return
-            
-        data = self.db.get_data_by_name(name)
-        if not data:
-            ax.set_title(f"未找到 {name} 的业绩数据")
+
+        version = self.db.data_version
+        entry = self.chart_cache.get(self.chart_key(chart_type, selection, version))
+        if entry is not None:
+            self.draw_chart(chart_type, selection, entry.data, version, entry)
+            return
+        previous = self.chart_state
+        if (chart_type == 2 and previous is not None and previous[0] == 2 and previous[1][0] == selection[0]
+                and previous[3] == version and isinstance(previous[2], PerformanceMatrix)):
+            # 只改变了热力图的排序方式：重新排列已读取的矩阵，不再查询
+            self.draw_chart(chart_type, selection, previous[2].sorted_by(selection[1]), version)
+            return
+
+        # 读取期间保留当前图表，显示忙碌光标
+        self.chart_view.setCursor(Qt.BusyCursor)
+        self.executor.submit(query, *args, key='chart_data',
+                             on_result=lambda data: self.draw_chart(chart_type, selection, data, version),
+                             on_error=lambda e: self.draw_chart(chart_type, selection, e))
+        if chart_type == 2:
+            # 随后在后台预读热力图的其他指标，切换指标时只需重新绘制
+            for _, other in self.HEATMAP_METRICS:
+                if other != selection[0]:
+                    self.executor.submit(lambda db, other=other: self.matrix_cache.load(db, other),
+                                         key=('matrix_prefetch', other), background=True)
+
+    def update_overlay_controls(self, *args):
+        """按人员来源显示姓名选择或职级选择"""
+        by_name = self.overlay_source_combo.currentIndex() == 0
+        for widget in (self.overlay_name_combo, self.add_overlay_name_button,
+                       self.clear_overlay_names_button, self.overlay_names_label):
+            widget.setVisible(by_name)
+        self.position_combo.setVisible(not by_name)
+
+    def add_overlay_name(self):
+        name = self.overlay_name_combo.currentText()
+        if name and name not in self.overlay_names:
+            self.overlay_names.append(name)
+            self.update_overlay_names()
+
+    def clear_overlay_names(self):
+        if self.overlay_names:
+            self.overlay_names = []
+            self.update_overlay_names()
+
+    def update_overlay_names(self):
+        """显示选定的人员并重新生成图表"""
+        text = "、".join(self.overlay_names) or "未选择"
+        self.overlay_names_label.setText(text)
+        self.overlay_names_label.setToolTip(text)
+        self.scheduler.request_query()
+
+    def ranking_metric(self):
+        """时期业绩对比的排名指标，None 表示按编号顺序显示全部人员"""
+        return self.RANKING_MODES[self.ranking_combo.currentIndex()][1]
+
+    def page_size(self):
+        return int(self.page_size_combo.currentText())
+
+    def reset_ranking_page(self, *args):
+        """时期、排名指标或每页人数变化后回到第一页"""
+        self.ranking_page = 0
+        self.pager_widget.setVisible(self.ranking_metric() is not None)
+
+    def change_ranking_page(self, step):
+        self.ranking_page = max(0, self.ranking_page + step)
+        self.scheduler.request_query()
+
+    def update_pager(self, data):
+        """按读取到的排名数据更新页码；页码超出范围（如数据减少后）时改为最后一页重新读取"""
+        rows, (count, _, _) = data
+        pages = max(1, -(-count // self.page_size()))
+        if not rows and self.ranking_page >= pages:
+            self.ranking_page = pages - 1
+            self.scheduler.request_query()
+        self.page_label.setText(f"第 {self.ranking_page + 1}/{pages} 页（共 {count} 人）")
+        self.prev_page_button.setEnabled(self.ranking_page > 0)
+        self.next_page_button.setEnabled(self.ranking_page + 1 < pages)
+
+    def chart_key(self, chart_type, selection, version):
+        """图表缓存的键；数据版本号变化后旧图表不会再命中，直接清空释放内存"""
+        if version != self.chart_cache_version:
+            self.chart_cache.clear()
+            self.chart_cache_version = version
+        return (chart_type, selection) + self.font_sizes() + (version, self.view_range)
+
+    def font_sizes(self):
+        """当前选择的 (数据字号, X轴标签字号)"""
+        return int(self.data_font_size_combo.currentText()), int(self.xlabel_font_size_combo.currentText())
+
+    def get_chart_stats(self):
+        """返回图表请求、实际查询或绘制、后台绘制和图表缓存的计数"""
+        stats = self.scheduler.get_stats()
+        stats.update(rendered=self.render_worker.rendered_count,
+                     render_dropped=self.render_worker.dropped_count,
+                     cache_hits=self.chart_cache.hits, cache_misses=self.chart_cache.misses)
+        return stats
+
+    def draw_chart(self, chart_type, selection, data, version=None, entry=None):
+        """用读取到的数据显示图表，data 为查询出错时的异常
+
+        version 为查询时的数据版本号，有版本号的图表绘制后存入缓存；
+        entry 为命中的缓存条目，尺寸一致时直接显示其中的图片。
+        """
+        self.chart_view.unsetCursor()
+        self.chart_state = (chart_type, selection, data, version)
+        if isinstance(data, tuple): # 按名次分页的时期对比
+            self.update_pager(data)
+        self.render_chart(entry)
+
+    def render_chart(self, entry=None):
+        """在后台绘制当前图表，绘制期间显示占位提示；图表区域不可见时推迟到显示后绘制"""
+        if self.chart_state is None or not self.chart_view.isVisible():
+            return
+        chart_type, selection, data, version = self.chart_state
+        key = self.chart_key(chart_type, selection, version) if version is not None else None
+        if entry is None and key is not None:
+            entry = self.chart_cache.get(key)
+        size = self.chart_view.render_size()
+        chart = entry.bitmap_for(size) if entry is not None else None
+        if chart is not None:
+            self.render_worker.cancel()
+            self.show_rendered_chart(chart)
             return
 
+        if chart_type == 0: # 个人业绩趋势
+            args, message = self.plot_person_trend(selection, data)
+        elif chart_type == 2: # 团队业绩热力图
+            args, message = self.plot_heatmap(selection, data)
+        elif chart_type == 3: # 多人业绩趋势
+            args, message = self.plot_overlay_trend(selection, data)
+        elif isinstance(selection, tuple): # 按名次分页的时期对比
+            args, message = self.plot_period_ranking(selection, data)
+        else: # 时期业绩对比
+            args, message = self.plot_period_comparison(selection, data)
+        if args is not None:
+            args += (self.view_range,)
+        # 缩放和平移期间显示已有图片的预览，不显示占位提示
+        if self.chart_view.preview_xlim is None:
+            self.chart_view.set_placeholder("正在绘制图表...")
+        pixel_ratio = self.chart_view.devicePixelRatioF()
+        self.render_worker.submit(chart_type, args, message, self.font_sizes(), size,
+                                  matplotlib.rcParams['figure.dpi'] * pixel_ratio, pixel_ratio,
+                                  on_result=lambda chart: self.show_chart_image(key, data, chart))
+
+    def show_chart_image(self, key, data, chart):
+        """显示后台绘制好的图表，有缓存键时存入缓存"""
+        self.show_rendered_chart(chart)
+        if key is not None:
+            self.chart_cache.put(key, data, chart, chart.size())
+
+    def show_rendered_chart(self, chart):
+        if self.view_range is None:
+            self.full_xlim = chart.xlim
+        self.chart_view.set_chart(chart)
+
+    def change_view(self, view):
+        """缩放或平移图表：限制在全部数据的范围内，先显示预览，再按新范围重新绘制
+
+        view 为新的x范围 (起, 止)，None 或不小于全部范围时恢复显示全部。
+        """
+        if not self.has_chart_data() or self.full_xlim is None:
+            return
+        if view is not None:
+            low, high = self.full_xlim
+            span = max(view[1] - view[0], self.MIN_VIEW_SPAN)
+            if span >= high - low:
+                view = None
+            else:
+                start = min(max(view[0], low), high - span)
+                view = (start, start + span)
+        if view == self.view_range:
+            return
+        self.view_range = view
+        self.chart_view.set_preview(view if view is not None else self.full_xlim)
+        self.scheduler.request_render()
+
+    def has_chart_data(self):
+        """当前图表是否显示了数据（而不是提示文字）"""
+        if self.chart_state is not None and isinstance(self.chart_state[2], PerformanceMatrix):
+            return bool(self.chart_state[2].names)
+        return bool(self.chart_rows())
+
+    def chart_rows(self):
+        """当前图表第 i 个时期（或人员）的数据行，前三项为 (标签, 左区业绩, 右区业绩)；没有数据时返回 None"""
+        if self.chart_state is None:
+            return None
+        data = self.chart_state[2]
+        if isinstance(data, tuple): # 按名次分页的时期对比
+            return self.ranking_rows(data)
+        return data if isinstance(data, list) else None
+
+    def ranking_rows(self, data):
+        """排名数据的显示行：本页人员带名次，其余人员合计为最后一行“其他”"""
+        rows, (count, left_total, right_total) = data
+        items = [(f"{rank}. {name}", left, right) for rank, name, left, right in rows]
+        rest = count - len(rows)
+        if rows and rest > 0:
+            items.append((f"其他（{rest}人）", left_total - sum(row[2] for row in rows),
+                          right_total - sum(row[3] for row in rows)))
+        return items
+
+    def hover_text(self, index, y=None):
+        """鼠标悬停处第 index 个时期（或人员）的读数；热力图和多人业绩趋势还按数据y坐标 y 确定人员"""
+        if self.chart_state is not None and isinstance(self.chart_state[2], PerformanceMatrix):
+            if self.chart_state[0] == 3: # 多人业绩趋势
+                return self.overlay_hover_text(self.chart_state[2], index, y)
+            return self.heatmap_hover_text(self.chart_state[2], index, y)
+        rows = self.chart_rows()
+        if rows is None or not 0 <= index < len(rows):
+            return None
+        label, left, right = rows[index][:3]
+        if self.chart_state[0] == 0: # 个人业绩趋势
+            label = self.db.convert_period_format(label)
+        return f"{label}\n左区业绩: {left:.2f}\n右区业绩: {right:.2f}\n总业绩: {left + right:.2f}"
+
+    def heatmap_hover_text(self, matrix, column, y):
+        row = round(y) if y is not None else -1
+        if not (0 <= row < len(matrix.names) and 0 <= column < len(matrix.periods)):
+            return None
+        value = matrix.values[row, column]
+        label = next(label for label, metric in self.HEATMAP_METRICS if metric == matrix.metric)
+        reading = "无记录" if value != value else f"{value:.2f}"  # NaN 表示该时期没有记录
+        return f"{matrix.names[row]}\n{matrix.periods[column]}\n{label}: {reading}"
+
+    def overlay_hover_text(self, matrix, column, y):
+        """多人业绩趋势中该时期数值最接近鼠标位置的人员"""
+        if y is None or not 0 <= column < len(matrix.periods):
+            return None
+        distance = np.abs(matrix.values[:, column] - y)
+        if np.isnan(distance).all():
+            return None
+        row = int(np.nanargmin(distance))
+        label = next(label for label, metric in self.OVERLAY_METRICS if metric == matrix.metric)
+        return f"{matrix.names[row]}\n{matrix.periods[column]}\n{label}: {matrix.values[row, column]:.2f}"
+
+    def plot_person_trend(self, name, data):
+        """个人业绩折线图的绘制参数，返回 (参数, 提示文字)"""
+        if isinstance(data, Exception):
+            print(f"Error generating chart: {data}")
+            return None, "暂无数据或数据加载中..."
+        if not name:
+            return None, "请选择一个姓名"
+        if not data:
+            return None, f"未找到 {name} 的业绩数据"
+
         periods = [self.db.convert_period_format(d[0]) for d in data]  # 转换时期格式
         left_perfs = [d[1] for d in data]
         right_perfs = [d[2] for d in data]
-        total_perfs = [d[1] + d[2] for d in data]
+        return (name, periods, left_perfs, right_perfs), None
 
-        # 获取字体大小设置
-        data_font_size = int(self.data_font_size_combo.currentText())
-        xlabel_font_size = int(self.xlabel_font_size_combo.currentText())
-
-        line1 = ax.plot(periods, left_perfs, marker='o', linestyle='-', label='左区业绩')[0]
-        line2 = ax.plot(periods, right_perfs, marker='o', linestyle='-', label='右区业绩')[0]
-        line3 = ax.plot(periods, total_perfs, marker='s', linestyle='--', label='总业绩')[0]
-        
-        # 为每个数据点添加数值标签
-        for i, (period, left, right, total) in enumerate(zip(periods, left_perfs, right_perfs, total_perfs)):
-            # 左区业绩标签
-            ax.annotate(f'{left:.1f}', (i, left), 
-                       textcoords="offset points", xytext=(0,10), ha='center',
-                       fontsize=data_font_size, color=line1.get_color())
-            # 右区业绩标签
-            ax.annotate(f'{right:.1f}', (i, right), 
-                       textcoords="offset points", xytext=(0,10), ha='center',
-                       fontsize=data_font_size, color=line2.get_color())
-            # 总业绩标签
-            ax.annotate(f'{total:.1f}', (i, total), 
-                       textcoords="offset points", xytext=(0,10), ha='center',
-                       fontsize=data_font_size, color=line3.get_color())
-        
-        ax.set_title(f"{name} 的业绩趋势")
-        ax.set_xlabel("时期")
-        ax.set_ylabel("业绩")
-        
-        # 设置x轴标签字体大小和旋转
-        ax.tick_params(axis='x', rotation=45, labelsize=xlabel_font_size)
-        ax.tick_params(axis='y', labelsize=data_font_size)
-        
-        ax.legend(fontsize=data_font_size)
-        ax.grid(True)
-        self.figure.tight_layout()
-
-    def plot_period_comparison(self):
-        """绘制时期业绩对比柱状图"""
-        ax = self.figure.add_subplot(111)
-        period = self.period_combo.currentText()
+    def plot_period_comparison(self, period, data):
+        """时期业绩对比柱状图的绘制参数，返回 (参数, 提示文字)"""
+        if isinstance(data, Exception):
+            print(f"Error generating chart: {data}")
+            return None, "暂无数据或数据加载中..."
         if not period:
-            ax.set_title("请选择一个时期")
-            return
-
-        # 如果显示的是转换后的格式，需要转换回原格式进行查询
-        original_period = period
-        if "上" in period:
-            original_period = period.replace("上", "First Half")
-        elif "下" in period:
-            original_period = period.replace("下", "Second Half")
+            return None, "请选择一个时期"
 
-        data = self.db.get_data_by_period(original_period)
+        # get_data_by_period 会自动把界面格式的时期转换为数据库格式
         if not data:
-            ax.set_title(f"未找到 {period} 的业绩数据")
-            return
+            return None, f"未找到 {period} 的业绩数据"
 
         names = [d[0] for d in data]
         left_perfs = [d[1] for d in data]
         right_perfs = [d[2] for d in data]
+        return (f"{period} 业绩对比", names, left_perfs, right_perfs, False), None
 
-        # 获取字体大小设置
-        data_font_size = int(self.data_font_size_combo.currentText())
-        xlabel_font_size = int(self.xlabel_font_size_combo.currentText())
+    def plot_heatmap(self, selection, data):
+        """团队业绩热力图的绘制参数，返回 (参数, 提示文字)
 
-        x = range(len(names))
-        width = 0.35
-        
-        rects1 = ax.bar([i - width/2 for i in x], left_perfs, width, label='左区业绩')
-        rects2 = ax.bar([i + width/2 for i in x], right_perfs, width, label='右区业绩')
+        data 为已按所选方式排好行的 PerformanceMatrix，整个矩阵作为一个图像绘制。
+        """
+        metric, sort = selection
+        if isinstance(data, Exception):
+            print(f"Error generating chart: {data}")
+            return None, "暂无数据或数据加载中..."
+        if not data.names:
+            return None, "暂无业绩数据"
 
-        ax.set_title(f"{period} 业绩对比")
-        ax.set_ylabel("业绩")
-        ax.set_xticks(x)
-        ax.set_xticklabels(names, rotation=45, ha="right")
-        
-        # 设置坐标轴字体大小
-        ax.tick_params(axis='x', labelsize=xlabel_font_size)
-        ax.tick_params(axis='y', labelsize=data_font_size)
-        
-        ax.legend(fontsize=data_font_size)
-        
-        # 在柱状图上显示数值
-        ax.bar_label(rects1, padding=3, fmt='%.2f', fontsize=data_font_size)
-        ax.bar_label(rects2, padding=3, fmt='%.2f', fontsize=data_font_size)
-        
-        self.figure.tight_layout()
+        metric_label = next(label for label, value in self.HEATMAP_METRICS if value == metric)
+        sort_label = next(label for label, value in self.HEATMAP_SORTS if value == sort)
+        people, periods = data.shape
+        title = f"团队{metric_label}热力图（{people} 人 × {periods} 期，按{sort_label}排序）"
+        return (title, data.names, data.periods, data.values, metric), None
+
+    def plot_overlay_trend(self, selection, data):
+        """多人业绩趋势图的绘制参数，返回 (参数, 提示文字)
+
+        data 为选定人员的 PerformanceMatrix，各行已对齐到同一条时期轴，缺失的时期为 NaN。
+        """
+        if isinstance(data, Exception):
+            print(f"Error generating chart: {data}")
+            return None, "暂无数据或数据加载中..."
+        if not selection:
+            if self.overlay_source_combo.currentIndex() == 0:
+                return None, "请添加要对比的人员"
+            return None, "请选择一个职级"
+        source, group, metric = selection
+        if not data.names:
+            return None, "未找到所选人员的业绩数据"
+
+        metric_label = next(label for label, value in self.OVERLAY_METRICS if value == metric)
+        who = f"职级 {group}" if source == 1 else "选定人员"
+        title = f"{who} {metric_label}趋势（{len(data.names)} 人）"
+        return (title, data.names, data.periods, data.values, metric_label), None
+
+    def plot_period_ranking(self, selection, data):
+        """按名次分页的时期对比柱状图的绘制参数，返回 (参数, 提示文字)
+
+        绘制的柱子数只与每页人数有关，其余人员合计为一组“其他”柱子。
+        """
+        period, metric, _, _ = selection
+        if isinstance(data, Exception):
+            print(f"Error generating chart: {data}")
+            return None, "暂无数据或数据加载中..."
+        rows, (count, _, _) = data
+        if not rows:
+            return None, f"未找到 {period} 的业绩数据"
+
+        items = self.ranking_rows(data)
+        mode = next(label for label, value in self.RANKING_MODES if value == metric)
+        title = f"{period} {mode} 第 {rows[0][0]}-{rows[-1][0]} 名（共 {count} 人）"
+        names = [item[0] for item in items]
+        left_perfs = [item[1] for item in items]
+        right_perfs = [item[2] for item in items]
+        return (title, names, left_perfs, right_perfs, len(items) > len(rows)), None
 
 
 # ===================================================================
@@ -1,14 +1,33 @@
 # ui/data_entry_tab.py
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
                                QTableWidget, QTableWidgetItem, QPushButton, QComboBox,
-                               QSpinBox, QTextEdit, QMessageBox, QHeaderView, QTabWidget)
-from PyQt5.QtCore import QDate, Qt
+                               QSpinBox, QTextEdit, QMessageBox, QHeaderView, QTabWidget,
+                               QTableView, QAbstractItemView)
+from PyQt5.QtCore import QDate, Qt, QTimer
 from rename_person_dialog import RenamePersonDialog
+try:
+    from period_table_model import PeriodTableModel, NameDelegate, NAME_COL
+    from query_executor import QueryExecutor
+except ImportError:
+    from ui.period_table_model import PeriodTableModel, NameDelegate, NAME_COL
+    from ui.query_executor import QueryExecutor
 
 class DataEntryTab(QWidget):
-    def __init__(self, db_manager):
+    # 移动行后等待多久（毫秒）再把新的排序写入数据库，连续移动只写入一次
+    SORT_ORDER_SAVE_DELAY = 1000
+
+    def __init__(self, db_manager, executor=None):
         super().__init__()
         self.db = db_manager
+        # 数据库读写通过 executor 在后台线程执行；单独运行本模块时在界面线程同步执行
+        self.executor = executor or QueryExecutor(db_manager, self, threaded=False)
+        self.loaded_period = None
+        self.loaded_summary = ""  # 加载时的总结文字，保存时只在总结有修改时写入
+        self.all_names = [""]  # 姓名下拉框的选项（开头为空白选项），在后台读取后更新
+        self.sort_order_timer = QTimer(self)
+        self.sort_order_timer.setSingleShot(True)
+        self.sort_order_timer.setInterval(self.SORT_ORDER_SAVE_DELAY)
+        self.sort_order_timer.timeout.connect(self.save_sort_orders)
         self.init_ui()
 
     def init_ui(self):
@@ -168,13 +187,18 @@ class DataEntryTab(QWidget):
         layout.addLayout(period_layout)
 
         # 2. 数据表格 (按时期)
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)  # 恢复为9列，编号列隐藏
-        self.table.setHorizontalHeaderLabels([
-            "职级", "姓名", "左区业绩", "左区订单", "右区业绩", "右区订单", 
-            "左区增长%", "右区增长%", "总增长%"
-        ])
+        # 使用模型/视图：只为可见行绘制单元格，姓名下拉框仅在编辑时创建
+        self.table_model = PeriodTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        self.name_delegate = NameDelegate(lambda: self.all_names, self.table)
+        self.table.setItemDelegateForColumn(NAME_COL, self.name_delegate)
+        self.table.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked |
+                                   QAbstractItemView.EditKeyPressed | QAbstractItemView.AnyKeyPressed)
+        self.table.setWordWrap(False)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # 固定行高，数千行时滚动无需逐行计算高度
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         layout.addWidget(self.table)
 
         # 3. 人员管理区域
@@ -339,6 +363,7 @@ class DataEntryTab(QWidget):
         # 上移按钮
         self.move_up_button = QPushButton("上移")
         self.move_up_button.clicked.connect(self.move_row_up)
+        self.move_up_button.setAutoRepeat(True)  # 按住连续上移
         self.move_up_button.setMinimumWidth(80)
         self.move_up_button.setStyleSheet("""
             QPushButton {
@@ -361,6 +386,7 @@ class DataEntryTab(QWidget):
         # 下移按钮
         self.move_down_button = QPushButton("下移")
         self.move_down_button.clicked.connect(self.move_row_down)
+        self.move_down_button.setAutoRepeat(True)  # 按住连续下移
         self.move_down_button.setMinimumWidth(80)
         self.move_down_button.setStyleSheet("""
             QPushButton {
@@ -388,23 +414,22 @@ class DataEntryTab(QWidget):
         # 初始化时自动加载当前时期数据
         # 设置为数据库中最新的时期，然后初始加载数据
         self.set_to_latest_period()
-        self.load_period_data()
 
     def set_to_latest_period(self):
-        """设置时期选择器为数据库中PERFORMANCE_DATA的最新时期"""
+        """查询数据库中PERFORMANCE_DATA的最新时期，设置时期选择器后加载该时期的数据"""
+        # 通过整数时期键索引直接取最新时期，只取PERFORMANCE_DATA
+        self.executor.submit('get_latest_performance_period', key='latest_period',
+                             on_result=self.apply_latest_period,
+                             on_error=self.on_latest_period_error)
+
+    def on_latest_period_error(self, e):
+        print(f"设置最新时期时出错: {e}")
+        self.load_period_data()
+
+    def apply_latest_period(self, latest_period):
+        """把时期选择器设置为查询到的最新时期并加载数据"""
         try:
-            # 直接从performance表获取所有时期，按时期降序排列，只取PERFORMANCE_DATA
-            self.db.cursor.execute("""
-                SELECT DISTINCT period FROM performance 
-                WHERE period IS NOT NULL 
-                ORDER BY period DESC
-            """)
-            performance_periods = [row[0] for row in self.db.cursor.fetchall()]
-            
-            if performance_periods:
-                # 取最新的时期（第一个）
-                latest_period = performance_periods[0]
-                
+            if latest_period:
                 # 转换时期格式（从旧格式转换为新格式）
                 latest_period = self.db.convert_period_format(latest_period)
                 
@@ -439,6 +464,7 @@ class DataEntryTab(QWidget):
                             pass  # 如果解析失败，保持默认值
         except Exception as e:
             print(f"设置最新时期时出错: {e}")
+        self.load_period_data()
 
     def init_person_tab(self):
         """初始化按人员管理标签页"""
@@ -576,69 +602,50 @@ class DataEntryTab(QWidget):
         half_text = "上" if half_index == 0 else "下"
         return f"{year}-{month:02d}-{half_text}"
 
+    def set_period_busy(self, busy):
+        """后台加载或保存时期数据期间禁用表格和编辑按钮，时期选择器仍可切换"""
+        for widget in (self.table, self.summary_text, self.add_row_button, self.del_row_button,
+                       self.save_button, self.move_up_button, self.move_down_button):
+            widget.setEnabled(not busy)
+
     def load_period_data(self):
-        """加载选定时期的数据到表格和总结框"""
+        """在后台读取选定时期的数据，完成后填入表格和总结框
+
+        连续切换时期时只显示最后选择的时期，之前尚未返回的查询结果被丢弃。
+        """
+        # 切换时期前先写入尚未保存的排序（在同一后台线程中先于读取执行）
+        self.save_sort_orders()
         period = self.get_current_period()
-        data = self.db.get_data_by_period(period)
-        summary = self.db.get_summary(period)
-        
-        # 清空表格
-        self.table.setRowCount(0)
-        
-        # 加载数据到表格
-        for index, row_data in enumerate(data):
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
-            # row_data: (name, left_perf, right_perf, left_orders, right_orders, left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order)
-            # 重新排列为: (position, name, left_perf, left_orders, right_perf, right_orders, left_growth_pct, right_growth_pct, total_growth_pct)
-            
-            # 处理可能缺失的position和sort_order字段
-            if len(row_data) >= 10:
-                position = row_data[8] if row_data[8] else ''
-                sort_order = row_data[9] if row_data[9] else row_position
-            else:
-                position = ''
-                sort_order = row_position
-            
-            # 格式化业绩数据（浮点数保留2位小数）
-            left_perf_display = f"{float(row_data[1]):.2f}" if row_data[1] is not None else "0.00"
-            right_perf_display = f"{float(row_data[2]):.2f}" if row_data[2] is not None else "0.00"
-            
-            # 格式化增长率数据（浮点数保留2位小数）
-            left_growth_display = f"{float(row_data[5]):.2f}" if row_data[5] is not None else "0.00"
-            right_growth_display = f"{float(row_data[6]):.2f}" if row_data[6] is not None else "0.00"
-            total_growth_display = f"{float(row_data[7]):.2f}" if row_data[7] is not None else "0.00"
-            
-            # 不显示编号，直接从职级开始
-            reordered_data = (position, row_data[0], left_perf_display, row_data[3], right_perf_display, row_data[4], left_growth_display, right_growth_display, total_growth_display)
-            
-            for col, item in enumerate(reordered_data):
-                cell_item = QTableWidgetItem(str(item))
-                # 设置增长百分比列为只读（后3列）
-                if col >= 6:
-                    cell_item.setFlags(cell_item.flags() & ~Qt.ItemIsEditable)
-                    # 增长率已经格式化过，直接添加%符号
-                    cell_item.setText(f"{str(item)}%")
-                # 姓名列使用下拉框
-                elif col == 1:  # 姓名列
-                    cell_item = QTableWidgetItem(str(item))
-                    self.table.setItem(row_position, col, cell_item)
-                    # 为姓名列设置下拉框
-                    name_combo = QComboBox()
-                    name_combo.setEditable(False)
-                    all_names = self.db.get_all_names()
-                    name_combo.addItems(all_names)
-                    if str(item) in all_names:
-                        name_combo.setCurrentText(str(item))
-                    self.table.setCellWidget(row_position, col, name_combo)
-                    continue  # 跳过下面的setItem
-                # 设置数值列为可编辑
-                elif col > 1:  # 除了职级、姓名列，其他列都是数值
-                    if col in [2, 4]:  # 左区业绩、右区业绩列
-                        cell_item.setData(0, float(item))
-                    else:  # 左区订单、右区订单列
-                        cell_item.setData(0, int(item))
-                self.table.setItem(row_position, col, cell_item)
+        self.set_period_busy(True)
+        self.executor.submit('get_period_snapshot', period, key='period_data',
+                             on_result=lambda snapshot: self.show_period_data(period, snapshot),
+                             on_error=self.on_period_load_error)
+        # 保存、改名和导入后都会重新加载时期数据，同时刷新姓名列表
+        self.refresh_all_names()
+
+    def refresh_all_names(self):
+        """在后台读取姓名列表，完成后更新姓名下拉框的选项"""
+        self.executor.submit('get_all_names', key='all_names', background=True,
+                             on_result=self.set_all_names,
+                             on_error=lambda e: print(f"读取姓名列表时出错: {e}"))
+
+    def set_all_names(self, names):
+        self.all_names = names
+
+    def on_period_load_error(self, e):
+        self.set_period_busy(False)
+        QMessageBox.critical(self, "加载失败", f"加载时期数据时出错：{e}")
+
+    def show_period_data(self, period, snapshot):
+        """把 get_period_snapshot 的结果显示到表格和总结框"""
+        data, summary = snapshot
+        self.set_period_busy(False)
+        # 在后台预读前后相邻的时期，来回切换时直接从缓存读取（同步执行时不预读）
+        if self.executor.threaded:
+            self.executor.submit('prefetch_adjacent_periods', period, key='period_prefetch', background=True)
+
+        # data: (name, left_perf, right_perf, left_orders, right_orders, left_growth_pct, right_growth_pct, total_growth_pct, position, sort_order)
+        self.table_model.load_rows(data)
         
         # 如果没有数据，至少添加一个空行供编辑
         if len(data) == 0:
@@ -646,33 +653,16 @@ class DataEntryTab(QWidget):
         
         # 加载总结
         self.summary_text.setText(summary)
+        self.loaded_summary = summary  # 保存时只在总结有修改时写入
+        self.loaded_period = period
         
         # 静默加载，不显示消息框
 
 
     def add_row(self):
         """在表格末尾添加一个空行"""
-        row_position = self.table.rowCount()
-        self.table.insertRow(row_position)
-        
-        # 为所有列设置空的可编辑项
-        for col in range(self.table.columnCount()):
-            if col >= 6:  # 增长率列设为只读（从第6列开始）
-                item = QTableWidgetItem("0.00%")
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                self.table.setItem(row_position, col, item)
-            elif col == 1:  # 姓名列使用下拉框
-                name_combo = QComboBox()
-                name_combo.setEditable(False)
-                all_names = self.db.get_all_names()
-                if all_names:
-                    name_combo.addItems(all_names)
-                    # 默认选中空白选项（第一个）
-                    name_combo.setCurrentIndex(0)
-                self.table.setCellWidget(row_position, col, name_combo)
-            else:
-                item = QTableWidgetItem("")
-                self.table.setItem(row_position, col, item)
+        row = self.table_model.insert_empty_row()
+        self.table.scrollTo(self.table_model.index(row, NAME_COL))
 
     def add_new_person(self):
         """添加新人员到数据库"""
@@ -681,15 +671,18 @@ class DataEntryTab(QWidget):
             QMessageBox.warning(self, "输入错误", "请输入新人员姓名")
             return
         
-        # 检查是否已存在
-        all_names = self.db.get_all_names()
-        if new_name in all_names:
+        # 检查是否已存在（后台读取的姓名列表）
+        if new_name in self.all_names:
             QMessageBox.information(self, "提示", f"人员 '{new_name}' 已存在")
             self.new_person_input.clear()
             return
         
         # 添加到数据库
-        if self.db.add_name_to_all_names(new_name):
+        self.executor.submit('add_name_to_all_names', new_name,
+                             on_result=lambda added: self.on_person_added(new_name, added))
+
+    def on_person_added(self, new_name, added):
+        if added:
             QMessageBox.information(self, "添加成功", f"人员 '{new_name}' 已添加成功")
             self.new_person_input.clear()
             # 更新所有姓名下拉框
@@ -707,7 +700,7 @@ class DataEntryTab(QWidget):
                 from ui.rename_person_dialog import RenamePersonDialog
             
             # 创建对话框实例
-            dialog = RenamePersonDialog(self, self.db)
+            dialog = RenamePersonDialog(self, self.db, self.executor)
             
             # 显示对话框并等待用户操作
             if dialog.exec_() == dialog.Accepted:
@@ -723,232 +716,186 @@ class DataEntryTab(QWidget):
             QMessageBox.critical(self, "错误", f"打开修改人名对话框失败：{e}")
 
     def refresh_name_combos(self):
-        """刷新表格中所有姓名下拉框"""
-        all_names = self.db.get_all_names()
-        
-        for row in range(self.table.rowCount()):
-            combo = self.table.cellWidget(row, 1)  # 姓名列
-            if isinstance(combo, QComboBox):
-                current_text = combo.currentText()
-                combo.clear()
-                combo.addItems(all_names)
-                if current_text in all_names:
-                    combo.setCurrentText(current_text)
-                else:
-                    combo.setCurrentIndex(0)  # 默认选中空白选项
+        """刷新姓名列表和姓名列显示（下拉框在编辑时从 all_names 创建，无需逐行更新）"""
+        self.refresh_all_names()
+        self.table.viewport().update()
 
     def delete_row(self):
-        """删除当前选中的行"""
-        current_row = self.table.currentRow()
+        """删除当前选中的行，数据库中的记录在保存时删除"""
+        current_row = self.table.currentIndex().row()
         if current_row >= 0:
-            # 获取要删除的人员姓名（从下拉框获取）
-            name_combo = self.table.cellWidget(current_row, 1)  # 姓名列
-            if isinstance(name_combo, QComboBox):
-                name = name_combo.currentText().strip()
-                if name:
-                    period = self.get_current_period()
-                    
-                    # 确认删除
-                    reply = QMessageBox.question(self, "确认删除", 
-                                               f"确认要删除 {name} 在 {period} 的数据吗？",
-                                               QMessageBox.Yes | QMessageBox.No)
-                    
-                    if reply == QMessageBox.Yes:
-                        # 从数据库删除记录
-                        try:
-                            deleted_count = self.db.delete_single_record(name, period)
-                            if deleted_count > 0:
-                                QMessageBox.information(self, "删除成功", f"已从数据库删除 {name}。")
-                            else:
-                                QMessageBox.information(self, "提示", f"在 {period} 中未找到 {name} 的记录。")
-                        except Exception as e:
-                            QMessageBox.critical(self, "删除失败", f"删除数据库记录失败：{e}")
-                            return
+            # 获取要删除的人员姓名
+            name = self.table_model.name_at(current_row)
+            if name:
+                period = self.get_current_period()
+                
+                # 确认删除
+                reply = QMessageBox.question(self, "确认删除", 
+                                           f"确认要删除 {name} 在 {period} 的数据吗？\n点击“保存当前时期数据”后生效。",
+                                           QMessageBox.Yes | QMessageBox.No)
+                if reply != QMessageBox.Yes:
+                    return
             
             # 从表格中删除行
-            self.table.removeRow(current_row)
+            self.table_model.remove_row(current_row)
 
     def save_data(self):
         """从表格和总结框收集数据并保存到数据库"""
         period = self.get_current_period()
-        data_to_save = []
         
-        # 修改保存数据的逻辑，确保排序正确保存
+        # 只保存新增、修改、删除和移动过的行
         try:
-            data = []
-            for row in range(self.table.rowCount()):
-                # 获取姓名（从下拉框获取）
-                name_combo = self.table.cellWidget(row, 1)  # 姓名列
-                if isinstance(name_combo, QComboBox):
-                    name = name_combo.currentText().strip()
-                else:
-                    name = ""
+            row_by_name = {}
+            for row in range(self.table_model.rowCount()):
+                name = self.table_model.name_at(row)
                 
                 if not name:
-                    if any(self.table.item(row, col) and self.table.item(row, col).text().strip() 
-                          for col in range(2, 6)):  # 检查左区业绩到右区订单列
+                    if self.table_model.row_has_values(row):  # 检查左区业绩到右区订单列
                         QMessageBox.warning(self, "数据错误", f"第 {row+1} 行姓名不能为空。")
                         return
                     # 如果姓名为空且没有其他数据，跳过这一行不保存到数据库
                     continue  # 跳过完全空的行
 
-                # 读取并转换数据，提供默认值0
-                def get_item_value(r, c, cast_func):
-                    item = self.table.item(r, c)
-                    if not item or not item.text().strip():
-                        return 0
-                    try:
-                        return cast_func(item.text().strip())
-                    except ValueError:
-                        raise ValueError(f"第 {r+1} 行第 {c+1} 列的数据格式无效：'{item.text()}'")
-
-                # 获取职级
-                position_item = self.table.item(row, 0)  # 职级在第0列
-                position = position_item.text().strip() if position_item else ''
-                
-                # 使用当前行号作为排序顺序（从0开始，保存时数据库会用这个值）
-                sort_order = row
-
-                record = {
-                    'name': name,
-                    'position': position,
-                    'sort_order': sort_order,
-                    'left_perf': get_item_value(row, 2, float),      # 左区业绩
-                    'left_orders': get_item_value(row, 3, int),      # 左区订单
-                    'right_perf': get_item_value(row, 4, float),     # 右区业绩
-                    'right_orders': get_item_value(row, 5, int)      # 右区订单
-                }
-                data.append(record)
+                if name in row_by_name:
+                    QMessageBox.warning(self, "数据错误",
+                                        f"第 {row_by_name[name]+1} 行和第 {row+1} 行的姓名都是 {name}，同一时期每人只能有一条记录。")
+                    return
+                row_by_name[name] = row
 
-            # 保存时期数据
-            period = self.get_current_period()
-            self.db.save_period_data(period, data)
-            
-            # 保存总结
-            summary = self.summary_text.toPlainText()
-            self.db.save_summary(period, summary)
-            
-            QMessageBox.information(self, "保存成功", f"已成功保存 {len(data)} 条记录到时期：{period}")
-            
-            # 重新加载数据以确保显示正确的排序
-            self.load_period_data()
-            
-            # 更新姓名下拉框
-            self.refresh_name_combos()
-            
+            # 使用当前行号作为排序顺序；数值格式无效时抛出 ValueError
+            upserts, deletes, sort_orders = self.table_model.changeset()
         except ValueError as e:
             QMessageBox.warning(self, "数据格式错误", str(e))
-        except Exception as e:
-            QMessageBox.critical(self, "保存失败", f"保存数据时发生未知错误：{e}")
+            return
+
+        # 总结仅在有修改时随记录在同一事务中保存
+        summary = self.summary_text.toPlainText()
+        if summary == self.loaded_summary:
+            summary = None
+        if not (upserts or deletes or sort_orders) and summary is None:
+            QMessageBox.information(self, "提示", "没有需要保存的修改。")
+            return
+
+        self.sort_order_timer.stop()
+        self.set_period_busy(True)
+        self.executor.submit(
+            'apply_period_changes', period, upserts, deletes, sort_orders, summary,
+            on_result=lambda changed: self.on_period_saved(period, upserts, deletes, sort_orders),
+            on_error=self.on_period_save_error)
+
+    def on_period_saved(self, period, upserts, deletes, sort_orders):
+        self.table_model.mark_sort_orders_saved(sort_orders)
+        QMessageBox.information(self, "保存成功",
+                                f"已保存时期 {period} 的修改：新增或修改 {len(upserts)} 条，"
+                                f"删除 {len(deletes)} 条，调整顺序 {len(sort_orders)} 条。")
+
+        # 重新加载数据以显示重新计算后的增长率
+        self.load_period_data()
+
+        # 更新姓名下拉框
+        self.refresh_name_combos()
+
+    def on_period_save_error(self, e):
+        self.set_period_busy(False)
+        QMessageBox.critical(self, "保存失败", f"保存数据时发生未知错误：{e}")
 
     def move_row_up(self):
-        """上移选中行"""
-        current_row = self.table.currentRow()
+        """上移选中行，只在表格中移动，排序稍后批量写入"""
+        current_row = self.table.currentIndex().row()
         if current_row > 0:
-            self.swap_table_rows(current_row, current_row - 1)
-            self.table.setCurrentCell(current_row - 1, 1)  # 选中姓名列
+            self.table_model.move_row(current_row, current_row - 1)
+            self.table.setCurrentIndex(self.table_model.index(current_row - 1, NAME_COL))  # 选中姓名列
+            self.sort_order_timer.start()
 
     def move_row_down(self):
-        """下移选中行"""
-        current_row = self.table.currentRow()
-        if current_row < self.table.rowCount() - 1:
-            self.swap_table_rows(current_row, current_row + 1)
-            self.table.setCurrentCell(current_row + 1, 1)  # 选中姓名列
-
-    def swap_table_rows(self, row1, row2):
-        """交换表格中两行的数据"""
-        for col in range(self.table.columnCount()):
-            if col == 1:  # 姓名列（下拉框）
-                # 获取两个下拉框
-                combo1 = self.table.cellWidget(row1, col)
-                combo2 = self.table.cellWidget(row2, col)
-                
-                if isinstance(combo1, QComboBox) and isinstance(combo2, QComboBox):
-                    # 交换下拉框中的选中值
-                    text1 = combo1.currentText()
-                    text2 = combo2.currentText()
-                    combo1.setCurrentText(text2)
-                    combo2.setCurrentText(text1)
-            else:
-                # 其他列正常交换
-                item1 = self.table.takeItem(row1, col)
-                item2 = self.table.takeItem(row2, col)
-                self.table.setItem(row1, col, item2)
-                self.table.setItem(row2, col, item1)
-
-    def update_sort_order_and_refresh(self):
-        """更新排序后立即保存并刷新页面，确保姓名下拉框正确显示"""
-        period = self.get_current_period()
-        
+        """下移选中行，只在表格中移动，排序稍后批量写入"""
+        current_row = self.table.currentIndex().row()
+        if 0 <= current_row < self.table_model.rowCount() - 1:
+            self.table_model.move_row(current_row, current_row + 1)
+            self.table.setCurrentIndex(self.table_model.index(current_row + 1, NAME_COL))  # 选中姓名列
+            self.sort_order_timer.start()
+
+    def save_sort_orders(self):
+        """在后台把只调整了位置的已保存行的新排序批量写入数据库，返回 Future，没有需要写入的排序时返回 None
+
+        内容有修改或新增的行仍等待点击保存，随修改一起写入。
+        每个时期使用自己的 key：同一时期较新的请求包含全部未保存的排序，可以取代尚未执行的旧请求。
+        """
+        self.sort_order_timer.stop()
+        if self.loaded_period is None:
+            return None
+        sort_orders = self.table_model.sort_order_changes()
+        if not sort_orders:
+            return None
+        period = self.loaded_period
+        return self.executor.submit('update_sort_orders', period, sort_orders, key=('sort_orders', period),
+                                    on_result=lambda changed: self.on_sort_orders_saved(period, sort_orders),
+                                    on_error=lambda e: print(f"更新排序时出错: {e}"))
+
+    def on_sort_orders_saved(self, period, sort_orders):
+        # 写入完成前已切换到其他时期时，表格中已不是这些行
+        if period == self.loaded_period:
+            self.table_model.mark_sort_orders_saved(sort_orders)
+
+    def flush_sort_orders(self):
+        """退出前写入尚未保存的排序，并等待后台线程写入完成（须在 executor.shutdown() 之前调用）"""
+        future = self.save_sort_orders()
+        if future is None:
+            return
         try:
-            data = []
-            for row in range(self.table.rowCount()):
-                # 获取姓名（从下拉框获取）
-                name_combo = self.table.cellWidget(row, 1)
-                if isinstance(name_combo, QComboBox):
-                    name = name_combo.currentText().strip()
-                else:
-                    name_item = self.table.item(row, 1)
-                    name = name_item.text().strip() if name_item else ""
-                
-                if not name:
-                    continue
-                
-                def get_item_value(r, c, cast_func):
-                    item = self.table.item(r, c)
-                    if not item or not item.text().strip():
-                        return 0
-                    try:
-                        return cast_func(item.text().strip())
-                    except ValueError:
-                        return 0
-                
-                position_item = self.table.item(row, 0)
-                position = position_item.text().strip() if position_item else ''
-                
-                record = {
-                    'name': name,
-                    'position': position,
-                    'sort_order': row,  # 使用当前行位置作为排序
-                    'left_perf': get_item_value(row, 2, float),
-                    'left_orders': get_item_value(row, 3, int),
-                    'right_perf': get_item_value(row, 4, float),
-                    'right_orders': get_item_value(row, 5, int)
-                }
-                data.append(record)
-            
-            # 保存数据到数据库
-            self.db.save_period_data(period, data)
-            
-            # 重新加载页面数据，确保姓名下拉框正确显示
-            self.load_period_data()
-            
+            future.result()
         except Exception as e:
-            print(f"更新排序时出错: {e}")
+            print(f"退出前更新排序时出错: {e}")
 
     def on_internal_tab_changed(self, index):
         """处理内部标签页切换事件"""
         if index == 1:  # 切换到按人员管理标签页
             self.refresh_person_list()
 
-    def refresh_person_list(self):
-        """刷新人员下拉列表"""
+    def refresh_person_list(self, keep_current=False):
+        """在后台读取人员列表后刷新人员下拉列表，keep_current 为 True 时保留当前选择的人员"""
+        current_text = self.person_combo.currentText() if keep_current else None
+        self.executor.submit('get_distinct_names', key='person_list',
+                             on_result=lambda names: self.fill_person_list(names, current_text))
+
+    def fill_person_list(self, names, current_text=None):
         self.person_combo.clear()
-        names = self.db.get_distinct_names()
         self.person_combo.addItems(names)
+        if current_text in names:
+            self.person_combo.setCurrentText(current_text)
+
+    def set_person_busy(self, busy):
+        """后台读取或保存人员数据期间禁用人员表格和编辑按钮"""
+        for widget in (self.person_table, self.add_person_period_button,
+                       self.del_person_period_button, self.save_person_button):
+            widget.setEnabled(not busy)
 
     def load_person_data(self):
-        """加载选定人员的所有时期数据"""
+        """在后台读取选定人员的所有时期数据，完成后填入表格"""
         name = self.person_combo.currentText().strip()
         
         # 清空表格
         self.person_table.setRowCount(0)
         
         if not name:
-            return  # 如果没有选择人员，直接返回，不显示警告
-            
-        data = self.db.get_all_data_by_name(name)
-        
+            # 如果没有选择人员，丢弃尚未返回的查询，不显示警告
+            self.executor.cancel_key('person_data')
+            self.set_person_busy(False)
+            return
+
+        self.set_person_busy(True)
+        self.executor.submit('get_all_data_by_name', name, key='person_data',
+                             on_result=self.show_person_data, on_error=self.on_person_load_error)
+
+    def on_person_load_error(self, e):
+        self.set_person_busy(False)
+        QMessageBox.critical(self, "加载失败", f"加载人员数据时出错：{e}")
+
+    def show_person_data(self, data):
+        """把 get_all_data_by_name 的结果显示到人员表格"""
+        self.set_person_busy(False)
+        self.person_table.setRowCount(0)
+
         # 加载数据到表格
         for row_data in data:
             row_position = self.person_table.rowCount()
@@ -1016,20 +963,28 @@ class DataEntryTab(QWidget):
             
             if reply == QMessageBox.Yes:
                 # 从数据库删除记录
-                try:
-                    deleted_count = self.db.delete_single_record(name, period)
-                    if deleted_count > 0:
-                        QMessageBox.information(self, "删除成功", f"已删除 {name} 在 {period} 的记录")
-                        # 重新加载数据
-                        self.load_person_data()
-                    else:
-                        QMessageBox.information(self, "提示", f"未找到对应的记录")
-                except Exception as e:
-                    QMessageBox.critical(self, "删除失败", f"删除记录失败：{e}")
+                self.set_person_busy(True)
+                self.executor.submit(
+                    'delete_single_record', name, period,
+                    on_result=lambda deleted_count: self.on_person_period_deleted(name, period, deleted_count),
+                    on_error=self.on_person_delete_error)
         else:
             # 如果是空行，直接删除
             self.person_table.removeRow(current_row)
 
+    def on_person_period_deleted(self, name, period, deleted_count):
+        self.set_person_busy(False)
+        if deleted_count > 0:
+            QMessageBox.information(self, "删除成功", f"已删除 {name} 在 {period} 的记录")
+            # 重新加载数据
+            self.load_person_data()
+        else:
+            QMessageBox.information(self, "提示", f"未找到对应的记录")
+
+    def on_person_delete_error(self, e):
+        self.set_person_busy(False)
+        QMessageBox.critical(self, "删除失败", f"删除记录失败：{e}")
+
     def save_person_data(self):
         """保存人员数据"""
         name = self.person_combo.currentText().strip()
@@ -1038,7 +993,8 @@ class DataEntryTab(QWidget):
             return
             
         try:
-            saved_count = 0
+            records = []
+            period_rows = {}
             for row in range(self.person_table.rowCount()):
                 # 检查时期是否为空
                 # 获取时期
@@ -1051,6 +1007,10 @@ class DataEntryTab(QWidget):
                     continue  # 跳过完全空的行
 
                 period = period_item.text().strip()
+                if period in period_rows:
+                    QMessageBox.warning(self, "数据错误", f"第 {period_rows[period]+1} 行和第 {row+1} 行的时期都是 {period}")
+                    return
+                period_rows[period] = row
 
                 # 读取并转换数据
                 def get_item_value(r, c, cast_func):
@@ -1066,25 +1026,37 @@ class DataEntryTab(QWidget):
                 position_item = self.person_table.item(row, 1)
                 position = position_item.text().strip() if position_item else ''
 
-                left_perf = get_item_value(row, 2, float)      # 左区业绩
-                left_orders = get_item_value(row, 3, int)      # 左区订单
-                right_perf = get_item_value(row, 4, float)     # 右区业绩
-                right_orders = get_item_value(row, 5, int)     # 右区订单                # 保存单条记录
-                # 保存到数据库
-                self.db.save_single_record(name, period, left_perf, right_perf, left_orders, right_orders, position, row)
-                saved_count += 1
-            
-            if saved_count > 0:
-                QMessageBox.information(self, "保存成功", f"已保存 {saved_count} 条记录")
-                # 重新加载数据以显示计算后的增长百分比
-                self.load_person_data()
-            else:
-                QMessageBox.information(self, "信息", "没有有效数据需要保存")
+                records.append({
+                    'period': period,
+                    'position': position,
+                    'left_perf': get_item_value(row, 2, float),      # 左区业绩
+                    'left_orders': get_item_value(row, 3, int),      # 左区订单
+                    'right_perf': get_item_value(row, 4, float),     # 右区业绩
+                    'right_orders': get_item_value(row, 5, int)      # 右区订单
+                })
 
         except ValueError as e:
             QMessageBox.critical(self, "输入错误", f"数据格式错误：{e}")
-        except Exception as e:
-            QMessageBox.critical(self, "保存失败", f"保存数据时发生未知错误：{e}")
+            return
+
+        # 在一个事务中保存全部记录，只重算一次该人员的增长率
+        self.set_person_busy(True)
+        self.executor.submit('save_person_records', name, records,
+                             on_result=self.on_person_data_saved, on_error=self.on_person_save_error)
+
+    def on_person_data_saved(self, saved_count):
+        self.set_person_busy(False)
+        if saved_count > 0:
+            QMessageBox.information(self, "保存成功", f"已保存 {saved_count} 条记录")
+            # 重新加载数据以显示计算后的增长百分比；保存时可能登记了新姓名
+            self.load_person_data()
+            self.refresh_all_names()
+        else:
+            QMessageBox.information(self, "信息", "没有有效数据需要保存")
+
+    def on_person_save_error(self, e):
+        self.set_person_busy(False)
+        QMessageBox.critical(self, "保存失败", f"保存数据时发生未知错误：{e}")
 
 
     def update_person_names_cache(self):
@@ -1093,12 +1065,7 @@ class DataEntryTab(QWidget):
         self.refresh_name_combos()
         # 同时更新人员标签页的下拉框
         if hasattr(self, 'person_combo'):
-            names = self.db.get_distinct_names()
-            current_text = self.person_combo.currentText()
-            self.person_combo.clear()
-            self.person_combo.addItems(names)
-            if current_text in names:
-                self.person_combo.setCurrentText(current_text)
+            self.refresh_person_list(keep_current=True)
 
 # ===================================================================
 #  独立测试脚本 (可视化)
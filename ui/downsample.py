@@ -0,0 +1,71 @@
+# ui/downsample.py
+import numpy as np
+
+
+def lttb_indices(y, threshold, x=None):
+    """Largest-Triangle-Three-Buckets 降采样，返回保留的点的下标（升序）
+
+    首尾两点总是保留；中间的点平均分成 threshold-2 个桶，每个桶保留与
+    上一个保留点、下一个桶的平均点构成三角形面积最大的点，因此峰值和谷值
+    能保留下来，折线形状与原数据一致。点数不超过 threshold 时返回全部下标。
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # 第 i 个桶为 [edges[i], edges[i+1])，最后一个桶之后是末尾的点
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    edges = np.append(edges, n)
+    indices = np.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_x = x[end:edges[i + 2]].mean()
+        next_y = y[end:edges[i + 2]].mean()
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def extrema_indices(y):
+    """序列最大值和最小值的下标（可能相同）"""
+    y = np.asarray(y, dtype=float)
+    if not len(y):
+        return []
+    return sorted({int(y.argmax()), int(y.argmin())})
+
+
+# ===================================================================
+#  独立测试脚本
+#  运行方式: python ui/downsample.py
+# ===================================================================
+if __name__ == '__main__':
+    import time
+
+    print("--- Running Downsample Self-Test ---")
+
+    print("\n[Test Case 1] 点数不超过阈值时保留全部点")
+    assert list(lttb_indices([1, 5, 2], 10)) == [0, 1, 2]
+
+    print("\n[Test Case 2] 保留首尾点和尖峰")
+    y = np.sin(np.linspace(0, 6 * np.pi, 240)) * 100
+    y[137] = 500  # 尖峰
+    indices = lttb_indices(y, 60)
+    assert len(indices) == 60 and indices[0] == 0 and indices[-1] == 239
+    assert np.all(np.diff(indices) > 0) and 137 in indices
+    print(f"240 点 -> {len(indices)} 点，包含尖峰: {137 in indices}")
+
+    print("\n[Test Case 3] 极值")
+    assert extrema_indices([3, 9, 1, 4]) == [1, 2] and extrema_indices([]) == []
+
+    print("\n[Test Case 4] 性能")
+    y = np.random.default_rng(0).normal(size=100000).cumsum()
+    start = time.perf_counter()
+    indices = lttb_indices(y, 1000)
+    print(f"100000 点 -> 1000 点: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print("\n--- Test Completed Successfully ---")
@@ -1,9 +1,10 @@
 # ui/main_window.py
 import sys
 import os
+import time
 from PyQt5.QtWidgets import (QMainWindow, QTabWidget, QMenuBar, QMessageBox, 
-                               QFileDialog, QInputDialog, QAction)
-from PyQt5.QtCore import Qt
+                               QFileDialog, QInputDialog, QAction, QLabel, QProgressBar)
+from PyQt5.QtCore import Qt, QTimer
 
 # 添加当前目录到路径以支持直接运行
 sys.path.append(os.path.dirname(__file__))
@@ -12,29 +13,43 @@ sys.path.append(os.path.dirname(__file__))
 try:
     from data_entry_tab import DataEntryTab
     from charts_tab import ChartsTab
+    from query_executor import QueryExecutor
 except ImportError:
     from ui.data_entry_tab import DataEntryTab
     from ui.charts_tab import ChartsTab
+    from ui.query_executor import QueryExecutor
+
+
+def import_with_report(db, file_path):
+    """在后台连接上导入CSV，成功时返回导入报告，失败时返回 None"""
+    return db.last_import_report if db.import_from_csv(file_path) else None
+
 
 class MainWindow(QMainWindow):
+    # 数据库请求持续超过该时间（毫秒）才在状态栏显示忙碌提示，避免短查询闪烁
+    BUSY_INDICATOR_DELAY = 200
+
     def __init__(self, db_manager):
         super().__init__()
         self.db = db_manager
+        # 所有标签页共用一个后台查询线程，界面线程不会因数据库读写而卡住
+        self.executor = QueryExecutor(self.db, self)
         
         self.setWindowTitle("业绩追踪系统")
         self.setGeometry(100, 100, 1200, 800) # x, y, width, height
         self.setMinimumSize(1000, 700)  # 设置最小窗口大小
 
-        # 创建菜单栏
+        # 创建菜单栏和状态栏的忙碌提示
         self.create_menu_bar()
+        self.create_busy_indicator()
 
         # 创建标签页控件
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
 
         # 创建各个标签页实例
-        self.data_entry_tab = DataEntryTab(self.db)
-        self.charts_tab = ChartsTab(self.db)
+        self.data_entry_tab = DataEntryTab(self.db, self.executor)
+        self.charts_tab = ChartsTab(self.db, self.executor)
 
         # 将标签页添加到主控件
         self.tabs.addTab(self.data_entry_tab, "数据录入/编辑")
@@ -56,9 +71,9 @@ class MainWindow(QMainWindow):
         file_menu.addAction(export_action)
         
         # 导入CSV
-        import_action = QAction('从CSV导入数据...', self)
-        import_action.triggered.connect(self.import_csv)
-        file_menu.addAction(import_action)
+        self.import_action = QAction('从CSV导入数据...', self)
+        self.import_action.triggered.connect(self.import_csv)
+        file_menu.addAction(self.import_action)
         
         file_menu.addSeparator()
         
@@ -71,9 +86,9 @@ class MainWindow(QMainWindow):
         tools_menu = menubar.addMenu('工具')
         
         # 重新计算增长率
-        recalc_action = QAction('重新计算所有增长率', self)
-        recalc_action.triggered.connect(self.recalculate_growth_rates)
-        tools_menu.addAction(recalc_action)
+        self.recalc_action = QAction('重新计算所有增长率', self)
+        self.recalc_action.triggered.connect(self.recalculate_growth_rates)
+        tools_menu.addAction(self.recalc_action)
         
         # 帮助菜单
         help_menu = menubar.addMenu('帮助')
@@ -82,6 +97,40 @@ class MainWindow(QMainWindow):
         about_action.triggered.connect(self.show_about)
         help_menu.addAction(about_action)
 
+    def create_busy_indicator(self):
+        """在状态栏添加数据库忙碌提示，后台有请求持续一段时间后显示"""
+        self.busy_label = QLabel("正在读写数据库...")
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)  # 不确定进度的滚动条
+        self.busy_bar.setMaximumWidth(120)
+        self.busy_bar.setMaximumHeight(14)
+        for widget in (self.busy_label, self.busy_bar):
+            widget.hide()
+            self.statusBar().addPermanentWidget(widget)
+
+        self.busy_timer = QTimer(self)
+        self.busy_timer.setSingleShot(True)
+        self.busy_timer.setInterval(self.BUSY_INDICATOR_DELAY)
+        self.busy_timer.timeout.connect(lambda: self.show_busy_indicator(True))
+        self.executor.busy_changed.connect(self.on_busy_changed)
+
+    def on_busy_changed(self, busy):
+        if busy:
+            self.busy_timer.start()
+        else:
+            self.busy_timer.stop()
+            self.show_busy_indicator(False)
+
+    def show_busy_indicator(self, visible):
+        self.busy_label.setVisible(visible)
+        self.busy_bar.setVisible(visible)
+
+    def set_maintenance_busy(self, busy):
+        """导入和重新计算期间禁用标签页和相关菜单，完成后刷新界面"""
+        self.tabs.setEnabled(not busy)
+        self.import_action.setEnabled(not busy)
+        self.recalc_action.setEnabled(not busy)
+
     def export_csv(self):
         """导出CSV文件"""
         file_path, _ = QFileDialog.getSaveFileName(
@@ -92,10 +141,14 @@ class MainWindow(QMainWindow):
         )
         
         if file_path:
-            if self.db.export_to_csv(file_path):
-                QMessageBox.information(self, "导出成功", f"数据已成功导出到：\n{file_path}")
-            else:
-                QMessageBox.critical(self, "导出失败", "导出过程中出现错误，请检查文件路径和权限。")
+            self.executor.submit('export_to_csv', file_path,
+                                 on_result=lambda ok: self.on_export_finished(file_path, ok))
+
+    def on_export_finished(self, file_path, ok):
+        if ok:
+            QMessageBox.information(self, "导出成功", f"数据已成功导出到：\n{file_path}")
+        else:
+            QMessageBox.critical(self, "导出失败", "导出过程中出现错误，请检查文件路径和权限。")
 
     def import_csv(self):
         """导入CSV文件"""
@@ -115,22 +168,45 @@ class MainWindow(QMainWindow):
             )
             
             if file_path:
-                if self.db.import_from_csv(file_path):
-                    QMessageBox.information(self, "导入成功", "数据已成功导入！")
-                    # 刷新所有界面
-                    self.data_entry_tab.refresh_person_list()
-                    if hasattr(self.data_entry_tab, 'load_period_data'):
-                        self.data_entry_tab.load_period_data()
-                    self.charts_tab.populate_filters()
-                else:
-                    QMessageBox.critical(self, "导入失败", "导入过程中出现错误，请检查文件格式。")
+                # 导入在后台执行，期间禁用标签页；先写入尚未保存的排序
+                self.data_entry_tab.save_sort_orders()
+                self.set_maintenance_busy(True)
+                self.executor.submit(import_with_report, file_path,
+                                     on_result=self.on_import_finished,
+                                     on_error=lambda e: self.on_import_finished(None))
+
+    def on_import_finished(self, report):
+        self.set_maintenance_busy(False)
+        if report:
+            message = (f"数据已成功导入！\n\n"
+                       f"业绩记录：{report['performance_count']} 条\n"
+                       f"总结记录：{report['summary_count']} 条\n"
+                       f"耗时：{report['seconds']:.2f} 秒（{report['rows_per_second']:.0f} 行/秒）")
+            if report['rejected_count']:
+                details = "\n".join(f"第 {line_no} 行：{reason}"
+                                     for line_no, reason in report['rejected_rows'][:10])
+                message += f"\n\n跳过无效数据 {report['rejected_count']} 行：\n{details}"
+                if report['rejected_count'] > 10:
+                    message += "\n..."
+            QMessageBox.information(self, "导入成功", message)
+            # 刷新所有界面
+            self.data_entry_tab.refresh_person_list()
+            if hasattr(self.data_entry_tab, 'load_period_data'):
+                self.data_entry_tab.load_period_data()
+            self.charts_tab.populate_filters()
+        else:
+            QMessageBox.critical(self, "导入失败", "导入过程中出现错误，请检查文件格式。")
 
     def manual_backup(self):
         """手动备份"""
         from datetime import datetime
         backup_name = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
-        if self.db.export_to_csv(backup_name):
+        self.executor.submit('export_to_csv', backup_name,
+                             on_result=lambda ok: self.on_backup_finished(backup_name, ok))
+
+    def on_backup_finished(self, backup_name, ok):
+        if ok:
             QMessageBox.information(self, "备份成功", f"数据已备份到：\n{backup_name}")
         else:
             QMessageBox.critical(self, "备份失败", "备份过程中出现错误。")
@@ -145,11 +221,23 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
-            self.db.recalculate_all_growth_rates()
-            QMessageBox.information(self, "计算完成", "所有增长率已重新计算完成！")
-            # 刷新当前显示的数据
-            if hasattr(self.data_entry_tab, 'load_period_data'):
-                self.data_entry_tab.load_period_data()
+            start = time.perf_counter()
+            self.set_maintenance_busy(True)
+            self.executor.submit('recalculate_all_growth_rates',
+                                 on_result=lambda _: self.on_recalculate_finished(start),
+                                 on_error=self.on_recalculate_error)
+
+    def on_recalculate_finished(self, start):
+        self.set_maintenance_busy(False)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        QMessageBox.information(self, "计算完成", f"所有增长率已重新计算完成！（耗时 {elapsed_ms:.0f} 毫秒）")
+        # 刷新当前显示的数据
+        if hasattr(self.data_entry_tab, 'load_period_data'):
+            self.data_entry_tab.load_period_data()
+
+    def on_recalculate_error(self, e):
+        self.set_maintenance_busy(False)
+        QMessageBox.critical(self, "计算失败", f"重新计算增长率时出错：{e}")
 
     def show_about(self):
         """显示关于对话框"""
@@ -166,7 +254,8 @@ class MainWindow(QMainWindow):
                          "• 🆕 最新时期自动加载\n"
                          "• 🆕 姓名下拉框实时同步\n"
                          "• 🆕 空白姓名选项支持\n\n"
-                         "每次数据更新都会自动备份到 performance_backup.csv")
+                         "每次数据更新都会自动备份到 performance_backup.csv\n\n"
+                         + self.db.describe_connection_settings())
         
     def on_tab_changed(self, index):
         # 如果切换到图表分析页
@@ -0,0 +1,203 @@
+# ui/performance_matrix.py
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PerformanceMatrix:
+    """人员 × 时期的稠密业绩矩阵，没有记录的格子为 NaN
+
+    names 为各行的姓名，periods 为各列的时期（界面格式，从早到晚），
+    values 为 float 的二维数组，metric 为矩阵中的指标（MATRIX_METRICS 的键，如 'total'、'growth'）。
+    """
+    def __init__(self, names, periods, values, metric):
+        self.names = names
+        self.periods = periods
+        self.values = values
+        self.metric = metric
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        """矩阵占用的字节数（图表缓存按此估算大小）"""
+        return self.values.nbytes
+
+    def sorted_by(self, sort):
+        """按 row_order(sort) 的顺序重新排列各行，返回新的矩阵"""
+        order = self.row_order(sort)
+        return PerformanceMatrix([self.names[i] for i in order], self.periods, self.values[order], self.metric)
+
+    def row_order(self, sort):
+        """按排序方式返回行的顺序
+
+        'overall' 按全部时期从高到低（总业绩为合计，增长率为平均），
+        'latest' 按最近一期从高到低（最近一期没有记录的排在最后），'name' 按姓名。
+        没有任何时期（空矩阵）时按原顺序排列。
+        """
+        if self.values.shape[1] == 0:
+            return np.arange(len(self.names))
+        if sort == 'name':
+            return np.argsort(np.array(self.names, dtype=object), kind='stable')
+        if sort == 'latest':
+            key = self.values[:, -1]
+        elif self.metric == 'growth':
+            key = np.nanmean(self.values, axis=1)
+        else:
+            key = np.nansum(self.values, axis=1)
+        # 从高到低，NaN 排在最后
+        return np.argsort(np.where(np.isnan(key), np.inf, -key), kind='stable')
+
+
+def _index_lookup(ids, used_ids):
+    """维度表id -> 矩阵下标的查找数组，覆盖 used_ids 中的全部id；不在 ids 中的id对应 -1"""
+    lookup = np.full(max(max(ids, default=0), int(used_ids.max())) + 1, -1, dtype=np.intp)
+    lookup[ids] = np.arange(len(ids))
+    return lookup
+
+
+def pivot_cells(row_ids, column_ids, cells):
+    """把 [(行id, 列id, 值)] 形式的记录整理为 len(row_ids) × len(column_ids) 的稠密矩阵
+
+    所有记录一次转换为 NumPy 数组，再按查找数组散布到矩阵中，不逐条在 Python 中处理；
+    不在 row_ids / column_ids 中的记录被忽略，没有记录的格子为 NaN。
+    """
+    values = np.full((len(row_ids), len(column_ids)), np.nan)
+    if not cells:
+        return values
+    flat = np.fromiter(itertools.chain.from_iterable(cells), dtype=float, count=3 * len(cells))
+    flat = flat.reshape(-1, 3)
+    row_ids_used, column_ids_used = flat[:, 0].astype(np.intp), flat[:, 1].astype(np.intp)
+    rows = _index_lookup(row_ids, row_ids_used)[row_ids_used]
+    columns = _index_lookup(column_ids, column_ids_used)[column_ids_used]
+    keep = (rows >= 0) & (columns >= 0)
+    values[rows[keep], columns[keep]] = flat[keep, 2]
+    return values
+
+
+def load_performance_matrix(db, metric='total', names=None, position=None):
+    """用一次批量查询读取一组人员各时期的业绩矩阵，可以作为 QueryExecutor 的查询函数
+
+    names / position 的含义与 DatabaseManager.get_matrix_cells 相同，都不指定时读取全部人员。
+    只保留至少有一条记录的人员（行）和时期（列），各行的时期对齐到同一条时期轴上。
+    """
+    persons, periods, cells = db.get_matrix_cells(metric, names, position)
+    values = pivot_cells([person_id for person_id, _ in persons], [period_id for period_id, _ in periods], cells)
+    has_row = ~np.all(np.isnan(values), axis=1)
+    has_column = ~np.all(np.isnan(values), axis=0)
+    names = [name for (_, name), keep in zip(persons, has_row) if keep]
+    period_names = [period for (_, period), keep in zip(periods, has_column) if keep]
+    return PerformanceMatrix(names, period_names, values[has_row][:, has_column], metric)
+
+
+class PerformanceMatrixCache:
+    """按数据版本号缓存整理好的业绩矩阵，在执行查询的线程（QueryExecutor 的后台线程）中使用
+
+    5000 人 × 200 期的矩阵读取和整理约需 1 秒，缓存后再次读取同一指标和人员范围时直接返回；
+    数据库有任何写入（数据版本号变化）后整体失效。最多保留 max_entries 个矩阵，最久未使用的先移除。
+    返回的矩阵由缓存共用，调用方不要修改（sorted_by 返回新的矩阵）。
+    """
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (指标, 姓名, 职级) -> PerformanceMatrix
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, db, metric='total', names=None, position=None):
+        """与 load_performance_matrix 相同，数据版本号未变化时返回缓存的矩阵"""
+        # 查询前记下版本号，查询期间其他连接的写入会使这次结果在下次读取时失效
+        version = db.data_version
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        key = (metric, tuple(names) if names is not None else None, position)
+        matrix = self._entries.get(key)
+        if matrix is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return matrix
+        self.misses += 1
+        matrix = load_performance_matrix(db, metric, names, position)
+        self._entries[key] = matrix
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return matrix
+
+
+# ===================================================================
+#  独立测试脚本
+#  运行方式: python ui/performance_matrix.py
+# ===================================================================
+if __name__ == '__main__':
+    import os
+    import sys
+    import tempfile
+    import time
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from database import DatabaseManager
+    from period_utils import key_to_period, shift_period_key
+
+    print("--- Running PerformanceMatrix Self-Test ---")
+
+    print("\n[Test Case 1] 记录散布到矩阵，缺失的格子为 NaN，未知的id被忽略")
+    values = pivot_cells([10, 20], [3, 1, 2], [(10, 1, 5.0), (20, 3, 7.0), (20, 2, 1.5), (99, 1, 8.0), (10, 9, 4.0)])
+    assert values.shape == (2, 3) and values[0, 1] == 5.0 and values[1, 0] == 7.0 and values[1, 2] == 1.5
+    assert np.isnan(values[0, 0]) and np.isnan(values[0, 2])
+    print(values)
+
+    print("\n[Test Case 2] 行排序")
+    matrix = PerformanceMatrix(['乙', '甲', '丙'], ['2024-01-上', '2024-01-下'],
+                               np.array([[1.0, 9.0], [6.0, np.nan], [2.0, 3.0]]), 'total')
+    assert list(matrix.row_order('overall')) == [0, 1, 2]
+    assert list(matrix.row_order('latest')) == [0, 2, 1]
+    assert [matrix.names[i] for i in matrix.row_order('name')] == sorted(matrix.names)
+    assert matrix.sorted_by('latest').names == ['乙', '丙', '甲']
+    matrix.metric = 'growth'
+    assert list(matrix.row_order('overall')) == [1, 0, 2]
+
+    print("\n[Test Case 3] 没有时期的空矩阵按原顺序排列")
+    empty = PerformanceMatrix(['a', 'b'], [], np.empty((2, 0)), 'total')
+    for sort in ('overall', 'latest', 'name'):
+        assert list(empty.row_order(sort)) == [0, 1]
+    assert empty.sorted_by('latest').shape == (2, 0)
+    assert PerformanceMatrix([], [], np.empty((0, 0)), 'growth').sorted_by('latest').names == []
+
+    print("\n[Test Case 4] 性能：5000 人 × 200 期")
+    rng = np.random.default_rng(0)
+    cells = [(person, period, value) for person, period, value in
+             zip(np.repeat(np.arange(1, 5001), 200).tolist(), np.tile(np.arange(1, 201), 5000).tolist(),
+                 rng.uniform(0, 2000, 1000000).tolist())]
+    start = time.perf_counter()
+    values = pivot_cells(list(range(1, 5001)), list(range(1, 201)), cells)
+    print(f"{len(cells)} 条记录 -> {values.shape}: {(time.perf_counter() - start) * 1000:.0f} ms")
+    assert not np.isnan(values).any()
+
+    print("\n[Test Case 5] 性能：从数据库读取 5000 人 × 200 期的矩阵，再次读取命中缓存，写入后失效")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "matrix.db"), os.path.join(tmp, "matrix_backup.csv"), backup_delay=None)
+        db.conn.executemany("INSERT INTO person (id, name) VALUES (?, ?)",
+                            [(person, f"人员{person:04d}") for person in range(1, 5001)])
+        period_keys = [shift_period_key(201001 * 2, offset) for offset in range(200)]
+        db.conn.executemany("INSERT INTO period (id, period, period_key) VALUES (?, ?, ?)",
+                            [(period, key_to_period(key), key) for period, key in enumerate(period_keys, 1)])
+        db.conn.executemany("INSERT INTO performance_fact (person_id, period_id, left_perf, right_perf) VALUES (?, ?, ?, 0)",
+                            cells)
+        db.conn.commit()
+        cache = PerformanceMatrixCache()
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            matrix = cache.load(db, 'total').sorted_by('overall')
+            timings.append(time.perf_counter() - start)
+        assert matrix.shape == (5000, 200) and (cache.hits, cache.misses) == (1, 1)
+        print(f"首次读取 {timings[0] * 1000:.0f} ms，再次读取 {timings[1] * 1000:.0f} ms")
+        assert timings[1] < 0.5, timings
+        db.save_summary("2010-01-上", "写入后缓存失效")
+        assert cache.load(db, 'total').shape == (5000, 200) and cache.misses == 2
+        db.close()
+
+    print("\n--- Test Completed Successfully ---")
@@ -0,0 +1,244 @@
+# ui/period_table_model.py
+from PyQt5.QtWidgets import QStyledItemDelegate, QComboBox
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# 按时期管理表格的列定义（编号列不显示，行号即编号）
+COLUMN_HEADERS = [
+    "职级", "姓名", "左区业绩", "左区订单", "右区业绩", "右区订单",
+    "左区增长%", "右区增长%", "总增长%"
+]
+POSITION_COL, NAME_COL, LEFT_PERF_COL, LEFT_ORDERS_COL, RIGHT_PERF_COL, RIGHT_ORDERS_COL = range(6)
+PERF_COLS = (LEFT_PERF_COL, RIGHT_PERF_COL)
+ORDER_COLS = (LEFT_ORDERS_COL, RIGHT_ORDERS_COL)
+GROWTH_COLS = (6, 7, 8)
+
+
+class PeriodTableModel(QAbstractTableModel):
+    """按时期管理表格的数据模型
+
+    直接持有查询结果，视图只为可见的单元格请求数据，行数再多也不会创建逐行的控件。
+    数值列保存转换后的数字；无法转换的输入按原文保存，保存时再提示格式错误。
+    每行记住加载时的内容和排序，保存时由 changeset() 只生成新增、修改、删除和移动过的记录。
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._originals = []      # 每行加载时的 (内容, sort_order)，新增行为 None
+        self._deleted_names = []  # 已从表格删除、保存时需要从数据库删除的姓名
+
+    def load_rows(self, data):
+        """用 get_data_by_period 的查询结果替换表格内容"""
+        self.beginResetModel()
+        self._rows = [
+            [row[8] or '', row[0],
+             row[1], row[3], row[2], row[4],
+             row[5] or 0.0, row[6] or 0.0, row[7] or 0.0]
+            for row in data
+        ]
+        # 与 _row_values 的结果相同，直接由查询结果生成以减少大表格的加载时间
+        self._originals = [
+            ((row[0].strip(), (row[8] or '').strip(),
+              row[1] or 0, row[3] or 0, row[2] or 0, row[4] or 0), row[9])
+            for row in data
+        ]
+        self._deleted_names = []
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return COLUMN_HEADERS[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        # 增长百分比列为只读
+        if index.column() not in GROWTH_COLS:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        value = self._rows[index.row()][index.column()]
+        column = index.column()
+        if value is None:
+            return ""
+        if isinstance(value, str):
+            return value
+        if column in GROWTH_COLS:
+            return f"{float(value):.2f}%" if role == Qt.DisplayRole else f"{float(value):.2f}"
+        if column in PERF_COLS:
+            return f"{float(value):.2f}"
+        return str(value)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        column = index.column()
+        text = str(value).strip() if value is not None else ''
+        if column in PERF_COLS or column in ORDER_COLS:
+            cast_func = float if column in PERF_COLS else int
+            if not text:
+                value = None
+            else:
+                try:
+                    value = cast_func(text)
+                except ValueError:
+                    value = text  # 保留原文，保存时提示格式错误
+        else:
+            value = text
+        self._rows[index.row()][column] = value
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def insert_empty_row(self):
+        """在末尾添加一个空行，返回新行的行号"""
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append(['', '', None, None, None, None, 0.0, 0.0, 0.0])
+        self._originals.append(None)
+        self.endInsertRows()
+        return row
+
+    def remove_row(self, row):
+        """删除指定行，已保存过的行在保存时从数据库删除"""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        if self._originals[row] is not None:
+            self._deleted_names.append(self._originals[row][0][0])
+        del self._rows[row]
+        del self._originals[row]
+        self.endRemoveRows()
+
+    def move_row(self, source, target):
+        """把 source 行移动到 target 位置（用于上移/下移相邻行）"""
+        if source == target or not (0 <= source < len(self._rows)) or not (0 <= target < len(self._rows)):
+            return False
+        # beginMoveRows 的目标位置是移动前的插入点，下移时需要 +1
+        destination = target + 1 if target > source else target
+        self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), destination)
+        self._rows.insert(target, self._rows.pop(source))
+        self._originals.insert(target, self._originals.pop(source))
+        self.endMoveRows()
+        return True
+
+    def name_at(self, row):
+        return self._rows[row][NAME_COL].strip()
+
+    def row_has_values(self, row):
+        """检查该行的业绩和订单列是否填写了内容"""
+        return any(self._rows[row][col] not in (None, '') for col in PERF_COLS + ORDER_COLS)
+
+    def _row_values(self, row):
+        """行中需要保存的内容，空的数值按 0 处理，用于判断该行是否被修改"""
+        values = self._rows[row]
+        return (values[NAME_COL].strip(), values[POSITION_COL].strip()) + tuple(
+            0 if values[col] is None or values[col] == '' else values[col]
+            for col in (LEFT_PERF_COL, LEFT_ORDERS_COL, RIGHT_PERF_COL, RIGHT_ORDERS_COL))
+
+    def is_dirty(self):
+        """表格内容或顺序是否与加载时不同"""
+        if self._deleted_names:
+            return True
+        return any(original is None or original != (self._row_values(row), row)
+                   for row, original in enumerate(self._originals))
+
+    def sort_order_changes(self):
+        """内容未修改、只是位置变化的已保存行 [(姓名, 新排序)]
+
+        有待保存的删除时返回空列表：被删除的行在数据库中仍占着原来的排序，
+        此时单独写入会产生重复的排序值，这些排序留到点击保存时与删除一起写入。
+        """
+        if self._deleted_names:
+            return []
+        return [(original[0][0], row) for row, original in enumerate(self._originals)
+                if original is not None and original[1] != row and original[0] == self._row_values(row)]
+
+    def mark_sort_orders_saved(self, sort_orders):
+        """排序单独写入数据库后，把这些行的排序记为已保存"""
+        for name, sort_order in sort_orders:
+            original = self._originals[sort_order]
+            if original is not None and original[0][0] == name:
+                self._originals[sort_order] = (original[0], sort_order)
+
+    def changeset(self):
+        """生成保存所需的修改集 (upserts, deletes, sort_orders)
+
+        以行号作为排序；姓名被修改的行视为删除原姓名并新增新姓名的记录。
+        数值格式无效时抛出 ValueError。
+        """
+        upserts, deletes, sort_orders = [], list(self._deleted_names), []
+        for row, original in enumerate(self._originals):
+            name = self.name_at(row)
+            if original is not None:
+                original_values, original_sort = original
+                if original_values[0] != name:
+                    deletes.append(original_values[0])
+                elif original_values == self._row_values(row):
+                    if original_sort != row:
+                        sort_orders.append((name, row))
+                    continue
+            if name:
+                upserts.append(self.row_record(row, row))
+
+        # 删除后又以同一姓名新增的记录由 upsert 覆盖即可
+        upserted_names = {record['name'] for record in upserts}
+        deletes = [name for name in dict.fromkeys(deletes) if name and name not in upserted_names]
+        return upserts, deletes, sort_orders
+
+    def row_record(self, row, sort_order):
+        """把一行转换为 save_period_data 使用的记录，数值格式无效时抛出 ValueError"""
+        def get_value(column, cast_func):
+            value = self._rows[row][column]
+            if value is None or value == '':
+                return 0
+            if isinstance(value, str):
+                raise ValueError(f"第 {row+1} 行第 {column+1} 列的数据格式无效：'{value}'")
+            return cast_func(value)
+
+        return {
+            'name': self.name_at(row),
+            'position': self._rows[row][POSITION_COL].strip(),
+            'sort_order': sort_order,
+            'left_perf': get_value(LEFT_PERF_COL, float),      # 左区业绩
+            'left_orders': get_value(LEFT_ORDERS_COL, int),    # 左区订单
+            'right_perf': get_value(RIGHT_PERF_COL, float),    # 右区业绩
+            'right_orders': get_value(RIGHT_ORDERS_COL, int)   # 右区订单
+        }
+
+
+class NameDelegate(QStyledItemDelegate):
+    """姓名列的共享委托：只在编辑单元格时创建一个姓名下拉框
+
+    names_provider 返回包含空白选项的姓名列表（不查询数据库，通常返回在后台读取好的列表）。
+    """
+    def __init__(self, names_provider, parent=None):
+        super().__init__(parent)
+        self.names_provider = names_provider
+
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.setEditable(False)
+        combo.addItems(self.names_provider())
+        # 选中后立即提交并关闭编辑器
+        combo.activated.connect(lambda _: self._commit_and_close(combo))
+        return combo
+
+    def setEditorData(self, editor, index):
+        name_index = editor.findText(index.data(Qt.EditRole) or '')
+        # 不在姓名列表中的姓名默认选中空白选项
+        editor.setCurrentIndex(name_index if name_index >= 0 else 0)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+    def _commit_and_close(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor, QStyledItemDelegate.NoHint)
@@ -0,0 +1,230 @@
+# ui/query_executor.py
+import queue
+import threading
+from concurrent.futures import Future
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class QueryRequest:
+    """一次提交给 QueryExecutor 的数据库调用"""
+    def __init__(self, request_id, func, args, on_result, on_error, key, background=False):
+        self.request_id = request_id
+        self.func = func
+        self.args = args
+        self.on_result = on_result
+        self.on_error = on_error
+        self.key = key
+        self.background = background
+        self.future = Future()
+
+
+class QueryExecutor(QObject):
+    """在专用的后台线程中执行数据库读写，结果通过 Qt 信号回到界面线程
+
+    后台线程用 db_manager.open_secondary() 打开自己的连接（共享数据版本号和自动备份），
+    请求按提交顺序逐个执行。submit() 返回 concurrent.futures.Future，
+    on_result / on_error 回调总在界面线程中调用。
+
+    同一 key 的请求只有最后一次提交的结果会交给回调：快速切换时期时，
+    尚未执行的旧请求直接跳过，已执行完的旧结果被丢弃。
+
+    background=True 的请求（如预读）不改变忙碌状态。
+    threaded=False（或内存数据库）时在调用线程中同步执行，便于单独运行各界面模块。
+    """
+    busy_changed = pyqtSignal(bool)  # 有非后台请求排队或执行时为 True
+    _finished = pyqtSignal(object)
+
+    def __init__(self, db_manager, parent=None, threaded=True):
+        super().__init__(parent)
+        self.db = db_manager
+        self.threaded = threaded and str(db_manager.db_path) != ':memory:'
+        self.pending_count = 0   # 尚未交付的请求数（含后台请求）
+        self._busy_count = 0     # 尚未交付的非后台请求数
+        self.dropped_count = 0   # 因被同一 key 的新请求取代而丢弃的结果数
+        self._next_id = 0
+        self._latest = {}        # key -> 最后一次提交的请求id
+        self._finished.connect(self._deliver)
+
+        self._queue = queue.Queue()
+        self._thread = None
+        if self.threaded:
+            self._thread = threading.Thread(target=self._run, name="QueryExecutor", daemon=True)
+            self._thread.start()
+
+    def is_busy(self):
+        return self.pending_count > 0
+
+    def submit(self, func, *args, on_result=None, on_error=None, key=None, background=False):
+        """执行 DatabaseManager 的方法 func(*args)
+
+        func 为方法名，或接收连接作为第一个参数的函数 func(db, *args)。
+        on_error 未指定时在控制台打印错误。
+        """
+        self._next_id += 1
+        request = QueryRequest(self._next_id, func, args, on_result, on_error, key, background)
+        if key is not None:
+            self._latest[key] = request.request_id
+
+        self.pending_count += 1
+        if not background:
+            self._busy_count += 1
+            if self._busy_count == 1:
+                self.busy_changed.emit(True)
+
+        if self.threaded:
+            self._queue.put(request)
+        else:
+            self._execute(self.db, request)
+            self._deliver(request)
+        return request.future
+
+    def cancel_key(self, key):
+        """丢弃该 key 尚未交付的请求结果"""
+        self._next_id += 1
+        self._latest[key] = self._next_id
+
+    def shutdown(self):
+        """执行完已提交的请求后停止后台线程并关闭其连接"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _is_stale(self, request):
+        return request.key is not None and self._latest.get(request.key) != request.request_id
+
+    def _run(self):
+        worker_db = None
+        try:
+            worker_db = self.db.open_secondary()
+        except Exception as e:
+            print(f"后台查询线程打开数据库失败: {e}")
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            if self._is_stale(request):
+                # 已被同一 key 的新请求取代，不再执行
+                request.future.cancel()
+            elif worker_db is None:
+                request.future.set_exception(RuntimeError("后台查询线程没有可用的数据库连接"))
+            else:
+                self._execute(worker_db, request)
+            self._finished.emit(request)
+        if worker_db is not None:
+            worker_db.close()
+
+    @staticmethod
+    def _execute(db, request):
+        if not request.future.set_running_or_notify_cancel():
+            return
+        try:
+            func = getattr(db, request.func) if isinstance(request.func, str) else request.func
+            args = request.args if isinstance(request.func, str) else (db,) + request.args
+            request.future.set_result(func(*args))
+        except Exception as e:
+            request.future.set_exception(e)
+
+    def _deliver(self, request):
+        """在界面线程中把结果交给回调"""
+        self.pending_count -= 1
+        if not request.background:
+            self._busy_count -= 1
+        try:
+            if request.future.cancelled() or self._is_stale(request):
+                self.dropped_count += 1
+                return
+            error = request.future.exception()
+            if error is None:
+                if request.on_result:
+                    request.on_result(request.future.result())
+            elif request.on_error:
+                request.on_error(error)
+            else:
+                print(f"后台查询出错: {error}")
+        finally:
+            if not request.background and self._busy_count == 0:
+                self.busy_changed.emit(False)
+
+
+# ===================================================================
+#  独立测试脚本
+#  运行方式: python ui/query_executor.py
+# ===================================================================
+if __name__ == '__main__':
+    import os
+    import sys
+    import tempfile
+    import time
+    from PyQt5.QtCore import QCoreApplication
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from database import DatabaseManager
+
+    def wait_idle(executor, timeout=10):
+        deadline = time.monotonic() + timeout
+        while executor.is_busy() and time.monotonic() < deadline:
+            QCoreApplication.processEvents()
+            time.sleep(0.001)
+        assert not executor.is_busy(), "等待后台查询超时"
+
+    print("--- Running QueryExecutor Self-Test ---")
+    app = QCoreApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_manager = DatabaseManager(os.path.join(tmp_dir, 'executor_test.db'),
+                                     backup_file=os.path.join(tmp_dir, 'backup.csv'), backup_delay=None)
+        db_manager.save_period_data("2024-01-First Half", [
+            {'name': '张三', 'left_perf': 100, 'right_perf': 80, 'left_orders': 5, 'right_orders': 4}])
+        executor = QueryExecutor(db_manager)
+        busy_states = []
+        executor.busy_changed.connect(busy_states.append)
+        gui_thread = threading.get_ident()
+
+        print("\n[Test Case 1] 后台线程读取，回调在界面线程")
+        results = []
+        executor.submit('get_data_by_period', "2024-01-上",
+                        on_result=lambda data: results.append((threading.get_ident(), data)))
+        wait_idle(executor)
+        assert results[0][0] == gui_thread and results[0][1][0][0] == '张三'
+        assert busy_states == [True, False], busy_states
+        print(f"结果: {results[0][1]}")
+
+        print("\n[Test Case 2] 后台写入后界面连接的缓存失效")
+        assert db_manager.get_distinct_names() == ['张三']
+        executor.submit('save_period_data', "2024-01-Second Half", [
+            {'name': '李四', 'left_perf': 50, 'right_perf': 60, 'left_orders': 2, 'right_orders': 3}])
+        wait_idle(executor)
+        assert sorted(db_manager.get_distinct_names()) == ['张三', '李四']
+
+        print("\n[Test Case 3] 同一 key 只交付最后一次请求的结果")
+        delivered = []
+        for period in ("2024-01-上", "2024-01-下", "2024-01-上", "2024-01-下"):
+            executor.submit('get_data_by_period', period, key='period',
+                            on_result=lambda data, p=period: delivered.append(p))
+        wait_idle(executor)
+        assert delivered == ["2024-01-下"], delivered
+        print(f"交付: {delivered}，丢弃: {executor.dropped_count}")
+
+        print("\n[Test Case 4] 错误交给 on_error，Future 可直接取结果")
+        errors = []
+        executor.submit(lambda db: db.no_such_method(), on_error=errors.append)
+        future = executor.submit('get_latest_performance_period')
+        wait_idle(executor)
+        assert isinstance(errors[0], AttributeError)
+        print(f"错误: {errors[0]!r}，最新时期: {future.result()}")
+
+        print("\n[Test Case 5] 后台请求不改变忙碌状态")
+        busy_states.clear()
+        executor.submit('prefetch_adjacent_periods', "2024-01-上", background=True)
+        wait_idle(executor)
+        assert busy_states == [], busy_states
+
+        print("\n[Test Case 6] 同步模式")
+        inline = QueryExecutor(db_manager, threaded=False)
+        inline.submit('get_distinct_periods', on_result=results.append)
+        assert results[-1] == ['2024-01-下', '2024-01-上'] and not inline.is_busy()
+
+        executor.shutdown()
+        db_manager.close()
+
+    print("\n--- Test Completed Successfully ---")
@@ -2,15 +2,24 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
                                QPushButton, QMessageBox, QComboBox)
 from PyQt5.QtCore import Qt
+try:
+    from query_executor import QueryExecutor
+except ImportError:
+    from ui.query_executor import QueryExecutor
 
 class RenamePersonDialog(QDialog):
     """修改人员姓名的对话框"""
-    def __init__(self, parent=None, db_manager=None):
+    def __init__(self, parent=None, db_manager=None, executor=None):
         super().__init__(parent)
         self.db = db_manager
+        # 未传入 executor 时在界面线程同步执行数据库操作
+        self.executor = executor
+        if self.executor is None and db_manager is not None:
+            self.executor = QueryExecutor(db_manager, self, threaded=False)
         self.old_name = None
         self.new_name = None
         self.result = False
+        self.busy = False
         
         self.setWindowTitle("修改人名")
         self.setGeometry(100, 100, 400, 200)
@@ -44,11 +53,9 @@ class RenamePersonDialog(QDialog):
         """)
         
         # 从数据库获取所有人名
-        if self.db:
-            all_names = self.db.get_all_names(active_only=True)
-            # 移除空白选项
-            all_names = [name for name in all_names if name]
-            self.old_name_combo.addItems(all_names)
+        if self.executor:
+            self.executor.submit(lambda db: db.get_all_names(active_only=True),
+                                 on_result=self.fill_old_names)
         
         old_name_layout.addWidget(self.old_name_combo)
         layout.addLayout(old_name_layout)
@@ -82,10 +89,10 @@ class RenamePersonDialog(QDialog):
         buttons_layout = QHBoxLayout()
         buttons_layout.addStretch()
         
-        confirm_button = QPushButton("确认")
-        confirm_button.clicked.connect(self.confirm_rename)
-        confirm_button.setMinimumWidth(80)
-        confirm_button.setStyleSheet("""
+        self.confirm_button = QPushButton("确认")
+        self.confirm_button.clicked.connect(self.confirm_rename)
+        self.confirm_button.setMinimumWidth(80)
+        self.confirm_button.setStyleSheet("""
             QPushButton {
                 background-color: #27ae60;
                 color: white;
@@ -101,12 +108,12 @@ class RenamePersonDialog(QDialog):
                 background-color: #1e8449;
             }
         """)
-        buttons_layout.addWidget(confirm_button)
+        buttons_layout.addWidget(self.confirm_button)
         
-        cancel_button = QPushButton("取消")
-        cancel_button.clicked.connect(self.reject)
-        cancel_button.setMinimumWidth(80)
-        cancel_button.setStyleSheet("""
+        self.cancel_button = QPushButton("取消")
+        self.cancel_button.clicked.connect(self.reject)
+        self.cancel_button.setMinimumWidth(80)
+        self.cancel_button.setStyleSheet("""
             QPushButton {
                 background-color: #95a5a6;
                 color: white;
@@ -122,13 +129,32 @@ class RenamePersonDialog(QDialog):
                 background-color: #5d6d7e;
             }
         """)
-        buttons_layout.addWidget(cancel_button)
+        buttons_layout.addWidget(self.cancel_button)
         
         layout.addLayout(buttons_layout)
         
         # 设置对话框为模态
         self.setModal(True)
+
+    def fill_old_names(self, all_names):
+        # 移除空白选项
+        self.old_name_combo.addItems([name for name in all_names if name])
+
+    def set_busy(self, busy):
+        """重命名在后台执行期间禁用输入和确认按钮"""
+        self.busy = busy
+        for widget in (self.old_name_combo, self.new_name_input, self.confirm_button, self.cancel_button):
+            widget.setEnabled(not busy)
+        if busy:
+            self.setCursor(Qt.BusyCursor)
+        else:
+            self.unsetCursor()
     
+    def reject(self):
+        # 重命名执行期间不能关闭对话框，完成后再处理结果
+        if not self.busy:
+            super().reject()
+
     def confirm_rename(self):
         """确认重命名"""
         old_name = self.old_name_combo.currentText().strip()
@@ -158,19 +184,26 @@ class RenamePersonDialog(QDialog):
         
         if reply == QMessageBox.Yes:
             # 执行重命名
-            if self.db.rename_person(old_name, new_name):
-                QMessageBox.information(
-                    self, 
-                    "重命名成功",
-                    f"已成功将 '{old_name}' 修改为 '{new_name}'",
-                )
-                self.old_name = old_name
-                self.new_name = new_name
-                self.result = True
-                self.accept()
-            else:
-                QMessageBox.critical(
-                    self, 
-                    "重命名失败",
-                    f"修改 '{old_name}' 为 '{new_name}' 失败，请重试"
-                )
+            self.set_busy(True)
+            self.executor.submit('rename_person', old_name, new_name,
+                                 on_result=lambda ok: self.on_rename_finished(old_name, new_name, ok),
+                                 on_error=lambda e: self.on_rename_finished(old_name, new_name, False))
+
+    def on_rename_finished(self, old_name, new_name, ok):
+        self.set_busy(False)
+        if ok:
+            QMessageBox.information(
+                self, 
+                "重命名成功",
+                f"已成功将 '{old_name}' 修改为 '{new_name}'",
+            )
+            self.old_name = old_name
+            self.new_name = new_name
+            self.result = True
+            self.accept()
+        else:
+            QMessageBox.critical(
+                self, 
+                "重命名失败",
+                f"修改 '{old_name}' 为 '{new_name}' 失败，请重试"
+            )